@@ -0,0 +1,505 @@
+"""Benchmarks for the reminder agent's tools.
+
+Run from this directory, e.g.:
+
+    python benchmark.py store --reminders 10000 --calls 200
+    python benchmark.py scheduler --pending 1000000
+    python benchmark.py prompt --reminders 10000 [--count-tokens]
+    python benchmark.py display --events 2000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, time as time_type, timedelta
+from types import SimpleNamespace
+
+from google.adk.sessions.state import State
+
+# The tools' reminders table goes in a scratch database, not the agent's
+os.environ.setdefault("REMINDERS_DB_PATH", os.path.join(tempfile.mkdtemp(), "reminders.db"))
+
+from reminder_agent import agent  # noqa: E402
+from reminder_agent.database import (  # noqa: E402
+    INSERT_SQL,
+    USER_ID_KEY,
+    connect,
+    get_connection,
+)
+from reminder_agent.reminder import Reminder  # noqa: E402
+from reminder_agent.scheduler import ReminderScheduler  # noqa: E402
+from reminder_agent.store import ReminderStore  # noqa: E402
+
+
+# --- Helpers ---
+def make_reminders(count: int, start: date = date(2025, 1, 1)) -> list[dict]:
+    """`count` reminders as they are kept in session state, a year's worth from `start`."""
+    return [
+        {
+            "date": (start + timedelta(days=i % 365)).isoformat(),
+            "time": f"{9 + i % 10:02d}:{i % 60:02d}:00",
+            "description": f"Reminder number {i}",
+            "is_done": i % 3 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def tool_context(reminders: list[dict], user_id: str = "benchmark") -> SimpleNamespace:
+    """A stand-in ToolContext whose state tracks its delta like ADK's."""
+    return SimpleNamespace(
+        state=State(value={"reminders": reminders, USER_ID_KEY: user_id}, delta={})
+    )
+
+
+def table_context(reminders: list[dict], user_id: str) -> SimpleNamespace:
+    """A stand-in ToolContext for a user whose reminders are in the reminders table."""
+    conn = get_connection()
+    conn.execute("DELETE FROM reminders WHERE user_id = ?;", (user_id,))
+    conn.executemany(INSERT_SQL, [{**reminder, "user_id": user_id} for reminder in reminders])
+    return tool_context([], user_id)
+
+
+def print_table(title: str, header: tuple, rows: list[tuple]):
+    cells = [[f"{v:.1f}" if isinstance(v, float) else str(v) for v in row] for row in rows]
+    widths = [max(len(str(h)), *(len(row[i]) for row in cells)) for i, h in enumerate(header)]
+    print(f"\n{title}")
+    print(" | ".join(str(h).rjust(w) for h, w in zip(header, widths)))
+    print("-+-".join("-" * w for w in widths))
+    for row in cells:
+        print(" | ".join(c.rjust(w) for c, w in zip(row, widths)))
+
+
+# --- Benchmarks ---
+def full_pass(reminders_data: list[dict], edit) -> list[dict]:
+    """What update/delete/mark_reminder_done did before the store: parse,
+    validate and re-serialise every reminder to change one of them."""
+    reminders = []
+    for r_data in reminders_data:
+        r_data = dict(r_data)
+        r_data["date"] = datetime.strptime(r_data["date"], "%Y-%m-%d").date()
+        r_data["time"] = datetime.strptime(r_data["time"], "%H:%M:%S").time()
+        reminders.append(Reminder(**r_data))
+    edit(reminders)
+    updated = []
+    for r in reminders:
+        r_dict = r.model_dump()
+        r_dict["date"] = r.date.isoformat()
+        r_dict["time"] = r.time.isoformat()
+        updated.append(r_dict)
+    return updated
+
+
+def bench_store(args):
+    """Per-operation cost of the reminder tools as the list grows.
+
+    Compares a full pass over the list, ReminderStore editing the list in
+    session state one entry at a time, and the tools' reminders table.
+    """
+
+    def mark_done_full(context, index):
+        def edit(reminders):
+            reminders[index - 1].is_done = True
+
+        context.state["reminders"] = full_pass(context.state["reminders"], edit)
+
+    def update_full(context, index):
+        def edit(reminders):
+            reminders[index - 1].description = "Updated"
+
+        context.state["reminders"] = full_pass(context.state["reminders"], edit)
+
+    def delete_full(context, index):
+        context.state["reminders"] = full_pass(
+            context.state["reminders"], lambda reminders: reminders.pop(index - 1)
+        )
+
+    operations = [
+        (
+            "update_reminder",
+            update_full,
+            lambda c, i: ReminderStore(c.state).update(i, description="Updated"),
+            lambda c, i: agent.update_reminder(i, "Updated", c),
+        ),
+        (
+            "mark_reminder_done",
+            mark_done_full,
+            lambda c, i: ReminderStore(c.state).update(i, is_done=True),
+            lambda c, i: agent.mark_reminder_done(i, c),
+        ),
+        (
+            "delete_reminder",
+            delete_full,
+            lambda c, i: ReminderStore(c.state).delete(i),
+            lambda c, i: agent.delete_reminder(i, c),
+        ),
+    ]
+
+    def microseconds_per_call(func, context, size: int) -> float:
+        # The full pass is slow on long lists; fewer calls still give a stable mean.
+        calls = args.calls if size <= 1000 else max(args.calls // 10, 5)
+        calls = min(calls, size // 2)  # So deletes never run out of reminders
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for call in range(calls):
+                func(context, call + 1)
+        return (time.perf_counter() - start) / calls * 1e6
+
+    conn = get_connection()
+    conn.execute("CREATE TABLE IF NOT EXISTS session_state (id INTEGER PRIMARY KEY, state TEXT);")
+
+    def saved(func):
+        """`func`, then saving the state as DatabaseSessionService does after each event."""
+
+        def call(context, index):
+            func(context, index)
+            conn.execute(
+                "INSERT OR REPLACE INTO session_state (id, state) VALUES (1, ?);",
+                (json.dumps(context.state._value),),
+            )
+
+        return call
+
+    sizes = sorted({100, 1000, args.reminders})
+    rows = []
+    for label, full, store, table in operations:
+        for size in sizes:
+            reminders = make_reminders(size)
+            rows.append(
+                (
+                    label,
+                    size,
+                    microseconds_per_call(full, tool_context(list(reminders)), size),
+                    microseconds_per_call(store, tool_context(list(reminders)), size),
+                    microseconds_per_call(saved(store), tool_context(list(reminders)), size),
+                    microseconds_per_call(table, table_context(reminders, f"user-{size}"), size),
+                )
+            )
+    print_table(
+        "Reminder tool cost per call (µs)",
+        ("operation", "reminders", "full pass", "state store", "+ saved", "table"),
+        rows,
+    )
+
+    reminders = make_reminders(args.reminders)
+    context = tool_context(reminders)
+    ReminderStore(context.state).update(1, is_done=True)
+    delta_kib = len(json.dumps(context.state._delta)) / 1024
+    context = table_context(reminders, "delta")
+    changes = conn.total_changes
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.mark_reminder_done(1, context)
+    print(
+        f"\nWritten per change at {args.reminders} reminders: state store {delta_kib:.0f} KiB "
+        f"state delta; table {conn.total_changes - changes} row, "
+        f"{len(json.dumps(context.state._delta))} B state delta."
+    )
+
+
+class ManualClock:
+    """A clock that only moves when told to; sleeping advances it instead of waiting."""
+
+    def __init__(self, now: datetime):
+        self.current = now
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds: float):
+        self.advance(seconds)
+
+
+def bench_scheduler(args):
+    """Cost of a scheduler tick with `--pending` reminders, on a simulated clock.
+
+    Checks along the way that every reminder is delivered once, in order, and
+    that reminders added, deleted or marked done while it runs are handled.
+    """
+    import asyncio
+
+    start = datetime.combine(date(2025, 1, 1), time_type(0, 0))
+    spacing = 30 * 24 * 3600 / args.pending  # Spread over 30 days
+    conn = connect(os.path.join(tempfile.mkdtemp(), "scheduler.db"))
+    begin = time.perf_counter()
+    conn.execute("BEGIN;")
+    conn.executemany(
+        "INSERT INTO reminders (user_id, number, date, time, description, is_done) "
+        "VALUES (?, ?, ?, ?, ?, 0);",
+        (
+            (
+                f"user-{i % 100}",
+                i // 100 + 1,
+                (start + timedelta(seconds=i * spacing)).strftime("%Y-%m-%d"),
+                (start + timedelta(seconds=i * spacing)).strftime("%H:%M:%S"),
+                f"Reminder number {i}",
+            )
+            for i in range(args.pending)
+        ),
+    )
+    conn.execute("COMMIT;")
+    print(f"Seeded {args.pending} pending reminders in {time.perf_counter() - begin:.1f}s")
+
+    delivered, heap_sizes = [], []
+    clock = ManualClock(start)
+    scheduler = ReminderScheduler(conn, on_due=delivered.append, clock=clock)
+
+    async def simulate(seconds: float) -> list[float]:
+        """Ticks and sleeps like `run` until the clock has moved `seconds`; returns tick times."""
+        end, timings = clock.now() + timedelta(seconds=seconds), []
+        while clock.now() < end:
+            tick_start = time.perf_counter()
+            await scheduler.tick()
+            timings.append(time.perf_counter() - tick_start)
+            heap_sizes.append(len(scheduler._heap))
+            await clock.sleep(min(scheduler.seconds_until_next(), (end - clock.now()).total_seconds()))
+        await scheduler.tick()  # Reminders due at exactly `end`
+        return timings
+
+    async def scenario():
+        # Changes made while the scheduler runs: one reminder added in the current
+        # window, one deleted and one marked done before they fall due
+        await simulate(60)
+        added = conn.execute(
+            INSERT_SQL,
+            {
+                "user_id": "user-0",
+                "date": "2025-01-01",
+                "time": "00:02:00",
+                "description": "Added while running",
+                "is_done": False,
+            },
+        ).lastrowid
+        # The next two seeded reminders, never the one just added, which may sort among them
+        deleted, marked_done = conn.execute(
+            "SELECT id FROM reminders WHERE is_done = 0 AND id != ? "
+            "ORDER BY date, time, id LIMIT 2;",
+            (added,),
+        ).fetchall()
+        conn.execute("DELETE FROM reminders WHERE id = ?;", (deleted[0],))
+        conn.execute("UPDATE reminders SET is_done = 1 WHERE id = ?;", (marked_done[0],))
+        return added, await simulate(args.hours * 3600 - 60)
+
+    added, timings = asyncio.run(scenario())
+    expected = conn.execute(
+        "SELECT count(*) FROM reminders WHERE (date, time) <= (?, ?);",
+        (clock.now().strftime("%Y-%m-%d"), clock.now().strftime("%H:%M:%S")),
+    ).fetchone()[0] - 1  # Less the one marked done by hand
+    keys = [(r.date, r.time, r.id) for r in delivered]
+    assert len(delivered) == expected, (len(delivered), expected)
+    assert keys == sorted(keys), "reminders were delivered out of order"
+    assert len(set(keys)) == len(keys), "a reminder was delivered twice"
+    assert added in {r.id for r in delivered}, "the reminder added while running was missed"
+    assert scheduler.stats["skipped"] == 2, scheduler.stats
+
+    # The alternative without an index: scanning every pending reminder each tick
+    reminders = [
+        {"date": row[0], "time": row[1], "is_done": row[2]}
+        for row in conn.execute("SELECT date, time, is_done FROM reminders;")
+    ]
+    now_key = (clock.now().strftime("%Y-%m-%d"), clock.now().strftime("%H:%M:%S"))
+    scans = []
+    for _ in range(5):
+        scan_start = time.perf_counter()
+        [r for r in reminders if not r["is_done"] and (r["date"], r["time"]) <= now_key]
+        scans.append(time.perf_counter() - scan_start)
+
+    timings.sort()
+    print(
+        f"Simulated {args.hours}h: {len(delivered)} delivered in {len(timings)} ticks, "
+        f"{scheduler.stats['loads']} window loads of {scheduler.stats['rows_loaded']} rows, "
+        f"at most {max(heap_sizes)} reminders in the heap"
+    )
+    print_table(
+        f"Per tick with {args.pending} pending reminders (ms)",
+        ("approach", "p50", "max"),
+        [
+            ("scheduler tick", timings[len(timings) // 2] * 1000, timings[-1] * 1000),
+            ("full scan", sorted(scans)[2] * 1000, max(scans) * 1000),
+        ],
+    )
+
+
+def bench_prompt(args):
+    """Size of the agent's instruction as reminders pile up: every reminder vs. the summary.
+
+    Tokens are estimated at 4 characters each unless --count-tokens asks Gemini's
+    count_tokens API (needs GOOGLE_API_KEY).
+    """
+    import asyncio
+
+    if args.count_tokens:
+        from dotenv import load_dotenv
+        from google import genai
+
+        load_dotenv()
+        client = genai.Client()
+
+        def count_tokens(text: str) -> int:
+            return client.models.count_tokens(model=agent.reminder_agent.model, contents=text).total_tokens
+
+    else:
+
+        def count_tokens(text: str) -> int:
+            return round(len(text) / 4)
+
+    def readonly_context(state: dict, user_id: str) -> SimpleNamespace:
+        # inject_session_state reads the session through the ADK's invocation context
+        state = {**state, USER_ID_KEY: user_id}
+        return SimpleNamespace(
+            state=state, _invocation_context=SimpleNamespace(session=SimpleNamespace(state=state))
+        )
+
+    state = {
+        "user_name": "Akshay Priyadarshi",
+        "current_date": "2025-06-01",
+        "current_time": "09:00:00",
+        "recent_reminder_changes": [f"added 'Reminder number {i}'" for i in range(5)],
+    }
+    rows = []
+    for size in sorted({10, 100, 1000, args.reminders}):
+        # Half already past, so the summary has both done and upcoming reminders to show
+        reminders = make_reminders(size, date.today() - timedelta(days=182))
+        # What the instruction held when it injected {reminders} from state
+        user_info = asyncio.run(
+            agent.instructions_utils.inject_session_state(
+                agent.USER_INFO, readonly_context(state, "prompt")
+            )
+        )
+        before = f"{user_info}    - Reminders: {reminders}\n{agent.GUIDELINES}"
+
+        context = readonly_context(state, f"prompt-{size}")
+        table_context(reminders, f"prompt-{size}")
+        render_start = time.perf_counter()
+        after = asyncio.run(agent.build_instruction(context))
+        render_ms = (time.perf_counter() - render_start) * 1000
+        rows.append((size, count_tokens(before), count_tokens(after), render_ms))
+    print(f"Summary at {size} reminders:")
+    print(after[after.index("- Reminders:") - 4 : after.index("You can help")].rstrip())
+    print_table(
+        "Instruction tokens per model call" + ("" if args.count_tokens else " (estimated)"),
+        ("reminders", "every reminder", "summary", "summary render ms"),
+        rows,
+    )
+
+
+def bench_display(args):
+    """Session reads per turn for the state shown around each query, on a long session.
+
+    Compares get_session (the session and every event), a state-only read,
+    and a state-only read before the query with the run's deltas applied after.
+    """
+    import asyncio
+
+    from google.adk.events import Event, EventActions
+    from google.adk.sessions import DatabaseSessionService
+    from google.genai import types
+    from sqlalchemy import event as sqlalchemy_event
+
+    import utils
+
+    service = DatabaseSessionService(
+        db_url=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'sessions.db')}"
+    )
+    statements = []
+    sqlalchemy_event.listen(
+        service.db_engine, "after_cursor_execute", lambda *_: statements.append(1)
+    )
+    app_name, user_id = "Memory Agent", "benchmark"
+    table_context(make_reminders(20), user_id)
+
+    async def build_session():
+        session = await service.create_session(
+            app_name=app_name, user_id=user_id, state={"user_name": "Akshay Priyadarshi"}
+        )
+        for turn in range(args.events // 2):
+            for author, role in (("user", "user"), ("reminder_agent", "model")):
+                text = f"Turn {turn} from {author}: " + "please remind me about it. " * 10
+                await service.append_event(
+                    session,
+                    Event(
+                        author=author,
+                        invocation_id=f"turn-{turn}",
+                        content=types.Content(role=role, parts=[types.Part(text=text)]),
+                        actions=EventActions(
+                            state_delta={"recent_reminder_changes": [f"change {turn}"]}
+                        ),
+                    ),
+                )
+        return session.id
+
+    begin = time.perf_counter()
+    session_id = asyncio.run(build_session())
+    print(f"Built a session with {args.events} events in {time.perf_counter() - begin:.1f}s")
+
+    async def turn(state_view: str):
+        """The reads call_agent_async makes around one query, without the agent."""
+        state_only = state_view != "session"
+        state = await utils.display_state(
+            service, app_name, user_id, session_id, "before", state_only=state_only
+        )
+        if state_view == "delta":
+            utils.display_state_changes(state, {"recent_reminder_changes": ["new"]}, user_id, "after")
+        else:
+            await utils.display_state(
+                service, app_name, user_id, session_id, "after", state_only=state_only
+            )
+
+    async def event_rows() -> int:
+        session = await service.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        return len(session.events)
+
+    events_per_read = asyncio.run(event_rows())
+    rows = []
+    for state_view, reads in (("session", 2), ("state", 2), ("delta", 1)):
+        timings = []
+        statements.clear()
+        for _ in range(args.calls):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(turn(state_view))
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        rows.append(
+            (
+                state_view,
+                reads,
+                len(statements) / args.calls,
+                events_per_read * reads if state_view == "session" else 0,
+                timings[len(timings) // 2] * 1000,
+            )
+        )
+    print_table(
+        f"Session reads per turn with {args.events} events",
+        ("STATE_VIEW", "state reads", "SQL statements", "event rows", "ms per turn"),
+        rows,
+    )
+
+
+BENCHMARKS = {
+    "display": bench_display,
+    "prompt": bench_prompt,
+    "scheduler": bench_scheduler,
+    "store": bench_store,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--reminders", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--pending", type=int, default=1_000_000)
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--count-tokens", action="store_true")
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
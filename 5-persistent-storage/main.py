@@ -5,7 +5,15 @@ from dotenv import load_dotenv
 from google.adk.runners import Runner
 from google.adk.sessions import DatabaseSessionService
 from reminder_agent import reminder_agent
-from utils import call_agent_async
+from reminder_agent.database import (
+    USER_ID_KEY,
+    connect,
+    get_connection,
+    migrate_state_reminders,
+    remember_user_id,
+)
+from reminder_agent.scheduler import ReminderScheduler
+from utils import call_agent_async, display_due_reminder
 
 load_dotenv()
 
@@ -16,10 +24,10 @@ session_service = DatabaseSessionService(db_url=db_url)
 
 
 # ===== PART 2: Define Initial State =====
-# This will only be used when creating a new session
+# This will only be used when creating a new session.
+# Reminders are kept in their own table (see reminder_agent/database.py).
 initial_state = {
     "user_name": "Akshay Priyadarshi",
-    "reminders": [],
     "current_date": datetime.now().strftime("%Y-%m-%d"),
     "current_time": datetime.now().strftime("%H:%M:%S"),
 }
@@ -42,12 +50,22 @@ async def main_async():
         # Use the most recent session
         SESSION_ID = existing_sessions.sessions[0].id
         print(f"Continuing existing session: {SESSION_ID}")
+
+        # Sessions from before the reminders table kept reminders in their state
+        session = await session_service.get_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+        )
+        imported = await migrate_state_reminders(session_service, session, get_connection())
+        if imported:
+            print(f"Moved {imported} reminders from the session state to the reminders table")
+        # The tools find the user's reminders through the user id kept in state
+        await remember_user_id(session_service, session)
     else:
         # Create a new session with initial state
         new_session = await session_service.create_session(
             app_name=APP_NAME,
             user_id=USER_ID,
-            state=initial_state,
+            state={**initial_state, USER_ID_KEY: USER_ID},
         )
         SESSION_ID = new_session.id
         print(f"Created new session: {SESSION_ID}")
@@ -60,22 +78,30 @@ async def main_async():
         session_service=session_service,
     )
 
-    # ===== PART 5: Interactive Conversation Loop =====
+    # ===== PART 5: Reminder Scheduler =====
+    # Announces reminders as they fall due, in the background
+    scheduler = ReminderScheduler(connect(), on_due=display_due_reminder)
+    scheduler_task = asyncio.create_task(scheduler.run())
+
+    # ===== PART 6: Interactive Conversation Loop =====
     print("\nWelcome to Memory Agent Chat!")
     print("Your reminders will be remembered across conversations.")
     print("Type 'exit' or 'quit' to end the conversation.\n")
 
-    while True:
-        # Get user input
-        user_input = input("You: ")
+    try:
+        while True:
+            # Get user input without blocking the scheduler
+            user_input = await asyncio.to_thread(input, "You: ")
 
-        # Check if user wants to exit
-        if user_input.lower() in ["exit", "quit"]:
-            print("Ending conversation. Your data has been saved to the database.")
-            break
+            # Check if user wants to exit
+            if user_input.lower() in ["exit", "quit"]:
+                print("Ending conversation. Your data has been saved to the database.")
+                break
 
-        # Process the user query through the agent
-        await call_agent_async(runner, USER_ID, SESSION_ID, user_input)
+            # Process the user query through the agent
+            await call_agent_async(runner, USER_ID, SESSION_ID, user_input)
+    finally:
+        scheduler_task.cancel()
 
 
 if __name__ == "__main__":
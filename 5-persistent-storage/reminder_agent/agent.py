@@ -1,7 +1,12 @@
+import textwrap
 from google.adk.agents import Agent
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.tools.tool_context import ToolContext
+from google.adk.utils import instructions_utils
 from .reminder import Reminder
-from datetime import datetime, date as date_type, time as time_type
+from .database import ReminderTable, user_reminders
+from .prompt import CHANGES_KEY, record_change, render_reminder_summary
+from datetime import datetime
 
 
 def add_reminder(reminder_description: str, date_str: str, time_str: str, tool_context: ToolContext) -> dict:
@@ -28,28 +33,19 @@ def add_reminder(reminder_description: str, date_str: str, time_str: str, tool_c
             "message": f"Invalid date or time format. Please use YYYY-MM-DD for date and HH:MM:SS for time. Error: {e}",
         }
 
-    # Get current reminders from state
-    reminders = tool_context.state.get("reminders", [])
-
-    # Create a Reminder object
+    # Create a Reminder object and insert it into the user's reminders
     new_reminder = Reminder(
         date=parsed_date,
         time=parsed_time,
         description=reminder_description,
         is_done=False,
     )
-
-    # Add the new reminder after converting date and time to strings
-    reminder_dict = new_reminder.model_dump()
-    reminder_dict["date"] = new_reminder.date.isoformat()
-    reminder_dict["time"] = new_reminder.time.isoformat()
-    reminders.append(reminder_dict)
-
-    # Update state with the new list of reminders
-    tool_context.state["reminders"] = reminders
+    index = user_reminders(tool_context.state).add(new_reminder)
+    record_change(tool_context.state, f"added '{reminder_description}' for {date_str} {time_str}")
 
     return {
         "action": "add_reminder",
+        "index": index,
         "reminder": reminder_description,
         "message": f"Added reminder: {reminder_description} on {date_str} at {time_str}",
     }
@@ -66,33 +62,26 @@ def view_reminders(tool_context: ToolContext) -> dict:
     """
     print("--- Tool: view_reminders called ---")
 
-    # Get reminders from state
-    reminders_data = tool_context.state.get("reminders", [])
-    
-    # Convert string dates/times to datetime objects for Pydantic model initialization
-    parsed_reminders = []
-    for r_data in reminders_data:
-        r_data["date"] = datetime.strptime(r_data["date"], "%Y-%m-%d").date() if isinstance(r_data.get("date"), str) else r_data.get("date")
-        r_data["time"] = datetime.strptime(r_data["time"], "%H:%M:%S").time() if isinstance(r_data.get("time"), str) else r_data.get("time")
-        parsed_reminders.append(Reminder(**r_data))
-    reminders = parsed_reminders
+    # Rows are read with ISO formatted date/time strings, ready for output
+    reminders = user_reminders(tool_context.state).list()
 
-    # Convert Reminder objects back to dictionaries with ISO formatted date/time strings for output
-    output_reminders = []
-    for r in reminders:
-        r_dict = r.model_dump()
-        r_dict["date"] = r.date.isoformat()
-        r_dict["time"] = r.time.isoformat()
-        output_reminders.append(r_dict)
+    return {"action": "view_reminders", "reminders": reminders, "count": len(reminders)}
 
-    return {"action": "view_reminders", "reminders": output_reminders, "count": len(reminders)}
+
+def _missing_reminder(action: str, index: int, store: ReminderTable) -> dict:
+    """The error returned when the user has no reminder with this `index`."""
+    return {
+        "action": action,
+        "status": "error",
+        "message": f"Could not find reminder {index}. Currently there are {store.count()} reminders; use view_reminders to see their indexes.",
+    }
 
 
 def update_reminder(index: int, updated_text: str, tool_context: ToolContext) -> dict:
     """Update an existing reminder.
 
     Args:
-        index: The 1-based index of the reminder to update
+        index: The index of the reminder to update, as view_reminders lists it
         updated_text: The new text for the reminder
         tool_context: Context for accessing and updating session state
 
@@ -103,35 +92,13 @@ def update_reminder(index: int, updated_text: str, tool_context: ToolContext) ->
         f"--- Tool: update_reminder called for index {index} with '{updated_text}' ---"
     )
 
-    # Get current reminders from state
-    reminders_data = tool_context.state.get("reminders", [])
-    parsed_reminders = []
-    for r_data in reminders_data:
-        r_data["date"] = datetime.strptime(r_data["date"], "%Y-%m-%d").date() if isinstance(r_data.get("date"), str) else r_data.get("date")
-        r_data["time"] = datetime.strptime(r_data["time"], "%H:%M:%S").time() if isinstance(r_data.get("time"), str) else r_data.get("time")
-        parsed_reminders.append(Reminder(**r_data))
-    reminders = parsed_reminders
-
-    # Check if the index is valid
-    if not reminders or index < 1 or index > len(reminders):
-        return {
-            "action": "update_reminder",
-            "status": "error",
-            "message": f"Could not find reminder at position {index}. Currently there are {len(reminders)} reminders.",
-        }
-
-    # Update the reminder (adjusting for 0-based indices)
-    old_reminder = reminders[index - 1].description
-    reminders[index - 1].description = updated_text
-
-    # Update state with the modified list, converting date and time to strings
-    updated_reminders_list = []
-    for r in reminders:
-        r_dict = r.model_dump()
-        r_dict["date"] = r.date.isoformat()
-        r_dict["time"] = r.time.isoformat()
-        updated_reminders_list.append(r_dict)
-    tool_context.state["reminders"] = updated_reminders_list
+    store = user_reminders(tool_context.state)
+    # Only the updated reminder's row is read, validated and rewritten
+    old_reminder = store.update(index, description=updated_text)
+    if old_reminder is None:
+        return _missing_reminder("update_reminder", index, store)
+    old_reminder = old_reminder["description"]
+    record_change(tool_context.state, f"renamed '{old_reminder}' to '{updated_text}'")
 
     return {
         "action": "update_reminder",
@@ -146,7 +113,7 @@ def delete_reminder(index: int, tool_context: ToolContext) -> dict:
     """Delete a reminder.
 
     Args:
-        index: The 1-based index of the reminder to delete
+        index: The index of the reminder to delete, as view_reminders lists it
         tool_context: Context for accessing and updating session state
 
     Returns:
@@ -154,40 +121,18 @@ def delete_reminder(index: int, tool_context: ToolContext) -> dict:
     """
     print(f"--- Tool: delete_reminder called for index {index} ---")
 
-    # Get current reminders from state
-    reminders_data = tool_context.state.get("reminders", [])
-    parsed_reminders = []
-    for r_data in reminders_data:
-        r_data["date"] = datetime.strptime(r_data["date"], "%Y-%m-%d").date() if isinstance(r_data.get("date"), str) else r_data.get("date")
-        r_data["time"] = datetime.strptime(r_data["time"], "%H:%M:%S").time() if isinstance(r_data.get("time"), str) else r_data.get("time")
-        parsed_reminders.append(Reminder(**r_data))
-    reminders = parsed_reminders
-
-    # Check if the index is valid
-    if not reminders or index < 1 or index > len(reminders):
-        return {
-            "action": "delete_reminder",
-            "status": "error",
-            "message": f"Could not find reminder at position {index}. Currently there are {len(reminders)} reminders.",
-        }
-
-    # Remove the reminder (adjusting for 0-based indices)
-    deleted_reminder = reminders.pop(index - 1)
-
-    # Update state with the modified list, converting date and time to strings
-    updated_reminders_list = []
-    for r in reminders:
-        r_dict = r.model_dump()
-        r_dict["date"] = r.date.isoformat()
-        r_dict["time"] = r.time.isoformat()
-        updated_reminders_list.append(r_dict)
-    tool_context.state["reminders"] = updated_reminders_list
+    store = user_reminders(tool_context.state)
+    deleted_reminder = store.delete(index)
+    if deleted_reminder is None:
+        return _missing_reminder("delete_reminder", index, store)
+    deleted_reminder = deleted_reminder["description"]
+    record_change(tool_context.state, f"deleted '{deleted_reminder}'")
 
     return {
         "action": "delete_reminder",
         "index": index,
-        "deleted_reminder": deleted_reminder.description,
-        "message": f"Deleted reminder {index}: '{deleted_reminder.description}'",
+        "deleted_reminder": deleted_reminder,
+        "message": f"Deleted reminder {index}: '{deleted_reminder}'",
     }
 
 
@@ -221,7 +166,7 @@ def mark_reminder_done(index: int, tool_context: ToolContext) -> dict:
     """Mark a reminder as done.
 
     Args:
-        index: The 1-based index of the reminder to mark as done
+        index: The index of the reminder to mark as done, as view_reminders lists it
         tool_context: Context for accessing and updating session state
 
     Returns:
@@ -229,35 +174,12 @@ def mark_reminder_done(index: int, tool_context: ToolContext) -> dict:
     """
     print(f"--- Tool: mark_reminder_done called for index {index} ---")
 
-    # Get current reminders from state
-    reminders_data = tool_context.state.get("reminders", [])
-    parsed_reminders = []
-    for r_data in reminders_data:
-        r_data["date"] = datetime.strptime(r_data["date"], "%Y-%m-%d").date() if isinstance(r_data.get("date"), str) else r_data.get("date")
-        r_data["time"] = datetime.strptime(r_data["time"], "%H:%M:%S").time() if isinstance(r_data.get("time"), str) else r_data.get("time")
-        parsed_reminders.append(Reminder(**r_data))
-    reminders = parsed_reminders
-
-    # Check if the index is valid
-    if not reminders or index < 1 or index > len(reminders):
-        return {
-            "action": "mark_reminder_done",
-            "status": "error",
-            "message": f"Could not find reminder at position {index}. Currently there are {len(reminders)} reminders.",
-        }
-
-    # Mark the reminder as done (adjusting for 0-based indices)
-    reminders[index - 1].is_done = True
-    marked_reminder_description = reminders[index - 1].description
-
-    # Update state with the modified list, converting date and time to strings
-    updated_reminders_list = []
-    for r in reminders:
-        r_dict = r.model_dump()
-        r_dict["date"] = r.date.isoformat()
-        r_dict["time"] = r.time.isoformat()
-        updated_reminders_list.append(r_dict)
-    tool_context.state["reminders"] = updated_reminders_list
+    store = user_reminders(tool_context.state)
+    marked_reminder = store.update(index, is_done=True)
+    if marked_reminder is None:
+        return _missing_reminder("mark_reminder_done", index, store)
+    marked_reminder_description = marked_reminder["description"]
+    record_change(tool_context.state, f"marked '{marked_reminder_description}' as done")
 
     return {
         "action": "mark_reminder_done",
@@ -267,20 +189,17 @@ def mark_reminder_done(index: int, tool_context: ToolContext) -> dict:
     }
 
 
-# Create a simple persistent agent
-reminder_agent = Agent(
-    name="reminder_agent",
-    model="gemini-2.0-flash",
-    description="A smart reminder agent with persistent memory",
-    instruction="""
+# --- Instruction ---
+USER_INFO = """
     You are a friendly reminder assistant that remembers users across conversations.
     
     The user's information is stored in state:
     - User's name: {user_name}
-    - Reminders: {reminders}
     - Current date: {current_date}
     - Current time: {current_time}
-    
+"""
+
+GUIDELINES = """    
     You can help users manage their reminders with the following capabilities:
     1. Add new reminders (with a description, date, time, and a 'done' status)
     2. View existing reminders
@@ -298,7 +217,8 @@ reminder_agent = Agent(
     
     1. When the user asks to update or delete a reminder but doesn't provide an index:
        - If they mention the content of the reminder (e.g., "delete my meeting reminder"), 
-         look through the reminders to find a match by checking the 'description' field of each reminder object.
+         check the upcoming reminders listed above; if none matches, use the view_reminders tool and look through
+         all reminders to find a match by checking the 'description' field of each reminder object.
        - If you find an exact or close match, use that index
        - Never clarify which reminder the user is referring to, just use the first match
        - If no match is found, list all reminders and ask the user to specify
@@ -306,12 +226,14 @@ reminder_agent = Agent(
     2. When the user mentions a number or position:
        - Use that as the index (e.g., "delete reminder 2" means index=2)
        - Remember that indexing starts at 1 for the user
+       - Each reminder keeps the index view_reminders shows for it, in the order reminders were added;
+         deleting a reminder leaves a gap instead of renumbering the others
     
     3. For relative positions:
        - Handle "first", "last", "second", etc. appropriately
-       - "First reminder" = index 1
+       - "First reminder" = the lowest index in the list
        - "Last reminder" = the highest index
-       - "Second reminder" = index 2, and so on
+       - "Second reminder" = the second index in the list, and so on
     
     4. For viewing:
        - Always use the view_reminders tool when the user asks to see their reminders
@@ -360,7 +282,32 @@ reminder_agent = Agent(
     - You don't have to be 100% correct, but try to be as close as possible.
     - Never ask the user to clarify which reminder they are referring to.
     - Always use the current_date and current_time from state when calculating relative dates and times.
-    """,
+"""
+
+
+async def build_instruction(context: ReadonlyContext) -> str:
+    """Builds the instruction for each model call.
+
+    Instead of every reminder, it carries a bounded summary of them (see
+    render_reminder_summary), so its length no longer grows with the list.
+    The summary is added after state injection, so braces in reminder
+    descriptions are never read as state placeholders.
+    """
+    user_info = await instructions_utils.inject_session_state(USER_INFO, context)
+    summary = render_reminder_summary(
+        user_reminders(context.state),
+        context.state.get(CHANGES_KEY, []),
+        datetime.now(),
+    )
+    return f"{user_info}{textwrap.indent(summary, '    ')}\n{GUIDELINES}"
+
+
+# Create a simple persistent agent
+reminder_agent = Agent(
+    name="reminder_agent",
+    model="gemini-2.0-flash",
+    description="A smart reminder agent with persistent memory",
+    instruction=build_instruction,
     tools=[
         add_reminder,
         view_reminders,
@@ -0,0 +1,231 @@
+import os
+import sqlite3
+from functools import lru_cache
+
+from google.adk.events import Event, EventActions
+
+from .reminder import Reminder
+from .store import STATE_KEY, ReminderStore, reminder_to_state
+
+# Kept next to the ADK sessions by default, in a table of its own
+REMINDERS_DB_PATH = os.getenv("REMINDERS_DB_PATH", "./my_agent_data.db")
+
+# The session state key holding the user's id. "user:" keys are shared by all
+# of a user's sessions, and tools can read them through the public state API.
+USER_ID_KEY = "user:user_id"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    number INTEGER NOT NULL,    -- The user's reminder number, in the order they were added
+    date TEXT NOT NULL,         -- YYYY-MM-DD
+    time TEXT NOT NULL,         -- HH:MM:SS
+    description TEXT NOT NULL,
+    is_done INTEGER NOT NULL DEFAULT 0
+);
+-- Looks up a reminder by the number the user knows it by
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reminders_user_number ON reminders (user_id, number);
+-- A user's reminders in date order, for the upcoming ones
+CREATE INDEX IF NOT EXISTS idx_reminders_user_due ON reminders (user_id, date, time);
+-- Pending reminders across users in date order, for finding what is due
+CREATE INDEX IF NOT EXISTS idx_reminders_done_due ON reminders (is_done, date, time);
+-- Sessions whose state reminders have been imported
+CREATE TABLE IF NOT EXISTS reminder_migrations (
+    session_id TEXT PRIMARY KEY,
+    imported INTEGER NOT NULL
+);
+"""
+COLUMNS = "id, number, date, time, description, is_done"
+INSERT_SQL = (
+    "INSERT INTO reminders (user_id, number, date, time, description, is_done) "
+    "SELECT :user_id, coalesce(max(number), 0) + 1, :date, :time, :description, :is_done "
+    "FROM reminders WHERE user_id = :user_id;"
+)
+
+
+def connect(path: str = REMINDERS_DB_PATH) -> sqlite3.Connection:
+    """Opens the reminders database, creating the table and its indexes if needed."""
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA busy_timeout=5000;")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+@lru_cache(maxsize=None)
+def get_connection(path: str = REMINDERS_DB_PATH) -> sqlite3.Connection:
+    """The shared connection the agent's tools use."""
+    return connect(path)
+
+
+def row_to_reminder(row: sqlite3.Row) -> dict:
+    """Converts a row to the dict the tools return (ISO date and time strings)."""
+    return {
+        "index": row["number"],
+        "date": row["date"],
+        "time": row["time"],
+        "description": row["description"],
+        "is_done": bool(row["is_done"]),
+    }
+
+
+class ReminderTable:
+    """One user's reminders in the `reminders` table, read and written a row at a time.
+
+    Each reminder has a number, 1 for the user's first reminder, 2 for the
+    next and so on; this is the index the tools take. Numbers follow the
+    order reminders were added, as positions in the state list did, and stay
+    the same when other reminders are deleted. A number is looked up through
+    the unique (user_id, number) index, so every operation reads or writes
+    one row however many reminders the user has.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, user_id: str):
+        """
+        Args:
+            conn: A connection from `connect`
+            user_id: The user whose reminders to manage
+        """
+        self.conn = conn
+        self.user_id = user_id
+
+    def _row(self, number: int) -> sqlite3.Row | None:
+        return self.conn.execute(
+            f"SELECT {COLUMNS} FROM reminders WHERE user_id = ? AND number = ?;",
+            (self.user_id, number),
+        ).fetchone()
+
+    def count(self) -> int:
+        return self.conn.execute(
+            "SELECT count(*) FROM reminders WHERE user_id = ?;", (self.user_id,)
+        ).fetchone()[0]
+
+    def get(self, number: int) -> dict | None:
+        """Returns reminder `number`, or None if there is none."""
+        row = self._row(number)
+        return row_to_reminder(row) if row is not None else None
+
+    def list(self) -> list:
+        """Returns every reminder, in number order."""
+        rows = self.conn.execute(
+            f"SELECT {COLUMNS} FROM reminders WHERE user_id = ? ORDER BY number;",
+            (self.user_id,),
+        ).fetchall()
+        return [row_to_reminder(row) for row in rows]
+
+    def add(self, reminder: Reminder) -> int:
+        """Inserts a reminder and returns its number."""
+        cursor = self.conn.execute(
+            INSERT_SQL, {"user_id": self.user_id, **reminder_to_state(reminder)}
+        )
+        return self.conn.execute(
+            "SELECT number FROM reminders WHERE id = ?;", (cursor.lastrowid,)
+        ).fetchone()[0]
+
+    def update(self, number: int, **changes) -> dict | None:
+        """Changes fields of reminder `number`.
+
+        Returns:
+            The reminder as it was before the change, or None if there is no such reminder
+        """
+        row = self._row(number)
+        if row is None:
+            return None
+        old = row_to_reminder(row)
+        data = reminder_to_state(Reminder.model_validate({**old, **changes}))
+        self.conn.execute(
+            "UPDATE reminders SET date = ?, time = ?, description = ?, is_done = ? WHERE id = ?;",
+            (data["date"], data["time"], data["description"], data["is_done"], row["id"]),
+        )
+        return old
+
+    def delete(self, number: int) -> dict | None:
+        """Removes reminder `number` and returns it, or None if there is no such reminder."""
+        row = self._row(number)
+        if row is None:
+            return None
+        self.conn.execute("DELETE FROM reminders WHERE id = ?;", (row["id"],))
+        return row_to_reminder(row)
+
+
+def user_reminders(state) -> ReminderTable:
+    """The reminders of the user whose session `state` this is.
+
+    Raises:
+        KeyError: If the state has no USER_ID_KEY (see `remember_user_id`).
+    """
+    return ReminderTable(get_connection(), state[USER_ID_KEY])
+
+
+# --- Migration ---
+async def migrate_state_reminders(session_service, session, conn: sqlite3.Connection) -> int:
+    """Moves reminders kept in a session's state into the `reminders` table.
+
+    The rows are committed together with a record of the session's migration,
+    then the state list is cleared with a state-delta event. If the process
+    stops in between, the next run sees the record and only clears the state,
+    so reminders are never imported twice.
+
+    Reminders are numbered in list order, so a user without reminders in the
+    table keeps the indexes they saw before: reminder 2 is still reminder 2.
+    Reminders from further sessions of the same user are numbered after those.
+
+    Args:
+        session_service: The session service `session` came from
+        session: A session whose state may still hold a `reminders` list
+        conn: A connection from `connect`
+
+    Returns:
+        The number of reminders imported
+    """
+    reminders = ReminderStore(session.state).list()
+    if not reminders:
+        return 0
+
+    rows = [
+        {"user_id": session.user_id, **reminder_to_state(Reminder.model_validate(reminder))}
+        for reminder in reminders
+    ]
+    # The sessions may live in the same database file, so the transaction must be
+    # committed before the session service writes the event.
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        migrated = conn.execute(
+            "SELECT 1 FROM reminder_migrations WHERE session_id = ?;", (session.id,)
+        ).fetchone()
+        if not migrated:
+            conn.executemany(INSERT_SQL, rows)
+            conn.execute(
+                "INSERT INTO reminder_migrations (session_id, imported) VALUES (?, ?);",
+                (session.id, len(rows)),
+            )
+    except BaseException:
+        conn.execute("ROLLBACK;")
+        raise
+    conn.execute("COMMIT;")
+
+    await session_service.append_event(
+        session,
+        Event(
+            author="system",
+            invocation_id="reminders-migration",
+            actions=EventActions(state_delta={STATE_KEY: []}),
+        ),
+    )
+    return 0 if migrated else len(rows)
+
+
+async def remember_user_id(session_service, session):
+    """Stores the session's user id under USER_ID_KEY, where the tools read it from."""
+    if session.state.get(USER_ID_KEY) == session.user_id:
+        return
+    await session_service.append_event(
+        session,
+        Event(
+            author="system",
+            invocation_id="remember-user-id",
+            actions=EventActions(state_delta={USER_ID_KEY: session.user_id}),
+        ),
+    )
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from .database import COLUMNS, ReminderTable, row_to_reminder
+
+CHANGES_KEY = "recent_reminder_changes"
+UPCOMING_REMINDERS = 5  # Upcoming reminders shown in the prompt
+RECENT_CHANGES = 5  # Recent changes kept in state and shown in the prompt
+
+
+def record_change(state, change: str):
+    """Adds a line to the recent changes shown in the prompt, keeping the last few."""
+    state[CHANGES_KEY] = [*state.get(CHANGES_KEY, []), change][-RECENT_CHANGES:]
+
+
+def upcoming_reminders(table: ReminderTable, now: datetime, limit: int) -> list[dict]:
+    """The next `limit` pending reminders due from `now`, through the (user_id, date, time) index.
+
+    Each carries the reminder's stable number as its index, so no position is computed.
+    """
+    now_date, now_time = now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S")
+    rows = table.conn.execute(
+        f"SELECT {COLUMNS} FROM reminders WHERE user_id = ? AND (date, time) >= (?, ?) "
+        "AND is_done = 0 ORDER BY date, time, id LIMIT ?;",
+        (table.user_id, now_date, now_time, limit),
+    )
+    return [row_to_reminder(row) for row in rows]
+
+
+def reminder_counts(table: ReminderTable) -> tuple[int, int]:
+    """The user's (total, done) reminder counts."""
+    return table.conn.execute(
+        "SELECT count(*), coalesce(sum(is_done), 0) FROM reminders WHERE user_id = ?;",
+        (table.user_id,),
+    ).fetchone()
+
+
+def render_reminder_summary(
+    table: ReminderTable, changes: list, now: datetime, upcoming: int = UPCOMING_REMINDERS
+) -> str:
+    """A bounded summary of the user's reminders for the agent's instruction.
+
+    Shows the counts of pending and done reminders, the next `upcoming`
+    pending ones and the recent changes, however many reminders there are.
+    """
+    total, done = reminder_counts(table)
+    lines = [
+        f"- Reminders: {total} in total, {total - done} pending, {done} done. "
+        "Only a summary is shown here; use view_reminders for the full list."
+    ]
+    next_reminders = upcoming_reminders(table, now, upcoming)
+    if next_reminders:
+        lines.append(f"- Next {len(next_reminders)} upcoming (index. date time: description):")
+        lines += [
+            f"  {r['index']}. {r['date']} {r['time']}: {r['description']}" for r in next_reminders
+        ]
+    else:
+        lines.append("- No upcoming reminders.")
+    if changes:
+        lines.append("- Recent changes:")
+        lines += [f"  - {change}" for change in changes]
+    return "\n".join(lines)
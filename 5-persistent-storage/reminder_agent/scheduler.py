@@ -0,0 +1,181 @@
+import asyncio
+import heapq
+import inspect
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, NamedTuple
+
+DATE_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%H:%M:%S"
+# Sorts before every stored reminder: (date, time, id) with ids starting at 1
+START = ("", "", 0)
+
+
+class DueReminder(NamedTuple):
+    """A reminder passed to the scheduler's callback when it falls due."""
+
+    id: int
+    user_id: str
+    date: str
+    time: str
+    description: str
+
+    @property
+    def due(self) -> datetime:
+        return datetime.strptime(f"{self.date} {self.time}", f"{DATE_FORMAT} {TIME_FORMAT}")
+
+
+class SystemClock:
+    """The wall clock. The scheduler takes any object with these two methods."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+def due_key(moment: datetime, reminder_id: int) -> tuple:
+    """The (date, time, id) key reminders are ordered by, as stored in the table."""
+    return (moment.strftime(DATE_FORMAT), moment.strftime(TIME_FORMAT), reminder_id)
+
+
+class ReminderScheduler:
+    """Delivers pending reminders when they fall due.
+
+    Upcoming reminders are kept in a min-heap ordered by (date, time, id).
+    They are loaded from the `reminders` table lazily, one window at a time,
+    through the (is_done, date, time) index. Every pending reminder that
+    sorts at or before `self._horizon` has been loaded; nothing after it has.
+    A window is loaded only when the heap runs empty, and holds at most
+    `batch_size` reminders due before now + `window`. A tick therefore costs
+    O(log n) per reminder it delivers, however many are pending.
+
+    Reminders added after a window was loaded are picked up by polling for
+    ids above the largest one seen, which reads only the new rows. A due
+    reminder is re-read before it is delivered, so reminders deleted or
+    marked done in the meantime are skipped. After the callback returns, the
+    reminder is marked done.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        on_due: Callable[[DueReminder], Awaitable[None] | None],
+        clock=None,
+        window: timedelta = timedelta(hours=1),
+        batch_size: int = 1000,
+        poll_interval: float = 30.0,
+    ):
+        """
+        Args:
+            conn: A connection from `database.connect`
+            on_due: Called with each reminder as it falls due; may be async
+            clock: Provides now() and async sleep(seconds); defaults to SystemClock
+            window: How far ahead of now each load looks
+            batch_size: The most reminders a single load reads
+            poll_interval: The longest the scheduler sleeps before checking for
+                           newly added reminders, in seconds
+        """
+        self.conn = conn
+        self.on_due = on_due
+        self.clock = clock or SystemClock()
+        self.window = window
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._heap: list[tuple[tuple, DueReminder]] = []
+        self._horizon = START
+        self._last_id = conn.execute("SELECT coalesce(max(id), 0) FROM reminders;").fetchone()[0]
+        self.stats = {"loads": 0, "rows_loaded": 0, "delivered": 0, "skipped": 0}
+
+    # --- Loading ---
+    def _push(self, row) -> None:
+        reminder = DueReminder(*row)
+        heapq.heappush(self._heap, ((reminder.date, reminder.time, reminder.id), reminder))
+
+    def _load_window(self, now: datetime) -> None:
+        """Loads the next pending reminders after the horizon that are due within the window."""
+        end = now + self.window
+        rows = self.conn.execute(
+            "SELECT id, user_id, date, time, description FROM reminders "
+            "WHERE is_done = 0 AND (date, time, id) > (?, ?, ?) AND (date, time) < (?, ?) "
+            "ORDER BY date, time, id LIMIT ?;",
+            (*self._horizon, end.strftime(DATE_FORMAT), end.strftime(TIME_FORMAT), self.batch_size),
+        ).fetchall()
+        for row in rows:
+            self._push(row)
+        if len(rows) == self.batch_size:
+            # More may be due within the window; the next load continues from here
+            self._horizon = (rows[-1][2], rows[-1][3], rows[-1][0])
+        else:
+            self._horizon = due_key(end, 0)
+        self.stats["loads"] += 1
+        self.stats["rows_loaded"] += len(rows)
+
+    def _load_new(self) -> None:
+        """Loads reminders added since the last check that sort before the horizon."""
+        rows = self.conn.execute(
+            "SELECT id, user_id, date, time, description, is_done FROM reminders "
+            "WHERE id > ? ORDER BY id;",
+            (self._last_id,),
+        ).fetchall()
+        for row in rows:
+            if not row[5] and (row[2], row[3], row[0]) <= self._horizon:
+                self._push(row[:5])
+        if rows:
+            self._last_id = rows[-1][0]
+
+    # --- Delivery ---
+    async def _deliver(self, reminder: DueReminder) -> None:
+        row = self.conn.execute(
+            "SELECT description, is_done FROM reminders WHERE id = ?;", (reminder.id,)
+        ).fetchone()
+        if row is None or row[1]:
+            self.stats["skipped"] += 1
+            return
+        result = self.on_due(reminder._replace(description=row[0]))
+        if inspect.isawaitable(result):
+            await result
+        self.conn.execute("UPDATE reminders SET is_done = 1 WHERE id = ?;", (reminder.id,))
+        self.stats["delivered"] += 1
+
+    async def tick(self) -> int:
+        """Delivers every reminder due by now.
+
+        Returns:
+            The number of reminders delivered
+        """
+        now = self.clock.now()
+        now_key = due_key(now, float("inf"))
+        self._load_new()
+        delivered = self.stats["delivered"]
+        while True:
+            if not self._heap and self._horizon < now_key:
+                self._load_window(now)
+            if not self._heap or self._heap[0][0] > now_key:
+                break
+            _, reminder = heapq.heappop(self._heap)
+            try:
+                await self._deliver(reminder)
+            except Exception as e:
+                # Left pending in the table, so it is delivered again after a restart
+                print(f"Error delivering reminder {reminder.id}: {e}")
+        return self.stats["delivered"] - delivered
+
+    def seconds_until_next(self) -> float:
+        """How long the scheduler can sleep before something may fall due."""
+        if self._heap:
+            key = self._heap[0][0]
+        else:
+            key = self._horizon  # Nothing pending sorts before it
+        if key == START:
+            return 0.0
+        next_due = datetime.strptime(f"{key[0]} {key[1]}", f"{DATE_FORMAT} {TIME_FORMAT}")
+        wait = (next_due - self.clock.now()).total_seconds()
+        return min(max(wait, 0.0), self.poll_interval)
+
+    async def run(self) -> None:
+        """Delivers reminders as they fall due until cancelled."""
+        while True:
+            await self.tick()
+            await self.clock.sleep(self.seconds_until_next())
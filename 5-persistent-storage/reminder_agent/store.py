@@ -0,0 +1,82 @@
+from .reminder import Reminder
+
+STATE_KEY = "reminders"
+
+
+def reminder_to_state(reminder: Reminder) -> dict:
+    """Converts a reminder to the dict kept in session state (ISO date and time strings)."""
+    return reminder.model_dump(mode="json")
+
+
+class ReminderStore:
+    """The user's reminders in session state, edited one entry at a time.
+
+    Reminders are stored as plain dicts with ISO date and time strings, so
+    they can be shown and saved as they are. Each operation only parses,
+    validates and rewrites the entry it changes; the rest of the list is left
+    untouched. After a change the list is assigned back to the state so ADK
+    records it in the state delta and saves it.
+
+    This only removes the CPU cost of a change. The list is still one state
+    value, so every change still writes the whole list to the state delta
+    (about 1 MiB at 10k reminders). The tools therefore use ReminderTable
+    instead; this class remains for reading the reminders of older sessions
+    (see `migrate_state_reminders`).
+    """
+
+    def __init__(self, state):
+        """
+        Args:
+            state: The session state, e.g. `tool_context.state`
+        """
+        self.state = state
+
+    def _reminders(self) -> list:
+        return self.state.get(STATE_KEY, [])
+
+    def _save(self, reminders: list):
+        self.state[STATE_KEY] = reminders
+
+    def count(self) -> int:
+        return len(self._reminders())
+
+    def contains(self, index: int) -> bool:
+        """Whether there is a reminder at the 1-based `index`."""
+        return 1 <= index <= self.count()
+
+    def get(self, index: int) -> dict:
+        """Returns the reminder at the 1-based `index`."""
+        return self._reminders()[index - 1]
+
+    def list(self) -> list:
+        """Returns every reminder, as stored."""
+        return self._reminders()
+
+    def add(self, reminder: Reminder) -> int:
+        """Appends a reminder and returns its 1-based index."""
+        reminders = self._reminders()
+        reminders.append(reminder_to_state(reminder))
+        self._save(reminders)
+        return len(reminders)
+
+    def update(self, index: int, **changes) -> dict:
+        """Changes fields of the reminder at the 1-based `index`.
+
+        Only this reminder is validated. It is replaced by a new dict rather
+        than edited in place.
+
+        Returns:
+            The reminder as it was before the change
+        """
+        reminders = self._reminders()
+        old = reminders[index - 1]
+        reminders[index - 1] = reminder_to_state(Reminder.model_validate({**old, **changes}))
+        self._save(reminders)
+        return old
+
+    def delete(self, index: int) -> dict:
+        """Removes the reminder at the 1-based `index` and returns it."""
+        reminders = self._reminders()
+        deleted = reminders.pop(index - 1)
+        self._save(reminders)
+        return deleted
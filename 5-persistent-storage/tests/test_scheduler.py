@@ -0,0 +1,167 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from reminder_agent.database import INSERT_SQL, connect
+from reminder_agent.scheduler import ReminderScheduler
+
+START = datetime(2025, 1, 1, 9, 0, 0)
+
+
+class ManualClock:
+    """A clock that only moves when told to; sleeping advances it instead of waiting."""
+
+    def __init__(self, now: datetime):
+        self.current = now
+
+    def now(self) -> datetime:
+        return self.current
+
+    async def sleep(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "reminders.db"))
+    yield conn
+    conn.close()
+
+
+def add(conn, moment: datetime, description: str, user_id: str = "user-1") -> int:
+    """Inserts a pending reminder due at `moment` and returns its id."""
+    return conn.execute(
+        INSERT_SQL,
+        {
+            "user_id": user_id,
+            "date": moment.strftime("%Y-%m-%d"),
+            "time": moment.strftime("%H:%M:%S"),
+            "description": description,
+            "is_done": False,
+        },
+    ).lastrowid
+
+
+def is_done(conn, reminder_id: int) -> bool:
+    return bool(
+        conn.execute("SELECT is_done FROM reminders WHERE id = ?;", (reminder_id,)).fetchone()[0]
+    )
+
+
+async def simulate(scheduler: ReminderScheduler, clock: ManualClock, seconds: float):
+    """Ticks and sleeps like `run` until the clock has moved `seconds`."""
+    end = clock.now() + timedelta(seconds=seconds)
+    while clock.now() < end:
+        await scheduler.tick()
+        await clock.sleep(min(scheduler.seconds_until_next(), (end - clock.now()).total_seconds()))
+    await scheduler.tick()  # Reminders due at exactly `end`
+
+
+def test_delivers_each_reminder_once_in_order(conn):
+    # Added out of order, spread over several windows and loads of two rows
+    offsets = [7200, 60, 5400, 60, 30, 10800, 600]
+    ids = [add(conn, START + timedelta(seconds=s), f"offset {s}") for s in offsets]
+    clock = ManualClock(START)
+    delivered = []
+    scheduler = ReminderScheduler(conn, on_due=delivered.append, clock=clock, batch_size=2)
+
+    asyncio.run(simulate(scheduler, clock, 4 * 3600))
+
+    expected = [i for _, i in sorted(zip(offsets, ids))]
+    assert [r.id for r in delivered] == expected
+    assert all(r.due <= clock.now() for r in delivered)
+    assert all(is_done(conn, i) for i in ids)
+    assert asyncio.run(scheduler.tick()) == 0
+
+
+def test_does_not_deliver_early(conn):
+    reminder_id = add(conn, START + timedelta(minutes=10), "Later")
+    clock = ManualClock(START)
+    delivered = []
+    scheduler = ReminderScheduler(conn, on_due=delivered.append, clock=clock)
+
+    asyncio.run(simulate(scheduler, clock, 599))
+    assert delivered == []
+    assert not is_done(conn, reminder_id)
+
+    asyncio.run(simulate(scheduler, clock, 1))
+    assert [r.id for r in delivered] == [reminder_id]
+
+
+def test_delivers_reminder_added_while_running(conn):
+    first = add(conn, START + timedelta(minutes=1), "First")
+    last = add(conn, START + timedelta(minutes=30), "Last")
+    clock = ManualClock(START)
+    delivered = []
+    scheduler = ReminderScheduler(conn, on_due=delivered.append, clock=clock)
+
+    async def scenario():
+        await simulate(scheduler, clock, 120)
+        # Within the window already loaded, so only the poll for new ids finds it
+        added = add(conn, START + timedelta(minutes=5), "Added while running")
+        await simulate(scheduler, clock, 3600)
+        return added
+
+    added = asyncio.run(scenario())
+    assert [r.id for r in delivered] == [first, added, last]
+
+
+def test_skips_deleted_and_done_reminders(conn):
+    deleted = add(conn, START + timedelta(minutes=1), "Deleted")
+    marked_done = add(conn, START + timedelta(minutes=2), "Marked done")
+    kept = add(conn, START + timedelta(minutes=3), "Kept")
+    clock = ManualClock(START)
+    delivered = []
+    scheduler = ReminderScheduler(conn, on_due=delivered.append, clock=clock)
+
+    async def scenario():
+        await scheduler.tick()  # Loads all three into the heap
+        conn.execute("DELETE FROM reminders WHERE id = ?;", (deleted,))
+        conn.execute("UPDATE reminders SET is_done = 1 WHERE id = ?;", (marked_done,))
+        await simulate(scheduler, clock, 600)
+
+    asyncio.run(scenario())
+    assert [r.id for r in delivered] == [kept]
+    assert scheduler.stats["skipped"] == 2
+    assert scheduler.stats["delivered"] == 1
+
+
+def test_delivers_latest_description(conn):
+    reminder_id = add(conn, START + timedelta(minutes=1), "Before")
+    clock = ManualClock(START)
+    delivered = []
+    scheduler = ReminderScheduler(conn, on_due=delivered.append, clock=clock)
+
+    async def scenario():
+        await scheduler.tick()
+        conn.execute("UPDATE reminders SET description = 'After' WHERE id = ?;", (reminder_id,))
+        await simulate(scheduler, clock, 60)
+
+    asyncio.run(scenario())
+    assert [r.description for r in delivered] == ["After"]
+
+
+def test_failing_callback_leaves_reminder_pending(conn):
+    failing = add(conn, START + timedelta(minutes=1), "Fails")
+    other = add(conn, START + timedelta(minutes=2), "Delivered")
+    clock = ManualClock(START)
+    delivered = []
+
+    async def on_due(reminder):
+        if reminder.id == failing:
+            raise RuntimeError("callback failed")
+        delivered.append(reminder)
+
+    scheduler = ReminderScheduler(conn, on_due=on_due, clock=clock)
+    asyncio.run(simulate(scheduler, clock, 600))
+
+    assert [r.id for r in delivered] == [other]
+    assert scheduler.stats["delivered"] == 1
+    assert not is_done(conn, failing)
+    assert is_done(conn, other)
+
+    # Still pending, so a restarted scheduler delivers it
+    restarted = ReminderScheduler(conn, on_due=delivered.append, clock=clock)
+    asyncio.run(restarted.tick())
+    assert [r.id for r in delivered] == [other, failing]
+    assert is_done(conn, failing)
@@ -1,4 +1,28 @@
+import os
+from datetime import datetime
+
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.state import State
 from google.genai import types
+from reminder_agent.database import ReminderTable, get_connection
+from reminder_agent.prompt import UPCOMING_REMINDERS, reminder_counts, upcoming_reminders
+
+try:
+    # Not part of ADK's public API; read_session_state uses get_session without them
+    from google.adk.sessions.database_session_service import (
+        StorageAppState,
+        StorageSession,
+        StorageUserState,
+    )
+except ImportError:
+    StorageSession = None
+
+# How call_agent_async shows the state around each query:
+#   "session" - get_session before and after, loading every event of the session
+#   "state"   - read only the state before and after
+#   "delta"   - read only the state before, then apply the run's state deltas to it
+STATE_VIEW = os.getenv("STATE_VIEW", "delta")
 
 
 # ANSI color codes for terminal output
@@ -28,34 +52,118 @@ class Colors:
     BG_WHITE = "\033[47m"
 
 
-async def display_state(
-    session_service, app_name, user_id, session_id, label="Current State"
-):
-    """Display the current session state in a formatted way."""
-    try:
+async def read_session_state(session_service, app_name, user_id, session_id):
+    """Read a session's state without loading its events.
+
+    DatabaseSessionService.get_session also loads every event of the session,
+    which grows with the conversation. For that service the session, user and
+    app state rows are read directly and merged the way get_session merges
+    them; other services, or ADK versions without those storage classes, fall
+    back to get_session with a single event.
+    """
+    if StorageSession is None or not isinstance(session_service, DatabaseSessionService):
         session = await session_service.get_session(
-            app_name=app_name, user_id=user_id, session_id=session_id
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=GetSessionConfig(num_recent_events=1),
         )
+        return session.state if session else None
+
+    with session_service.database_session_factory() as db:
+        storage_session = db.get(StorageSession, (app_name, user_id, session_id))
+        if storage_session is None:
+            return None
+        app_state = db.get(StorageAppState, app_name)
+        user_state = db.get(StorageUserState, (app_name, user_id))
 
-        # Format the output with clear sections
-        print(f"\n{'-' * 10} {label} {'-' * 10}")
+        state = dict(storage_session.state)
+        for prefix, scoped in ((State.APP_PREFIX, app_state), (State.USER_PREFIX, user_state)):
+            if scoped:
+                state.update({prefix + key: value for key, value in scoped.state.items()})
+        return state
+
+
+def print_state(state, user_id, label="Current State", changed=None):
+    """Print a session state in a formatted way, optionally naming the keys that changed."""
+    # Format the output with clear sections
+    print(f"\n{'-' * 10} {label} {'-' * 10}")
+
+    # Handle the user name
+    user_name = state.get("user_name", "Unknown")
+    print(f"👤 User: {user_name}")
+
+    # Handle reminders, which are kept in their own table. Only the counts and
+    # the next few are shown, so this stays cheap however many there are.
+    table = ReminderTable(get_connection(), user_id)
+    total, done = reminder_counts(table)
+    if total:
+        print(f"📝 Reminders: {total} in total, {total - done} pending, {done} done")
+        for reminder in upcoming_reminders(table, datetime.now(), UPCOMING_REMINDERS):
+            print(f"  {reminder['index']}. {reminder}")
+    else:
+        print("📝 Reminders: None")
+
+    if changed is not None:
+        print(f"✏️  Changed: {', '.join(changed) if changed else 'nothing'}")
+
+    print("-" * (22 + len(label)))
+
+
+async def display_state(
+    session_service, app_name, user_id, session_id, label="Current State", state_only=True
+):
+    """Display the current session state in a formatted way.
 
-        # Handle the user name
-        user_name = session.state.get("user_name", "Unknown")
-        print(f"👤 User: {user_name}")
+    Args:
+        state_only: Read just the state (see read_session_state) instead of the
+                    whole session with its events
 
-        # Handle reminders
-        reminders = session.state.get("reminders", [])
-        if reminders:
-            print("📝 Reminders:")
-            for idx, reminder in enumerate(reminders, 1):
-                print(f"  {idx}. {reminder}")
+    Returns:
+        The state displayed, or None if it could not be read
+    """
+    try:
+        if state_only:
+            state = await read_session_state(session_service, app_name, user_id, session_id)
         else:
-            print("📝 Reminders: None")
+            session = await session_service.get_session(
+                app_name=app_name, user_id=user_id, session_id=session_id
+            )
+            state = session.state if session else None
+        if state is None:
+            print(f"Error displaying state: session {session_id} not found")
+            return None
 
-        print("-" * (22 + len(label)))
+        print_state(state, user_id, label)
+        return state
     except Exception as e:
         print(f"Error displaying state: {e}")
+        return None
+
+
+def display_state_changes(state, state_delta, user_id, label="Current State"):
+    """Display a state with a run's state deltas applied, without reading the session again.
+
+    Args:
+        state: The state before the run
+        state_delta: The run's state deltas merged in event order
+
+    Returns:
+        The state after the run
+    """
+    # temp: keys only live for one invocation and are never saved
+    changed = [key for key in state_delta if not key.startswith(State.TEMP_PREFIX)]
+    state = {**state, **{key: state_delta[key] for key in changed}}
+    print_state(state, user_id, label, changed=changed)
+    return state
+
+
+def display_due_reminder(reminder):
+    """Announce a reminder that has fallen due."""
+    print(
+        f"\n{Colors.BG_YELLOW}{Colors.BLACK}{Colors.BOLD}⏰ Reminder ({reminder.date} {reminder.time}): "
+        f"{reminder.description}{Colors.RESET}"
+    )
 
 
 async def process_agent_response(event):
@@ -113,27 +221,37 @@ async def process_agent_response(event):
     return final_response
 
 
-async def call_agent_async(runner, user_id, session_id, query):
-    """Call the agent asynchronously with the user's query."""
+async def call_agent_async(runner, user_id, session_id, query, state_view=STATE_VIEW):
+    """Call the agent asynchronously with the user's query.
+
+    Args:
+        state_view: How to show the state before and after the query; see STATE_VIEW
+    """
     content = types.Content(role="user", parts=[types.Part(text=query)])
     print(
         f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Running Query: {query} ---{Colors.RESET}"
     )
     final_response_text = None
+    state_only = state_view != "session"
 
     # Display state before processing
-    await display_state(
+    state = await display_state(
         runner.session_service,
         runner.app_name,
         user_id,
         session_id,
         "State BEFORE processing",
+        state_only=state_only,
     )
 
+    # State changes made during the run, in event order
+    state_delta = {}
     try:
         async for event in runner.run_async(
             user_id=user_id, session_id=session_id, new_message=content
         ):
+            if event.actions and event.actions.state_delta:
+                state_delta.update(event.actions.state_delta)
             # Process each event and get the final response if available
             response = await process_agent_response(event)
             if response:
@@ -142,12 +260,16 @@ async def call_agent_async(runner, user_id, session_id, query):
         print(f"Error during agent call: {e}")
 
     # Display state after processing the message
-    await display_state(
-        runner.session_service,
-        runner.app_name,
-        user_id,
-        session_id,
-        "State AFTER processing",
-    )
+    if state_view == "delta" and state is not None:
+        display_state_changes(state, state_delta, user_id, "State AFTER processing")
+    else:
+        await display_state(
+            runner.session_service,
+            runner.app_name,
+            user_id,
+            session_id,
+            "State AFTER processing",
+            state_only=state_only,
+        )
 
-    return final_response_text
\ No newline at end of file
+    return final_response_text
@@ -0,0 +1,169 @@
+import re
+import threading
+from collections import Counter
+
+from query import QueryShape, quote_identifier
+
+# Filter operators an index can answer by seeking to a key.
+EQUALITY_OPERATORS = {"=", "IN", "IS NULL"}
+RANGE_OPERATORS = {"<", "<=", ">", ">="}
+MAX_INDEX_COLUMNS = 6  # Longer indexes cost more to maintain than they save
+# EXPLAIN QUERY PLAN steps that read a whole table row by row ("SCAN TABLE x" before SQLite 3.36).
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\S+)(?: AS \S+)?$")
+
+
+def summarise_plan(plan_rows) -> dict:
+    """Turns EXPLAIN QUERY PLAN rows (id, parent, notused, detail) into a readable plan.
+
+    Returns:
+        dict: 'plan' (list[str], one step per line, indented under its parent),
+              'full_scans' (list[str], tables read row by row) and 'temp_sort'
+              (bool, whether rows are sorted in a temporary B-tree).
+    """
+    depths = {0: -1}
+    lines, full_scans, temp_sort = [], [], False
+    for step_id, parent, _, detail in plan_rows:
+        depths[step_id] = depths.get(parent, -1) + 1
+        lines.append("  " * depths[step_id] + detail)
+        match = FULL_SCAN_PATTERN.match(detail)
+        if match:
+            full_scans.append(match.group(1))
+        temp_sort = temp_sort or detail.startswith("USE TEMP B-TREE")
+    return {"plan": lines, "full_scans": full_scans, "temp_sort": temp_sort}
+
+
+def index_columns(shape: QueryShape, table: dict) -> tuple[tuple, tuple]:
+    """Designs an index for one query shape.
+
+    Equality-filtered columns come first, then either the first range-filtered
+    column or the ORDER BY columns, so SQLite can seek straight to the matching
+    rows and read them already sorted. When the query names its columns, the
+    remaining ones are appended if that keeps the index short, making it
+    covering. `SELECT *` queries are not covered, which would copy the table.
+
+    Returns:
+        tuple: The key columns (empty if no index would help) and the extra
+               columns that make the index covering.
+    """
+    key = []
+    for column, operator, _ in shape.filters:
+        if operator in EQUALITY_OPERATORS and column not in key:
+            key.append(column)
+    ranges = [c for c, operator, _ in shape.filters if operator in RANGE_OPERATORS and c not in key]
+    directions = {direction for _, direction in shape.order_by}
+    if ranges:
+        key.append(ranges[0])
+    elif len(directions) == 1:
+        key.extend(c for c, _ in shape.order_by if c not in key)
+
+    # Every index implicitly ends with the table's key: the rowid (which an
+    # INTEGER PRIMARY KEY aliases) or a WITHOUT ROWID table's primary key.
+    if table["key_columns"] == ["rowid"]:
+        row_key = [
+            column["name"]
+            for column in table["columns"]
+            if column["primary_key"] and column["type"].upper() == "INTEGER"
+        ]
+        implicit = {"rowid", *row_key}
+    else:
+        row_key = list(table["key_columns"])
+        implicit = set(row_key)
+    key = [c for c in key if c not in implicit]
+    if not key:
+        return (), ()
+
+    extra = [c for c in shape.columns if c not in key and c not in implicit]
+    if extra and not ranges and len(directions) < 2:
+        # Pages are read in table-key order after the key columns, so the
+        # table key must come before the covered columns to avoid a sort.
+        extra = row_key + extra if row_key else []
+    if len(key) + len(extra) > MAX_INDEX_COLUMNS:
+        extra = []
+    return tuple(key), tuple(extra)
+
+
+def is_served(key: tuple, table: dict) -> bool:
+    """Whether an existing index already starts with the `key` columns."""
+    return any(tuple(index["columns"][: len(key)]) == key for index in table["indexes"])
+
+
+class IndexAdvisor:
+    """Suggests indexes for the query shapes the server has actually executed.
+
+    Shapes are counted, not their parameter values, so a tool called with many
+    different filter values still counts as one shape.
+    """
+
+    def __init__(self, max_shapes: int = 512):
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._shapes = Counter()
+
+    def record(self, shape: QueryShape):
+        with self._lock:
+            if shape in self._shapes or len(self._shapes) < self.max_shapes:
+                self._shapes[shape] += 1
+
+    def shapes_seen(self) -> int:
+        with self._lock:
+            return len(self._shapes)
+
+    def suggest(self, tables: dict, table_name: str | None = None, shapes=None) -> list[dict]:
+        """Proposes indexes for recorded query shapes, most-used first.
+
+        Args:
+            tables: The schema catalog, as returned by `SchemaCatalog.refresh`.
+            table_name: Only suggest indexes for this table.
+            shapes: Shapes to consider instead of the recorded ones.
+
+        Returns:
+            list[dict]: One entry per index with its 'table', 'columns',
+                        'covering' flag, the number of 'queries' it serves and
+                        the 'sql' that creates it.
+        """
+        if shapes is None:
+            with self._lock:
+                shapes = list(self._shapes.items())
+        else:
+            shapes = [(shape, 1) for shape in shapes]
+
+        candidates = {}  # (table, key, extra) -> calls served
+        for shape, calls in shapes:
+            table = tables.get(shape.table)
+            if table is None or table["type"] != "table":
+                continue
+            if table_name and shape.table != table_name:
+                continue
+            key, extra = index_columns(shape, table)
+            if key and not is_served(key, table):
+                candidates[(shape.table, key, extra)] = (
+                    candidates.get((shape.table, key, extra), 0) + calls
+                )
+
+        # A longer index also serves every candidate that is a prefix of it.
+        merged = []  # [table, columns, covering, calls]
+        for (table, key, extra), calls in sorted(
+            candidates.items(), key=lambda item: len(item[0][1] + item[0][2]), reverse=True
+        ):
+            columns = key + extra
+            for entry in merged:
+                if entry[0] == table and entry[1][: len(columns)] == columns:
+                    entry[3] += calls
+                    break
+            else:
+                merged.append([table, columns, bool(extra), calls])
+
+        suggestions = []
+        for table, columns, covering, calls in merged:
+            name = "idx_" + "_".join((table,) + columns)
+            suggestions.append(
+                {
+                    "table": table,
+                    "columns": list(columns),
+                    "covering": covering,
+                    "queries": calls,
+                    "sql": f"CREATE INDEX IF NOT EXISTS {quote_identifier(name)} ON "
+                    f"{quote_identifier(table)} ({', '.join(quote_identifier(c) for c in columns)});",
+                }
+            )
+        return sorted(suggestions, key=lambda s: s["queries"], reverse=True)
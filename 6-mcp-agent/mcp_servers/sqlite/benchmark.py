@@ -0,0 +1,1113 @@
+"""Micro-benchmarks for the SQLite MCP server.
+
+Run from this directory, e.g.:
+
+    python benchmark.py pool --calls 2000
+    python benchmark.py pagination --rows 200000
+    python benchmark.py manifest --calls 2000
+    python benchmark.py encoding --rows 200000
+    python benchmark.py transport --calls 200 --connects 5 --clients 4
+    python benchmark.py startup --runs 5 --max-handshake-ms 1500
+    python benchmark.py indexes --rows 1000000 --runs 5
+    python benchmark.py aggregate --rows 200000
+    python benchmark.py join --rows 200000
+    python benchmark.py batch --runs 20
+    python benchmark.py budget --rows 200000 --runs 5
+    python benchmark.py search --rows 1000000 --runs 5
+    python benchmark.py suite --users 10000 --rows 5000000 --output results.json
+    python benchmark.py readers --rows 200000 --seconds 3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import db
+import server
+from advisor import IndexAdvisor
+from budget import BudgetExceededError, QueryBudget, QueryBudgets
+from cache import ResultCache
+from catalog import SchemaCatalog
+from executor import ToolExecutor
+from metrics import percentile
+from pool import ConnectionPool
+
+
+# --- Helpers ---
+def create_temp_database(directory: str) -> str:
+    """Creates and seeds a throwaway copy of the demo database."""
+    database_path = os.path.join(directory, "benchmark.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.initialise(database_path)
+    return database_path
+
+
+@contextlib.contextmanager
+def use_database(database_path: str, pool_size: int):
+    """Points the server's pools, schema catalog, result cache and index advisor at another database."""
+    original = server.POOL, server.READ_POOL, server.CATALOG, server.RESULT_CACHE, server.ADVISOR
+    server.POOL = ConnectionPool(database_path, size=pool_size)
+    with server.POOL.connection():
+        pass  # Switch the database to WAL before any reader connects
+    server.READ_POOL = ConnectionPool(database_path, size=pool_size, read_only=True)
+    server.CATALOG = SchemaCatalog()
+    server.RESULT_CACHE = ResultCache(database_path, max_entries=server.RESULT_CACHE_SIZE)
+    server.ADVISOR = IndexAdvisor()
+    try:
+        yield server.POOL
+    finally:
+        server.POOL.close()
+        server.READ_POOL.close()
+        server.RESULT_CACHE.close()
+        (
+            server.POOL,
+            server.READ_POOL,
+            server.CATALOG,
+            server.RESULT_CACHE,
+            server.ADVISOR,
+        ) = original
+
+
+def seed_todos(database_path: str, rows: int, users: int = 3):
+    """Adds `rows` synthetic todos spread across `users` user IDs (the demo has 3 users)."""
+    conn = sqlite3.connect(database_path)
+    conn.executemany(
+        "INSERT INTO todos (user_id, task, completed) VALUES (?, ?, ?)",
+        ((i % users + 1, f"Synthetic task number {i}", i % 2) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def calls_per_second(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return calls / (time.perf_counter() - start)
+
+
+def peak_rss_mb() -> float:
+    """The process's peak resident set size so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)  # Bytes on macOS, KiB on Linux
+
+
+def print_table(title: str, header: tuple, rows: list[tuple]):
+    cells = [header] + [
+        tuple(f"{v:.1f}" if isinstance(v, float) else str(v) for v in row) for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+    print(f"\n{title}")
+    for index, row in enumerate(cells):
+        print(" | ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print("-+-".join("-" * width for width in widths))
+
+
+# --- Benchmarks ---
+def bench_pool(args):
+    """Compares per-call connections (the old behaviour) with the pool."""
+
+    @contextlib.contextmanager
+    def unpooled_connection(read_only: bool = False):
+        conn = sqlite3.connect(database_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    tool_calls = {
+        "list_db_tables": lambda: server.list_db_tables("benchmark"),
+        "get_table_schema": lambda: server.get_table_schema("todos"),
+        "query_db_table": lambda: server.query_db_table(
+            "todos", "*", filters=[{"column": "completed", "value": 0}]
+        ),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        original = server.get_db_connection
+
+        rows = []
+        with use_database(database_path, args.pool_size) as pooled:
+            try:
+                for tool_name, call in tool_calls.items():
+                    server.get_db_connection = unpooled_connection
+                    before = calls_per_second(call, args.calls)
+                    server.get_db_connection = lambda read_only=False: pooled.connection()
+                    call()  # Warm up the pooled connection
+                    after = calls_per_second(call, args.calls)
+                    rows.append((tool_name, before, after, f"{after / before:.2f}x"))
+            finally:
+                server.get_db_connection = original
+
+    print_table(
+        f"Calls per second ({args.calls} calls per tool)",
+        ("tool", "per-call connect", "pooled", "speedup"),
+        rows,
+    )
+
+
+def bench_pagination(args):
+    """Peak Python memory of reading a whole table vs. one capped page."""
+
+    def fetch_everything():
+        with server.get_db_connection() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM todos;").fetchall()]
+
+    def fetch_page():
+        return server.query_db_table("todos", "*")
+
+    def measure(func):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rows = len(result) if isinstance(result, list) else result["row_count"]
+        return rows, elapsed, peak / 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        seed_todos(database_path, args.rows)
+        with use_database(database_path, args.pool_size):
+            rows = [
+                ("fetchall (before)", *measure(fetch_everything)),
+                ("paged fetchmany", *measure(fetch_page)),
+            ]
+
+    print_table(
+        f"Reading a {args.rows}-row todos table",
+        ("strategy", "rows returned", "time (ms)", "peak memory (KiB)"),
+        rows,
+    )
+
+
+def bench_manifest(args):
+    """Times list_tools requests with and without the cached tool manifest."""
+
+    async def list_tools_uncached():
+        return server.build_mcp_tool_manifest()
+
+    async def time_requests(handler) -> float:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            await handler()
+        return (time.perf_counter() - start) / args.calls * 1_000_000
+
+    async def run():
+        await server.list_mcp_tools()  # Build the cache outside the timed loop
+        return (
+            await time_requests(list_tools_uncached),
+            await time_requests(server.list_mcp_tools),
+        )
+
+    before, after = asyncio.run(run())
+    print_table(
+        f"list_tools latency ({args.calls} requests, {len(server.DB_TOOLS)} tools)",
+        ("manifest", "us per request", "speedup"),
+        [("rebuilt per request", before, "1.00x"), ("cached", after, f"{before / after:.0f}x")],
+    )
+
+
+def bench_encoding(args):
+    """Response size and serialisation time of the old and compact encodings."""
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        seed_todos(database_path, args.rows)
+        conn = sqlite3.connect(database_path)
+        cursor = conn.execute("SELECT * FROM todos;")
+        columns = [description[0] for description in cursor.description]
+        rows = [list(row) for row in cursor.fetchall()]
+        conn.close()
+
+    records = {"success": True, "rows": [dict(zip(columns, row)) for row in rows]}
+    columnar = {"success": True, "columns": columns, "rows": rows}
+    encodings = [
+        ("indented records (before)", lambda: json.dumps(records, indent=2)),
+        ("pretty", lambda: server.encode_response(columnar, "pretty")),
+        ("compact columnar", lambda: server.encode_response(columnar, "compact")),
+    ]
+
+    results = []
+    for label, encode in encodings:
+        start = time.perf_counter()
+        text = encode()
+        elapsed = (time.perf_counter() - start) * 1000
+        results.append((label, len(text.encode()) / 1024, elapsed))
+    baseline_size, baseline_time = results[0][1], results[0][2]
+    print_table(
+        f"Encoding {len(rows)} todos rows",
+        ("encoding", "size (KiB)", "time (ms)", "size vs before", "time vs before"),
+        [
+            (label, size, elapsed, f"{size / baseline_size:.0%}", f"{elapsed / baseline_time:.0%}")
+            for label, size, elapsed in results
+        ],
+    )
+
+
+def bench_transport(args):
+    """Connect latency and request throughput of the stdio and HTTP transports."""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    from mcp.client.streamable_http import streamablehttp_client
+
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    call_args = {"table_name": "todos", "columns": "*", "use_cache": False}
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/mcp"
+
+    @contextlib.asynccontextmanager
+    async def stdio_session():
+        params = StdioServerParameters(command=sys.executable, args=[script_path])
+        async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+
+    @contextlib.asynccontextmanager
+    async def http_session():
+        async with streamablehttp_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                yield session
+
+    async def connect_ms(open_session) -> float:
+        timings = []
+        for _ in range(args.connects):
+            start = time.perf_counter()
+            async with open_session() as session:
+                timings.append(time.perf_counter() - start)
+                await session.list_tools()
+        return sorted(timings)[len(timings) // 2] * 1000
+
+    async def calls_per_second_over(open_session, clients: int) -> float:
+        async def client():
+            async with open_session() as session:
+                for _ in range(args.calls):
+                    await session.call_tool("query_db_table", call_args)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return clients * args.calls / (time.perf_counter() - start)
+
+    async def wait_for_http_server(timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise TimeoutError("HTTP server did not start.")
+
+    async def run():
+        rows = [
+            (
+                "stdio (process per client)",
+                await connect_ms(stdio_session),
+                await calls_per_second_over(stdio_session, 1),
+                await calls_per_second_over(stdio_session, args.clients),
+            )
+        ]
+        http_server = subprocess.Popen(
+            [sys.executable, script_path, "--transport", "http", "--port", str(port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            await wait_for_http_server()
+            rows.append(
+                (
+                    "http (shared server)",
+                    await connect_ms(http_session),
+                    await calls_per_second_over(http_session, 1),
+                    await calls_per_second_over(http_session, args.clients),
+                )
+            )
+        finally:
+            http_server.terminate()
+            http_server.wait()
+        return rows
+
+    print_table(
+        f"Transports (median of {args.connects} connects, {args.calls} calls per client)",
+        ("transport", "connect (ms)", "calls/s, 1 client", f"calls/s, {args.clients} clients"),
+        asyncio.run(run()),
+    )
+
+
+def bench_startup(args):
+    """Time from launching server.py over stdio to a completed MCP handshake.
+
+    Exits with status 1 if the median exceeds --max-handshake-ms, or if the
+    lean tool schemas no longer match the ones the ADK would generate.
+    """
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+    def median_ms(timings: list[float]) -> float:
+        return sorted(timings)[len(timings) // 2] * 1000
+
+    def process_ms(code: str) -> float:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            timings.append(time.perf_counter() - start)
+        return median_ms(timings)
+
+    async def handshake_ms() -> tuple[float, float]:
+        handshakes, first_tool_lists = [], []
+        params = StdioServerParameters(command=sys.executable, args=[script_path])
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            async with stdio_client(params, errlog=open(os.devnull, "w")) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    handshakes.append(time.perf_counter() - start)
+                    await session.list_tools()
+                    first_tool_lists.append(time.perf_counter() - start)
+        return median_ms(handshakes), median_ms(first_tool_lists)
+
+    handshake, first_tool_list = asyncio.run(handshake_ms())
+    rows = [
+        ("python -c pass", process_ms("pass")),
+        ("import google.adk FunctionTool (no longer loaded)", process_ms(
+            "import google.adk.tools.function_tool"
+        )),
+        ("server.py: handshake complete", handshake),
+        ("server.py: first list_tools", first_tool_list),
+    ]
+    print_table(f"Cold start (median of {args.runs} runs)", ("step", "time (ms)"), rows)
+
+    failures = []
+    if handshake > args.max_handshake_ms:
+        failures.append(
+            f"Time to handshake {handshake:.0f} ms exceeds the {args.max_handshake_ms:.0f} ms threshold."
+        )
+    try:
+        from google.adk.tools.function_tool import FunctionTool
+        from google.adk.tools.mcp_tool.conversion_utils import adk_to_mcp_tool_type
+    except ImportError:
+        print("\nSchema parity: skipped (google-adk is not installed).")
+    else:
+        drifted = [
+            tool.name
+            for tool in server.DB_TOOLS.values()
+            if adk_to_mcp_tool_type(FunctionTool(func=tool.func)).inputSchema != tool.input_schema
+        ]
+        if drifted:
+            failures.append(f"Tool schemas differ from the ADK's: {', '.join(drifted)}.")
+        else:
+            print(f"\nSchema parity: all {len(server.DB_TOOLS)} tool schemas match the ADK's.")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+def bench_indexes(args):
+    """Full scans vs. the index advisor's indexes on a large todos table."""
+    users = max(args.rows // 100, 1)  # About 100 todos per user
+    queries = {
+        "one user's open todos": dict(
+            columns="id, task",
+            filters=[
+                {"column": "user_id", "value": users // 2},
+                {"column": "completed", "value": 0},
+            ],
+        ),
+        "todo by exact task": dict(
+            columns="*",
+            filters=[{"column": "task", "value": f"Synthetic task number {args.rows // 2}"}],
+        ),
+    }
+
+    def median_ms(arguments: dict) -> float:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            server.query_db_table("todos", use_cache=False, **arguments)
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2] * 1000
+
+    def plan(arguments: dict) -> str:
+        return " / ".join(server.explain_query("todos", **arguments)["plan"])
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        seed_todos(database_path, args.rows, users)
+        with use_database(database_path, args.pool_size):
+            before = {label: (plan(q), median_ms(q)) for label, q in queries.items()}
+            start = time.perf_counter()
+            created = server.create_suggested_indexes("todos")["created"]
+            build_seconds = time.perf_counter() - start
+            after = {label: (plan(q), median_ms(q)) for label, q in queries.items()}
+
+    print_table(
+        f"query_db_table on {args.rows} todos (median of {args.runs} runs, cache off)",
+        ("query", "plan before", "ms", "plan after", "ms", "speedup"),
+        [
+            (label, *before[label], *after[label], f"{before[label][1] / after[label][1]:.0f}x")
+            for label in queries
+        ],
+    )
+    print(f"\nIndexes created in {build_seconds:.1f}s:")
+    for index in created:
+        print(f"  {index['sql']}")
+
+
+def bench_aggregate(args):
+    """Open todos per user: paging every row to the client vs. the aggregate tool."""
+    filters = [{"column": "completed", "value": 0}]
+
+    def page_and_count():
+        counts, page_token, calls, response_bytes = {}, None, 0, 0
+        while True:
+            page = server.query_db_table(
+                "todos", "user_id", filters=filters, page_token=page_token, use_cache=False
+            )
+            calls += 1
+            response_bytes += len(server.encode_response(page))
+            for (user_id,) in page["rows"]:
+                counts[user_id] = counts.get(user_id, 0) + 1
+            page_token = page["next_page_token"]
+            if not page_token:
+                return counts, calls, response_bytes
+
+    def aggregate():
+        result = server.aggregate(
+            "todos", [{"function": "count"}], group_by=["user_id"], filters=filters, use_cache=False
+        )
+        return dict(result["rows"]), 1, len(server.encode_response(result))
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        seed_todos(database_path, args.rows)
+        with use_database(database_path, args.pool_size):
+            results = []
+            for label, func in (("page through rows", page_and_count), ("aggregate", aggregate)):
+                start = time.perf_counter()
+                counts, calls, response_bytes = func()
+                elapsed = (time.perf_counter() - start) * 1000
+                results.append((label, counts, calls, response_bytes / 1024, elapsed))
+
+    if results[0][1] != results[1][1]:
+        raise SystemExit("The aggregate tool's counts differ from counting the rows.")
+    print_table(
+        f"Open todos per user over {args.rows} todos",
+        ("strategy", "tool calls", "response size (KiB)", "time (ms)"),
+        [(label, calls, size, elapsed) for label, _, calls, size, elapsed in results],
+    )
+
+
+def bench_join(args):
+    """A page of open todos with their owners' usernames: N+1 lookups vs. join_tables."""
+    users = max(args.rows // 100, 3)
+    filters = [{"column": "completed", "value": 0}]
+
+    def lookup_each_owner():
+        todos = server.query_db_table("todos", "task, user_id", filters=filters, use_cache=False)
+        calls, response_bytes, usernames = 1, len(server.encode_response(todos)), {}
+        for _, user_id in todos["rows"]:
+            if user_id not in usernames:
+                user = server.query_db_table(
+                    "users", "username", filters=[{"column": "id", "value": user_id}], use_cache=False
+                )
+                calls += 1
+                response_bytes += len(server.encode_response(user))
+                usernames[user_id] = user["rows"][0][0]
+        return [[task, usernames[user_id]] for task, user_id in todos["rows"]], calls, response_bytes
+
+    def join():
+        result = server.join_tables(
+            "todos",
+            [{"table": "users"}],
+            columns=["todos.task", "users.username"],
+            filters=[{"column": "todos.completed", "value": 0}],
+            use_cache=False,
+        )
+        return result["rows"], 1, len(server.encode_response(result))
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        conn = sqlite3.connect(database_path)
+        conn.executemany(
+            "INSERT INTO users (username, email) VALUES (?, ?)",
+            ((f"user{i}", f"user{i}@example.com") for i in range(4, users + 1)),
+        )
+        conn.commit()
+        conn.close()
+        seed_todos(database_path, args.rows, users)
+        with use_database(database_path, args.pool_size):
+            results = []
+            for label, func in (("query + lookup per owner", lookup_each_owner), ("join_tables", join)):
+                start = time.perf_counter()
+                rows, calls, response_bytes = func()
+                elapsed = (time.perf_counter() - start) * 1000
+                results.append((label, rows, calls, response_bytes / 1024, elapsed))
+
+    if results[0][1] != results[1][1]:
+        raise SystemExit("join_tables returned different rows than the per-owner lookups.")
+    print_table(
+        f"First page of open todos with usernames ({args.rows} todos, {users} users)",
+        ("strategy", "tool calls", "response size (KiB)", "time (ms)"),
+        [(label, calls, size, elapsed) for label, _, calls, size, elapsed in results],
+    )
+
+
+def bench_batch(args):
+    """One agent step of several tool calls: a round trip per call vs. one batch, over HTTP."""
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/mcp"
+    step = [
+        {"tool": "get_table_schema", "arguments": {"table_name": "users"}},
+        {"tool": "get_table_schema", "arguments": {"table_name": "todos"}},
+        {"tool": "query_db_table", "arguments": {"table_name": "users", "use_cache": False}},
+        {"tool": "aggregate", "arguments": {
+            "table_name": "todos", "aggregates": [{"function": "count"}], "group_by": ["completed"],
+            "use_cache": False,
+        }},
+        {"tool": "insert_data", "arguments": {
+            "table_name": "todos", "data": {"user_id": 1, "task": "Batch benchmark", "completed": 0},
+        }},
+        {"tool": "delete_data", "arguments": {
+            "table_name": "todos", "filters": [{"column": "task", "value": "Batch benchmark"}],
+        }},
+    ]
+
+    async def one_call_per_tool(session):
+        for call in step:
+            result = await session.call_tool(call["tool"], call["arguments"])
+            if result.isError:
+                raise SystemExit(f"{call['tool']} failed: {result.content[0].text}")
+
+    async def batched(session, atomic: bool):
+        result = await session.call_tool("batch", {"calls": step, "atomic": atomic})
+        if not json.loads(result.content[0].text)["success"]:
+            raise SystemExit(f"batch failed: {result.content[0].text}")
+
+    async def wait_for_http_server(timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                    return
+            except OSError:
+                await asyncio.sleep(0.1)
+        raise TimeoutError("HTTP server did not start.")
+
+    async def run():
+        rows = []
+        async with streamablehttp_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                for label, calls, func in (
+                    ("one round trip per tool", len(step), one_call_per_tool),
+                    ("batch", 1, lambda s: batched(s, False)),
+                    ("batch (atomic)", 1, lambda s: batched(s, True)),
+                ):
+                    await func(session)  # Warm up
+                    timings = []
+                    for _ in range(args.runs):
+                        start = time.perf_counter()
+                        await func(session)
+                        timings.append((time.perf_counter() - start) * 1000)
+                    timings.sort()
+                    rows.append((label, calls, percentile(timings, 0.5), percentile(timings, 0.95)))
+        return rows
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.initialise()
+    http_server = subprocess.Popen(
+        [sys.executable, script_path, "--transport", "http", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(wait_for_http_server())
+        rows = asyncio.run(run())
+    finally:
+        http_server.terminate()
+        http_server.wait()
+    print_table(
+        f"An agent step of {len(step)} tool calls over HTTP ({args.runs} runs)",
+        ("strategy", "requests", "p50 (ms)", "p95 (ms)"),
+        rows,
+    )
+
+
+def bench_budget(args):
+    """Progress-handler overhead on a full scan, and how long a runaway delete blocks a writer."""
+    unlimited = QueryBudgets(QueryBudget(max_rows=server.MAX_PAGE_SIZE))
+    budgeted = QueryBudgets(QueryBudget(timeout=0.25, max_rows=server.MAX_PAGE_SIZE))
+    # A self-join with no usable index: ~16M row pairs, so it runs for seconds.
+    runaway = "id IN (SELECT a.id FROM todos a, todos b WHERE a.id <= 4000 AND b.id <= 4000 AND a.id + b.id < 0)"
+
+    def full_scan_ms() -> float:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            server.aggregate(
+                "todos", [{"function": "count"}], group_by=["completed"],
+                filters=[{"column": "task", "operator": "like", "value": "%7%"}], use_cache=False,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        return sorted(timings)[len(timings) // 2]
+
+    def runaway_delete() -> tuple:
+        """Runs the runaway delete while another caller inserts; returns both latencies."""
+        results = {}
+
+        def delete():
+            start = time.perf_counter()
+            try:
+                server.delete_data("todos", condition=runaway)
+                results["outcome"] = "completed"
+            except BudgetExceededError:
+                results["outcome"] = "cancelled"
+            results["delete"] = (time.perf_counter() - start) * 1000
+
+        def insert():
+            time.sleep(0.05)  # Let the delete take the write lock first
+            start = time.perf_counter()
+            server.insert_data("users", {"username": f"budget{time.time_ns()}", "email": "b@example.com"})
+            results["insert"] = (time.perf_counter() - start) * 1000
+
+        threads = [threading.Thread(target=delete), threading.Thread(target=insert)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results["outcome"], results["delete"], results["insert"]
+
+    original = server.BUDGETS, server.ALLOW_RAW_CONDITIONS
+    server.ALLOW_RAW_CONDITIONS = True
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = create_temp_database(directory)
+            seed_todos(database_path, args.rows)
+            with use_database(database_path, args.pool_size):
+                rows = []
+                for label, budgets in (("no budget", unlimited), ("0.25s budget", budgeted)):
+                    server.BUDGETS = budgets
+                    rows.append((label, full_scan_ms(), *runaway_delete()))
+    finally:
+        server.BUDGETS, server.ALLOW_RAW_CONDITIONS = original
+
+    print_table(
+        f"Query budgets ({args.rows} todos, median of {args.runs} scans)",
+        ("budget", "full scan (ms)", "runaway delete", "delete (ms)", "blocked insert (ms)"),
+        rows,
+    )
+
+
+def bench_search(args):
+    """The first 20 matching todos: a "like" filter scan vs. the FTS5 search_text tool."""
+    searches = [
+        ("one rare number", "%4242%", "4242"),
+        ("common word", "%dentist%", "dentist"),
+        ("two words", "%book%flights%", "book flights"),
+        ("no match", "%zebra%", "zebra"),
+    ]
+
+    def median_ms(func) -> tuple:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return sorted(timings)[len(timings) // 2], result["row_count"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.seed(database_path, users=args.users, todos=args.rows, random_seed=args.seed)
+        with use_database(database_path, args.pool_size):
+            rows = []
+            for label, pattern, text in searches:
+                like_ms, like_rows = median_ms(
+                    lambda: server.query_db_table(
+                        "todos", "id, task", limit=20, use_cache=False,
+                        filters=[{"column": "task", "operator": "like", "value": pattern}],
+                    )
+                )
+                search_ms, search_rows = median_ms(
+                    lambda: server.search_text("todos", text, "id, task", limit=20, use_cache=False)
+                )
+                by_id_ms, _ = median_ms(
+                    lambda: server.search_text(
+                        "todos", text, "id, task", order_by=["id desc"], limit=20, use_cache=False
+                    )
+                )
+                rows.append((label, like_rows, like_ms, search_rows, search_ms, by_id_ms))
+
+    print_table(
+        f"First 20 matching todos of {args.rows} (median of {args.runs} runs)",
+        ("search", "like rows", "like (ms)", "search rows", "ranked (ms)", "newest first (ms)"),
+        rows,
+    )
+
+
+def suite_scenarios(rng: random.Random, users: int, todos: int) -> list[tuple]:
+    """(label, tool name, argument factory) for every tool, in run order.
+
+    Writes run after reads, and create_suggested_indexes runs last so the
+    reads are first measured without the advisor's indexes and then again with them.
+    """
+    def user_filter():
+        return {"column": "user_id", "value": rng.randint(1, users)}
+
+    def new_todos(count: int) -> list[dict]:
+        return [
+            {"user_id": rng.randint(1, users), "task": f"Suite task {rng.random()}", "completed": 0}
+            for _ in range(count)
+        ]
+
+    def open_todos():
+        return [user_filter(), {"column": "completed", "value": 0}]
+
+    reads = [
+        ("query_db_table", "query_db_table", lambda: {
+            "table_name": "todos", "columns": "id, task", "filters": open_todos(), "use_cache": False,
+        }),
+        ("join_tables", "join_tables", lambda: {
+            "table_name": "todos",
+            "joins": [{"table": "users"}],
+            "columns": ["todos.task", "users.username"],
+            "filters": [{"column": "users.username", "value": f"user{rng.randint(4, users)}"}],
+            "use_cache": False,
+        }),
+        ("search_text", "search_text", lambda: {
+            "table_name": "todos",
+            "text": f"{rng.choice(db.TASK_OBJECTS)} {rng.randint(0, todos - 1)}",
+            "limit": 20,
+            "use_cache": False,
+        }),
+        ("aggregate", "aggregate", lambda: {
+            "table_name": "todos",
+            "aggregates": [{"function": "count"}],
+            "group_by": ["completed"],
+            "filters": [user_filter()],
+            "use_cache": False,
+        }),
+    ]
+    return (
+        [
+            ("list_db_tables", "list_db_tables", lambda: {"dummy_param": "suite"}),
+            ("get_table_schema", "get_table_schema", lambda: {"table_name": "todos"}),
+            ("describe_database", "describe_database", lambda: {"dummy_param": "suite"}),
+            ("server_stats", "server_stats", lambda: {"dummy_param": "suite"}),
+            ("query_db_table (cached)", "query_db_table", lambda: {
+                "table_name": "todos", "filters": [{"column": "user_id", "value": 1}],
+            }),
+        ]
+        + reads
+        + [
+            ("explain_query", "explain_query", lambda: {
+                "table_name": "todos", "columns": "id, task", "filters": open_todos(),
+            }),
+            ("suggest_indexes", "suggest_indexes", lambda: {}),
+            ("insert_data", "insert_data", lambda: {"table_name": "todos", "data": new_todos(1)[0]}),
+            ("insert_many (100 rows)", "insert_many", lambda: {
+                "table_name": "todos", "rows": new_todos(100),
+            }),
+            ("upsert_many (100 rows)", "upsert_many", lambda: {
+                "table_name": "todos",
+                "rows": [{"id": rng.randint(1, todos), **row} for row in new_todos(100)],
+                "conflict_columns": ["id"],
+            }),
+            ("delete_data", "delete_data", lambda: {
+                "table_name": "todos", "filters": [{"column": "id", "value": rng.randint(1, todos)}],
+            }),
+            ("batch (schema + query + insert, atomic)", "batch", lambda: {
+                "calls": [
+                    {"tool": "get_table_schema", "arguments": {"table_name": "todos"}},
+                    {"tool": "query_db_table", "arguments": reads[0][2]()},
+                    {"tool": "insert_data", "arguments": {"table_name": "todos", "data": new_todos(1)[0]}},
+                ],
+                "atomic": True,
+            }),
+            ("create_suggested_indexes", "create_suggested_indexes", lambda: {}),
+            ("create_text_index", "create_text_index", lambda: {
+                "table_name": "users", "columns": ["username", "email"],
+            }),
+        ]
+        + [(f"{label} (indexed)", tool, make_args) for label, tool, make_args in reads]
+    )
+
+
+def bench_suite(args):
+    """Drives call_mcp_tool for every tool on a seeded database and writes JSON results.
+
+    Each scenario runs until --calls calls or --seconds have passed, spread
+    over --clients concurrent callers. Pass --baseline with an earlier
+    results file to print the change in throughput and p95 latency.
+    """
+    rng = random.Random(args.seed)
+    scenarios = suite_scenarios(rng, args.users, args.rows)
+    untested = set(server.DB_TOOLS) - {tool for _, tool, _ in scenarios}
+    if untested:
+        raise SystemExit(f"No suite scenario for: {', '.join(sorted(untested))}.")
+
+    async def run_scenario(tool: str, make_args) -> dict:
+        latencies, errors, remaining = [], 0, args.calls
+        deadline = time.perf_counter() + args.seconds
+
+        async def client():
+            nonlocal errors, remaining
+            while remaining > 0 and time.perf_counter() < deadline:
+                remaining -= 1
+                arguments = make_args()
+                start = time.perf_counter()
+                content = await server.call_mcp_tool(tool, arguments)
+                latencies.append(time.perf_counter() - start)
+                if json.loads(content[0].text).get("success") is False:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        return {
+            "calls": len(latencies),
+            "errors": errors,
+            "throughput_per_s": round(len(latencies) / elapsed, 1),
+            "latency_ms": {
+                name: round(percentile(latencies, fraction) * 1000, 3)
+                for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+            },
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+    async def run() -> list[dict]:
+        results = []
+        for label, tool, make_args in scenarios:
+            results.append({"scenario": label, "tool": tool, **await run_scenario(tool, make_args)})
+        return results
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = create_temp_database(directory)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.seed(database_path, args.users, args.rows, args.distribution, random_seed=args.seed)
+        seed_seconds = time.perf_counter() - start
+        with use_database(database_path, args.pool_size):
+            results = asyncio.run(run())
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    report = {
+        "benchmark": "suite",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "parameters": {
+            "users": args.users,
+            "todos": args.rows,
+            "distribution": args.distribution,
+            "seed": args.seed,
+            "clients": args.clients,
+            "max_calls": args.calls,
+            "max_seconds": args.seconds,
+            "pool_size": args.pool_size,
+        },
+        "seed_seconds": round(seed_seconds, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "scenarios": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {entry["scenario"]: entry for entry in json.load(f)["scenarios"]}
+
+    def versus(entry: dict, metric) -> str:
+        before = baseline.get(entry["scenario"])
+        return f"{metric(entry) / metric(before):.2f}x" if before and metric(before) else "-"
+
+    print_table(
+        f"{args.users} users, {args.rows} todos ({args.distribution}), {args.clients} clients",
+        ("scenario", "calls", "errors", "calls/s", "p50 ms", "p95 ms", "p99 ms", "RSS MiB")
+        + (("calls/s vs base", "p95 vs base") if baseline else ()),
+        [
+            (
+                entry["scenario"],
+                entry["calls"],
+                entry["errors"],
+                entry["throughput_per_s"],
+                *(f"{entry['latency_ms'][p]:.2f}" for p in ("p50", "p95", "p99")),
+                entry["peak_rss_mb"],
+            )
+            + (
+                (
+                    versus(entry, lambda e: e["throughput_per_s"]),
+                    versus(entry, lambda e: e["latency_ms"]["p95"]),
+                )
+                if baseline
+                else ()
+            )
+            for entry in results
+        ],
+    )
+    print(f"\nSeeded in {report['seed_seconds']}s. Results written to {args.output}.")
+
+
+def bench_readers(args):
+    """Read throughput at 1, 4 and 16 clients: shared read-write connections vs. the read-only pool.
+
+    Each client repeatedly calls query_db_table through call_mcp_tool. The
+    executor's read limit is raised to the client count so the connections,
+    not the executor, are what is measured. Each setup is run alone and
+    again with a writer inserting 100-row batches into `users` in the
+    background, so the table being read does not grow between runs.
+    """
+    client_counts = (1, 4, 16)
+    rng = random.Random(args.seed)
+    written = itertools.count()
+
+    def read_args() -> dict:
+        return {
+            "table_name": "todos",
+            "columns": "id, task",
+            "filters": [{"column": "user_id", "value": rng.randint(1, args.users)}],
+            "use_cache": False,
+        }
+
+    async def measure(clients: int, with_writer: bool) -> float:
+        reads, deadline = 0, time.perf_counter() + args.seconds
+
+        async def reader():
+            nonlocal reads
+            while time.perf_counter() < deadline:
+                await server.call_mcp_tool("query_db_table", read_args())
+                reads += 1
+
+        async def writer():
+            while time.perf_counter() < deadline:
+                rows = [
+                    {"username": f"writer{next(written)}", "email": "writer@example.com"}
+                    for _ in range(100)
+                ]
+                await server.call_mcp_tool("insert_many", {"table_name": "users", "rows": rows})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(reader() for _ in range(clients)), *([writer()] if with_writer else []))
+        return reads / (time.perf_counter() - start)
+
+    async def run(database_path: str) -> dict:
+        results = {}
+        for read_only in (False, True):
+            server.READ_POOL.close()
+            server.READ_POOL = ConnectionPool(
+                database_path, size=max(client_counts), read_only=read_only
+            )
+            for clients in client_counts:
+                for with_writer in (False, True):
+                    results[read_only, clients, with_writer] = await measure(clients, with_writer)
+        return results
+
+    original_executor = server.EXECUTOR
+    server.EXECUTOR = ToolExecutor(max_reads=max(client_counts), max_writes=1)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            database_path = create_temp_database(directory)
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.seed(database_path, args.users, args.rows, random_seed=args.seed)
+            with use_database(database_path, args.pool_size):
+                results = asyncio.run(run(database_path))
+    finally:
+        server.EXECUTOR.shutdown()
+        server.EXECUTOR = original_executor
+
+    print_table(
+        f"query_db_table calls/s on {args.rows} todos ({args.seconds:.0f}s per cell)",
+        ("clients", "writer", "read-write pool", "read-only mmap pool", "change"),
+        [
+            (
+                clients,
+                "yes" if with_writer else "no",
+                results[False, clients, with_writer],
+                results[True, clients, with_writer],
+                f"{results[True, clients, with_writer] / results[False, clients, with_writer]:.2f}x",
+            )
+            for clients in client_counts
+            for with_writer in (False, True)
+        ],
+    )
+
+
+BENCHMARKS = {
+    "pool": bench_pool,
+    "pagination": bench_pagination,
+    "manifest": bench_manifest,
+    "encoding": bench_encoding,
+    "transport": bench_transport,
+    "startup": bench_startup,
+    "indexes": bench_indexes,
+    "aggregate": bench_aggregate,
+    "join": bench_join,
+    "batch": bench_batch,
+    "budget": bench_budget,
+    "search": bench_search,
+    "suite": bench_suite,
+    "readers": bench_readers,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--connects", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-handshake-ms", type=float, default=1500)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--distribution", choices=db.DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
@@ -0,0 +1,139 @@
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import NamedTuple
+
+# SQLite calls the progress handler every this many virtual machine instructions.
+PROGRESS_INTERVAL = 1000
+BUDGET_FIELDS = ("timeout", "max_steps", "max_rows")
+
+
+class QueryBudget(NamedTuple):
+    """Limits for the SQL a single tool call runs. 0 disables a limit.
+
+    `max_steps` counts SQLite virtual machine instructions, which grow with
+    the rows a statement examines (a few per row for a simple scan), so it
+    bounds rows scanned. `max_rows` caps the rows a read tool returns.
+    """
+
+    timeout: float = 0
+    max_steps: int = 0
+    max_rows: int = 0
+
+
+class BudgetExceededError(Exception):
+    """Raised when a statement is interrupted for exceeding its budget."""
+
+    def __init__(self, tool_name: str, limit: str, budget: QueryBudget, elapsed: float, steps: int):
+        self.tool_name = tool_name
+        self.limit = limit
+        self.budget = budget
+        self.elapsed = elapsed
+        self.steps = steps
+        if limit == "timeout":
+            detail = f"ran longer than {budget.timeout:g}s"
+        else:
+            detail = f"examined more than {budget.max_steps} steps' worth of rows"
+        super().__init__(
+            f"Query budget exceeded: '{tool_name}' {detail} and was cancelled. "
+            "Narrow the filters, add a limit or create an index (see explain_query)."
+        )
+
+    def details(self) -> dict:
+        """The structured part of the tool's error response."""
+        return {
+            "budget_exceeded": self.limit,
+            "budget": self.budget._asdict(),
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "steps": self.steps,
+        }
+
+
+class QueryBudgets:
+    """Per-tool query budgets, with a server-wide default.
+
+    Also counts how often each tool's budget was exceeded, for server_stats.
+    """
+
+    def __init__(self, default: QueryBudget, overrides: dict | None = None):
+        self.default = default
+        self._budgets = {
+            tool_name: default._replace(**limits) for tool_name, limits in (overrides or {}).items()
+        }
+        self._lock = threading.Lock()
+        self._exceeded = Counter()
+
+    @classmethod
+    def from_config(cls, default: QueryBudget, overrides_json: str) -> "QueryBudgets":
+        """Builds budgets from a JSON object such as `{"delete_data": {"timeout": 2}}`.
+
+        Raises:
+            ValueError: If the JSON is malformed or names an unknown limit.
+        """
+        overrides = json.loads(overrides_json) if overrides_json.strip() else {}
+        if not isinstance(overrides, dict):
+            raise ValueError("Tool budgets must be a JSON object keyed by tool name.")
+        for tool_name, limits in overrides.items():
+            if not isinstance(limits, dict) or set(limits) - set(BUDGET_FIELDS):
+                raise ValueError(
+                    f"Budget for '{tool_name}' must be an object with keys from {', '.join(BUDGET_FIELDS)}."
+                )
+        return cls(default, overrides)
+
+    def for_tool(self, tool_name: str) -> QueryBudget:
+        return self._budgets.get(tool_name, self.default)
+
+    def max_rows(self, tool_name: str, fallback: int) -> int:
+        """The row cap for a read tool: its budget's max_rows, or `fallback` if unset."""
+        return self.for_tool(tool_name).max_rows or fallback
+
+    @contextlib.contextmanager
+    def enforce(self, conn: sqlite3.Connection, tool_name: str):
+        """Interrupts statements run on `conn` inside this block once they exceed the budget.
+
+        Raises:
+            BudgetExceededError: If a statement was cancelled. Any open
+                                 transaction is left for the caller to roll back.
+        """
+        budget = self.for_tool(tool_name)
+        if not budget.timeout and not budget.max_steps:
+            yield
+            return
+
+        start = time.monotonic()
+        deadline = start + budget.timeout if budget.timeout else None
+        state = {"steps": 0, "limit": None}
+
+        def check_budget():
+            state["steps"] += PROGRESS_INTERVAL
+            if deadline is not None and time.monotonic() > deadline:
+                state["limit"] = "timeout"
+            elif budget.max_steps and state["steps"] > budget.max_steps:
+                state["limit"] = "max_steps"
+            return state["limit"] is not None  # True makes SQLite interrupt the statement
+
+        conn.set_progress_handler(check_budget, PROGRESS_INTERVAL)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if state["limit"] is None:
+                raise
+            with self._lock:
+                self._exceeded[tool_name] += 1
+            raise BudgetExceededError(
+                tool_name, state["limit"], budget, time.monotonic() - start, state["steps"]
+            ) from e
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            exceeded = dict(self._exceeded)
+        return {
+            "default": self.default._asdict(),
+            "tools": {tool_name: budget._asdict() for tool_name, budget in self._budgets.items()},
+            "exceeded": exceeded,
+        }
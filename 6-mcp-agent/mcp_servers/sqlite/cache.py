@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """An LRU cache of read-query results.
+
+    Entries remember which tables they were read from. Writes made through the
+    server's own tools invalidate that table's entries (`begin_write` and
+    `record_write`).
+    Writes made by any other process are detected through `PRAGMA
+    data_version` on a dedicated monitor connection: its value changes
+    whenever another connection commits, in which case the whole cache is
+    dropped because the changed tables are unknown.
+    """
+
+    def __init__(self, database_path: str, max_entries: int = 256):
+        self.database_path = database_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (table_names, value)
+        self._generation = 0  # Bumped on every invalidation
+        self._monitor = None
+        self._data_version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.external_invalidations = 0
+
+    def _read_data_version(self) -> int:
+        if self._monitor is None:
+            self._monitor = sqlite3.connect(self.database_path, check_same_thread=False)
+        return self._monitor.execute("PRAGMA data_version;").fetchone()[0]
+
+    def _clear(self):
+        self._entries.clear()
+        self._generation += 1
+
+    def check_external_writes(self) -> int:
+        """Drops every entry if another connection has committed since the last check.
+
+        Returns:
+            int: The cache generation, to pass to `put` once the result is computed.
+        """
+        with self._lock:
+            data_version = self._read_data_version()
+            if self._data_version is not None and data_version != self._data_version:
+                self._clear()
+                self.external_invalidations += 1
+            self._data_version = data_version
+            return self._generation
+
+    def get(self, key):
+        """Returns the cached value for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, table_names, value, generation: int):
+        """Stores a result read from `table_names` unless the cache was invalidated meanwhile."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (frozenset(table_names), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin_write(self, conn: sqlite3.Connection) -> int:
+        """Call on the writing connection before a write; pass the result to `record_write`.
+
+        Also drops every entry if another connection has committed since the last check.
+
+        Returns:
+            int: The writing connection's data_version, which its own commits never change.
+        """
+        data_version = conn.execute("PRAGMA data_version;").fetchone()[0]
+        self.check_external_writes()
+        return data_version
+
+    def record_write(self, table_names, conn: sqlite3.Connection, data_version_before: int):
+        """Invalidates entries for tables written by this server.
+
+        Call after the write has committed, with the connection that made it
+        and the value `begin_write` returned. The monitor's data_version is
+        re-read so the server's own commit is not mistaken for an external
+        one. That re-read could also absorb a commit another connection made
+        meanwhile, so the writing connection's data_version is read after it:
+        if that changed, someone else committed during the write and the
+        whole cache is dropped.
+        """
+        table_names = set(table_names)
+        with self._lock:
+            for key in [k for k, (t, _) in self._entries.items() if t & table_names]:
+                del self._entries[key]
+            self._generation += 1
+            self.invalidations += 1
+            self._data_version = self._read_data_version()
+            if conn.execute("PRAGMA data_version;").fetchone()[0] != data_version_before:
+                self._clear()
+                self.external_invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+                "external_invalidations": self.external_invalidations,
+            }
+
+    def close(self):
+        with self._lock:
+            self._clear()
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
@@ -0,0 +1,162 @@
+import re
+import sqlite3
+import threading
+
+import fts
+
+WITHOUT_ROWID_PATTERN = re.compile(r"\)\s*WITHOUT\s+ROWID\s*;?\s*$", re.IGNORECASE)
+
+
+class SchemaCatalog:
+    """An in-process cache of the database schema.
+
+    The catalog (tables, views, columns, types, indexes, foreign keys,
+    triggers and full-text indexes) is read once and only rebuilt when
+    `PRAGMA schema_version` changes, which SQLite bumps on every schema change
+    made by any connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schema_version = None
+        self._tables = {}
+        self.rebuilds = 0
+
+    def _read_table(self, conn: sqlite3.Connection, name: str, kind: str, sql: str) -> dict:
+        columns = [
+            {
+                "name": row[0],
+                "type": row[1],
+                "not_null": bool(row[2]),
+                "default": row[3],
+                "primary_key": row[4],  # 1-based position in the primary key, 0 if not part of it
+            }
+            for row in conn.execute(
+                'SELECT name, type, "notnull", dflt_value, pk FROM pragma_table_info(?);',
+                (name,),
+            )
+        ]
+        indexes = [
+            {
+                "name": index_name,
+                "unique": bool(unique),
+                "origin": origin,  # c = CREATE INDEX, u = UNIQUE constraint, pk = PRIMARY KEY
+                "columns": [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT name FROM pragma_index_info(?) ORDER BY seqno;",
+                        (index_name,),
+                    )
+                ],
+            }
+            for index_name, unique, origin in conn.execute(
+                'SELECT name, "unique", origin FROM pragma_index_list(?);', (name,)
+            ).fetchall()
+        ]
+        foreign_keys = [
+            {
+                "column": row[0],
+                "references_table": row[1],
+                "references_column": row[2],
+                "on_update": row[3],
+                "on_delete": row[4],
+            }
+            for row in conn.execute(
+                'SELECT "from", "table", "to", on_update, on_delete '
+                "FROM pragma_foreign_key_list(?) ORDER BY id, seq;",
+                (name,),
+            )
+        ]
+
+        if kind == "view":
+            key_columns = []
+        elif sql and WITHOUT_ROWID_PATTERN.search(sql):
+            key_columns = [
+                column["name"]
+                for column in sorted(columns, key=lambda c: c["primary_key"])
+                if column["primary_key"]
+            ]
+        else:
+            key_columns = ["rowid"]
+
+        return {
+            "name": name,
+            "type": kind,
+            "columns": columns,
+            "column_names": [column["name"] for column in columns],
+            "key_columns": key_columns,  # Columns that give every row a unique, stable position
+            "indexes": indexes,
+            "foreign_keys": foreign_keys,
+        }
+
+    def _rebuild(self, conn: sqlite3.Connection, schema_version: int):
+        rows = conn.execute(
+            "SELECT name, type, sql FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name;"
+        ).fetchall()
+        # FTS5 tables and their shadow tables are listed as the text index of
+        # the table they index rather than as tables of their own.
+        text_indexes = fts.read_text_indexes(conn)
+        hidden, sync_triggers = set(), set()
+        for text_index in text_indexes.values():
+            name = text_index["name"]
+            hidden.add(name)
+            hidden.update(f"{name}_{suffix}" for suffix in fts.FTS5_SHADOW_SUFFIXES)
+            sync_triggers.update(name + suffix for suffix in fts.TEXT_INDEX_TRIGGER_SUFFIXES)
+
+        # Triggers other than those keeping a full-text index in sync, by the table they fire on
+        triggers = {}
+        for name, table_name in conn.execute(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type = 'trigger' ORDER BY name;"
+        ):
+            if name not in sync_triggers:
+                triggers.setdefault(table_name, []).append(name)
+
+        tables = {}
+        for name, kind, sql in rows:
+            if name not in hidden:
+                tables[name] = self._read_table(conn, name, kind, sql)
+                tables[name]["text_index"] = text_indexes.get(name)
+                tables[name]["triggers"] = triggers.get(name, [])
+        self._tables = tables
+        self._schema_version = schema_version
+        self.rebuilds += 1
+
+    def refresh(self, conn: sqlite3.Connection) -> dict:
+        """Returns the catalog, rebuilding it first if the schema has changed."""
+        schema_version = conn.execute("PRAGMA schema_version;").fetchone()[0]
+        if schema_version != self._schema_version:
+            with self._lock:
+                if schema_version != self._schema_version:
+                    self._rebuild(conn, schema_version)
+        return self._tables
+
+    def table(self, conn: sqlite3.Connection, table_name: str) -> dict:
+        """Returns the catalog entry for one table or view.
+
+        Raises:
+            KeyError: If no such table or view exists.
+        """
+        tables = self.refresh(conn)
+        if table_name not in tables:
+            raise KeyError(table_name)
+        return tables[table_name]
+
+    def describe(self, conn: sqlite3.Connection) -> dict:
+        """Returns the whole catalog in a JSON-serialisable form."""
+        tables = self.refresh(conn)
+        return {
+            "schema_version": self._schema_version,
+            "tables": [
+                {
+                    key: value
+                    for key, value in table.items()
+                    if key not in ("column_names", "triggers")
+                }
+                for table in tables.values()
+            ],
+        }
+
+    def invalidate(self):
+        """Forces the next lookup to rebuild the catalog."""
+        with self._lock:
+            self._schema_version = None
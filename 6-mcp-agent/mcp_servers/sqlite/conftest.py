@@ -0,0 +1,39 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# The server's modules import each other by name, as when it is run from this directory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import db  # noqa: E402
+import server  # noqa: E402
+from advisor import IndexAdvisor  # noqa: E402
+from cache import ResultCache  # noqa: E402
+from catalog import SchemaCatalog  # noqa: E402
+from pool import ConnectionPool  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Points the server's pools, catalog, cache and index advisor at a fresh demo database."""
+    database_path = str(tmp_path / "test.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.initialise(database_path)
+    pool = ConnectionPool(database_path, size=2)
+    with pool.connection():
+        pass  # Switch the database to WAL before any reader connects
+    read_pool = ConnectionPool(database_path, size=2, read_only=True)
+    result_cache = ResultCache(database_path, max_entries=64)
+    monkeypatch.setattr(server, "POOL", pool)
+    monkeypatch.setattr(server, "READ_POOL", read_pool)
+    monkeypatch.setattr(server, "CATALOG", SchemaCatalog())
+    monkeypatch.setattr(server, "RESULT_CACHE", result_cache)
+    monkeypatch.setattr(server, "RESULT_CACHE_SIZE", 64)
+    monkeypatch.setattr(server, "ADVISOR", IndexAdvisor())
+    yield database_path
+    pool.close()
+    read_pool.close()
+    result_cache.close()
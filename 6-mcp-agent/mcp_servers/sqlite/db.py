@@ -1,19 +1,24 @@
+import itertools
 import os
+import random
 import sqlite3
+import time
+
+import fts
 from utils import get_db_path
 
 
 DATABASE_PATH = get_db_path()
 
-def initialise():
+def initialise(database_path: str = DATABASE_PATH):
     # Check if the database already exists
-    db_exists = os.path.exists(DATABASE_PATH)
+    db_exists = os.path.exists(database_path)
 
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = sqlite3.connect(database_path)
     cursor = conn.cursor()
 
     if not db_exists:
-        print(f"Creating new database at {DATABASE_PATH}...")
+        print(f"Creating new database at {database_path}...")
         # Create users table
         cursor.execute(
             """
@@ -64,13 +69,140 @@ def initialise():
         )
         print(f"Inserted {len(dummy_todos)} dummy todos.")
 
+        # Full-text indexes for search_text, kept in sync by triggers
+        for table_name, columns in (("users", ["username", "email"]), ("todos", ["task"])):
+            for statement in fts.text_index_statements(table_name, columns, "id"):
+                cursor.execute(statement)
+        print("Created full-text indexes on 'users' and 'todos'.")
+
         conn.commit()
         print("Database created and populated successfully.")
     else:
-        print(f"Database already exists at {DATABASE_PATH}. No changes made.")
+        print(f"Database already exists at {database_path}. No changes made.")
+
+    conn.close()
+
+
+TASK_VERBS = ["Buy", "Read", "Finish", "Plan", "Review", "Call", "Fix", "Write", "Clean", "Book"]
+TASK_OBJECTS = [
+    "groceries",
+    "a book",
+    "the project report",
+    "a weekend trip",
+    "the budget",
+    "the dentist",
+    "the bike",
+    "a blog post",
+    "the garage",
+    "flights",
+]
+DISTRIBUTIONS = ("uniform", "zipf")
+
+
+def seed(
+    database_path: str = DATABASE_PATH,
+    users: int = 10_000,
+    todos: int = 100_000,
+    distribution: str = "uniform",
+    completed_ratio: float = 0.5,
+    random_seed: int = 0,
+    batch_size: int = 50_000,
+):
+    """Adds synthetic users and todos to an initialised database for load testing.
 
+    Users are added until there are `users` in total. Todos are assigned to
+    users uniformly, or with "zipf" so a few users own most todos. The same
+    `random_seed` always produces the same data. Everything is inserted with
+    executemany in one transaction, with syncing to disk turned off, and
+    full-text indexes are rebuilt once afterwards.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {DISTRIBUTIONS}, got {distribution!r}")
+    rng = random.Random(random_seed)
+    start = time.perf_counter()
+
+    # Transactions are managed explicitly so the index drops below are part of
+    # the seeding transaction rather than committed on their own
+    conn = sqlite3.connect(database_path, isolation_level=None)
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute("BEGIN;")
+    try:
+        # Rebuilding full-text indexes once at the end is several times faster
+        # than updating them row by row through their triggers.
+        text_indexes = fts.read_text_indexes(conn)
+        for table_name in text_indexes:
+            for statement in fts.drop_text_index_statements(table_name):
+                conn.execute(statement)
+        existing_users = conn.execute("SELECT COUNT(*) FROM users;").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO users (username, email) VALUES (?, ?)",
+            ((f"user{i}", f"user{i}@example.com") for i in range(existing_users + 1, users + 1)),
+        )
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id;")]
+
+        if distribution == "zipf":
+            rng.shuffle(user_ids)  # So the busiest users are not simply the lowest IDs
+            cum_weights = list(
+                itertools.accumulate(1 / rank for rank in range(1, len(user_ids) + 1))
+            )
+        else:
+            cum_weights = None
+
+        for offset in range(0, todos, batch_size):
+            count = min(batch_size, todos - offset)
+            owners = rng.choices(user_ids, cum_weights=cum_weights, k=count)
+            verbs = rng.choices(TASK_VERBS, k=count)
+            objects = rng.choices(TASK_OBJECTS, k=count)
+            completed = rng.choices((0, 1), cum_weights=(1 - completed_ratio, 1), k=count)
+            conn.executemany(
+                "INSERT INTO todos (user_id, task, completed) VALUES (?, ?, ?)",
+                zip(
+                    owners,
+                    (
+                        f"{v} {o} #{n}"
+                        for v, o, n in zip(verbs, objects, range(offset, offset + count))
+                    ),
+                    completed,
+                ),
+            )
+        for table_name, text_index in text_indexes.items():
+            for statement in fts.text_index_statements(
+                table_name, text_index["columns"], text_index["rowid_column"]
+            ):
+                conn.execute(statement)
+    except BaseException:
+        conn.execute("ROLLBACK;")
+        conn.close()
+        raise
+    conn.execute("COMMIT;")
     conn.close()
+    print(
+        f"Seeded {len(user_ids)} users and {todos} todos ({distribution}) "
+        f"in {time.perf_counter() - start:.1f}s."
+    )
 
 
 if __name__ == "__main__":
-    initialise()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Create the demo database, optionally seeding synthetic data."
+    )
+    parser.add_argument("--database", default=DATABASE_PATH)
+    parser.add_argument("--users", type=int, help="Seed synthetic users up to this total.")
+    parser.add_argument("--todos", type=int, help="Seed this many synthetic todos.")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--completed-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    initialise(args.database)
+    if args.users or args.todos:
+        seed(
+            args.database,
+            users=args.users or 10_000,
+            todos=args.todos or 0,
+            distribution=args.distribution,
+            completed_ratio=args.completed_ratio,
+            random_seed=args.seed,
+        )
\ No newline at end of file
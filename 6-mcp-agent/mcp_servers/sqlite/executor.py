@@ -0,0 +1,89 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+READ = "read"
+WRITE = "write"
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a call arrives while the wait queue is already full."""
+
+
+class ToolExecutor:
+    """Runs blocking tool functions on worker threads, off the event loop.
+
+    Reads and writes get separate concurrency limits: SQLite (in WAL mode)
+    allows many concurrent readers but only one writer, so extra writers would
+    only wait on the database lock while holding a worker thread. Calls beyond
+    a limit wait in a bounded queue; once `max_queued` calls are waiting, new
+    calls are rejected with `ExecutorBusyError` instead of piling up.
+    """
+
+    def __init__(self, max_reads: int = 4, max_writes: int = 1, max_queued: int = 64):
+        self.limits = {READ: max_reads, WRITE: max_writes}
+        self.max_queued = max_queued
+        self._threads = ThreadPoolExecutor(
+            max_workers=max_reads + max_writes, thread_name_prefix="sqlite-tool"
+        )
+        self._slots = {kind: asyncio.Semaphore(limit) for kind, limit in self.limits.items()}
+        self._running = {READ: 0, WRITE: 0}
+        self._queued = {READ: 0, WRITE: 0}
+        self._completed = {READ: 0, WRITE: 0}
+        self._queued_total = {READ: 0, WRITE: 0}  # Calls that had to wait for a slot
+        self._rejected = 0
+
+    async def run(self, kind: str, func, /, **kwargs) -> tuple:
+        """Runs `func(**kwargs)` on a worker thread once a `kind` slot is free.
+
+        Returns:
+            tuple: The function's result and the seconds spent waiting for a slot.
+
+        Raises:
+            ExecutorBusyError: If the wait queue is full.
+        """
+        slots = self._slots[kind]
+        start = time.perf_counter()
+        if slots.locked():
+            if sum(self._queued.values()) >= self.max_queued:
+                self._rejected += 1
+                raise ExecutorBusyError(
+                    f"Server busy: {self.max_queued} calls are already waiting. Retry shortly."
+                )
+            self._queued_total[kind] += 1
+
+        self._queued[kind] += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._queued[kind] -= 1
+        queue_wait = time.perf_counter() - start
+
+        self._running[kind] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._threads, functools.partial(func, **kwargs)
+            )
+        finally:
+            self._running[kind] -= 1
+            self._completed[kind] += 1
+            slots.release()
+        return result, queue_wait
+
+    def stats(self) -> dict:
+        """Returns per-kind limits and current/total call counts."""
+        return {
+            kind: {
+                "limit": self.limits[kind],
+                "running": self._running[kind],
+                "waiting": self._queued[kind],
+                "completed": self._completed[kind],
+                "had_to_wait": self._queued_total[kind],
+            }
+            for kind in (READ, WRITE)
+        } | {"max_queued": self.max_queued, "rejected": self._rejected}
+
+    def shutdown(self):
+        self._threads.shutdown(wait=True)
@@ -0,0 +1,258 @@
+import hashlib
+import re
+from functools import lru_cache
+
+from query import (
+    QueryValidationError,
+    SelectQuery,
+    _where_clause,
+    check_column,
+    check_limit,
+    normalise_columns,
+    normalise_filters,
+    normalise_order_by,
+    quote_column_ref,
+    quote_identifier,
+)
+
+TEXT_INDEX_SUFFIX = "_fts"
+# Shadow tables SQLite creates to store an FTS5 index.
+FTS5_SHADOW_SUFFIXES = ("data", "idx", "content", "docsize", "config")
+FTS5_TABLE_PATTERN = re.compile(
+    r"^CREATE\s+VIRTUAL\s+TABLE\s.*\bUSING\s+fts5\s*\((.*)\)\s*;?\s*$", re.IGNORECASE | re.DOTALL
+)
+FTS5_OPTION_PATTERN = re.compile(
+    r"\b(content|content_rowid)\s*=\s*'((?:[^']|'')*)'", re.IGNORECASE
+)
+# A search query using any of these is passed to MATCH as FTS5 query syntax.
+FTS5_SYNTAX_PATTERN = re.compile(r'["*()^:]|\b(?:AND|OR|NOT|NEAR)\b')
+WORD_PATTERN = re.compile(r"\w+")
+TEXT_INDEX_TRIGGER_SUFFIXES = ("_ai", "_ad", "_au")  # Keep the index in sync on insert, delete, update
+SNIPPET_TOKENS = 12  # Words of context around each match in a snippet
+
+
+def text_index_name(table_name: str) -> str:
+    return f"{table_name}{TEXT_INDEX_SUFFIX}"
+
+
+def parse_text_index(sql: str) -> dict | None:
+    """Reads the content table and rowid column of an external-content FTS5 table.
+
+    Returns None unless `sql` creates an FTS5 table indexing another table.
+    """
+    match = FTS5_TABLE_PATTERN.match(sql or "")
+    if not match:
+        return None
+    options = {
+        key.lower(): value.replace("''", "'")
+        for key, value in FTS5_OPTION_PATTERN.findall(match.group(1))
+    }
+    if not options.get("content"):
+        return None
+    return {"table": options["content"], "rowid_column": options.get("content_rowid", "rowid")}
+
+
+def read_text_indexes(conn) -> dict:
+    """Finds the full-text indexes in a database, keyed by the table they index.
+
+    Returns:
+        dict: For each indexed table, the index's 'name', its 'columns' and the
+              table's 'rowid_column'.
+    """
+    text_indexes = {}
+    for name, sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master "
+        "WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%';"
+    ).fetchall():
+        text_index = parse_text_index(sql)
+        if text_index is not None:
+            text_indexes[text_index["table"]] = {
+                "name": name,
+                "columns": [
+                    row[0]
+                    for row in conn.execute("SELECT name FROM pragma_table_info(?);", (name,))
+                ],
+                "rowid_column": text_index["rowid_column"],
+            }
+    return text_indexes
+
+
+def text_index_statements(table_name: str, columns, rowid_column: str = "rowid") -> list[str]:
+    """The SQL that (re)creates the full-text index of `columns` on a rowid table.
+
+    The index is an external-content FTS5 table: it stores only the index and
+    reads column values from `table_name`. Triggers keep it in sync with every
+    insert, update and delete, and the final statement indexes existing rows.
+    """
+    index_name = text_index_name(table_name)
+    index, table = quote_identifier(index_name), quote_identifier(table_name)
+    rowid = quote_identifier(rowid_column) if rowid_column != "rowid" else "rowid"
+    names = ", ".join(quote_identifier(column) for column in columns)
+
+    def values(prefix: str) -> str:
+        return ", ".join(f"{prefix}.{quote_identifier(column)}" for column in columns)
+
+    add = f"INSERT INTO {index} (rowid, {names}) VALUES (new.{rowid}, {values('new')});"
+    remove = (
+        f"INSERT INTO {index} ({index}, rowid, {names}) "
+        f"VALUES ('delete', old.{rowid}, {values('old')});"
+    )
+    options = f"content={quote_literal(table_name)}"
+    if rowid_column != "rowid":
+        options += f", content_rowid={quote_literal(rowid_column)}"
+    triggers = {
+        "_ai": ("INSERT", add),
+        "_ad": ("DELETE", remove),
+        "_au": ("UPDATE", f"{remove} {add}"),
+    }
+    return (
+        drop_text_index_statements(table_name)
+        + [f"CREATE VIRTUAL TABLE {index} USING fts5({names}, {options});"]
+        + [
+            f"CREATE TRIGGER {quote_identifier(index_name + suffix)} "
+            f"AFTER {event} ON {table} BEGIN {body} END;"
+            for suffix, (event, body) in triggers.items()
+        ]
+        + [f"INSERT INTO {index} ({index}) VALUES ('rebuild');"]
+    )
+
+
+def drop_text_index_statements(table_name: str) -> list[str]:
+    index_name = text_index_name(table_name)
+    return [
+        f"DROP TRIGGER IF EXISTS {quote_identifier(index_name + suffix)};"
+        for suffix in TEXT_INDEX_TRIGGER_SUFFIXES
+    ] + [f"DROP TABLE IF EXISTS {quote_identifier(index_name)};"]
+
+
+def quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def build_text_index(table: dict, columns) -> list[str]:
+    """Validates `columns` of a catalog `table` entry and returns its text index SQL."""
+    table_name, table_columns = table["name"], table["column_names"]
+    if table["type"] != "table" or table["key_columns"] != ["rowid"]:
+        raise QueryValidationError(
+            f"Full-text indexes need an ordinary rowid table; '{table_name}' is not one."
+        )
+    if not columns:
+        raise QueryValidationError("columns must name at least one text column to index.")
+    columns = tuple(
+        dict.fromkeys(check_column(column, table_name, table_columns) for column in columns)
+    )
+    rowid_column = next(
+        (
+            column["name"]
+            for column in table["columns"]
+            if column["primary_key"] and column["type"].upper() == "INTEGER"
+        ),
+        "rowid",
+    )
+    return text_index_statements(table_name, columns, rowid_column)
+
+
+def match_expression(text: str) -> str:
+    """Turns a search query into an FTS5 MATCH expression.
+
+    Plain text matches rows containing every word, in any order. Text that
+    already uses FTS5 syntax (quoted phrases, prefix*, AND/OR/NOT, NEAR,
+    column: filters) is passed through unchanged.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise QueryValidationError("text must be a non-empty string.")
+    if FTS5_SYNTAX_PATTERN.search(text):
+        return text
+    words = WORD_PATTERN.findall(text)
+    if not words:
+        raise QueryValidationError(f"text {text!r} contains no searchable words.")
+    return " ".join(f'"{word}"' for word in words)
+
+
+@lru_cache(maxsize=256)
+def compile_search(
+    table_name: str,
+    index_name: str,
+    rowid_column: str,
+    columns: tuple,
+    filter_shape: tuple,
+    order_by: tuple,
+    has_limit: bool,
+) -> str:
+    """Compiles a ranked full-text search joined back to its content table.
+
+    Rows are ordered by bm25 relevance (lower is better; rounded in the
+    result) unless `order_by` is given, and each carries a snippet of the
+    best-matching column with the matches in [brackets]. Ranking scores every
+    match before the limit applies; ordering by the rowid column alone lets
+    FTS5 stop after the first `limit` matches instead.
+    """
+    index, table = quote_identifier(index_name), quote_identifier(table_name)
+    rowid = f"{table}.rowid"
+    if rowid_column != "rowid":
+        rowid = quote_column_ref((table_name, rowid_column))
+
+    def quote(column: str) -> str:
+        return quote_column_ref((table_name, column))
+
+    projection = ", ".join(f"{quote(column)} AS {quote_identifier(column)}" for column in columns)
+
+    sql = (
+        f"SELECT {projection}, "
+        f"snippet({index}, -1, '[', ']', '…', {SNIPPET_TOKENS}) AS \"snippet\", "
+        f"round(bm25({index}), 3) AS \"rank\" "
+        f"FROM {index} JOIN {table} ON {rowid} = {index}.rowid"
+    )
+    sql += _where_clause(filter_shape, f"{index} MATCH ?", quote)
+    if len(order_by) == 1 and order_by[0][0] == rowid_column:
+        sql += f" ORDER BY {index}.rowid {order_by[0][1]}"
+    elif order_by:
+        sql += " ORDER BY " + ", ".join(
+            f"{quote(column)} {direction}" for column, direction in order_by
+        )
+    else:
+        sql += f" ORDER BY bm25({index})"
+    if has_limit:
+        sql += " LIMIT ?"
+    return sql + ";"
+
+
+def build_search(
+    table: dict,
+    text: str,
+    columns: str = "*",
+    filters: list | None = None,
+    order_by: list | None = None,
+    limit: int | None = None,
+) -> SelectQuery:
+    """Validates and compiles a full-text search of a catalog `table` entry.
+
+    Raises:
+        QueryValidationError: If the table has no text index or the arguments are invalid.
+    """
+    check_limit(limit)
+    table_name, table_columns = table["name"], table["column_names"]
+    text_index = table.get("text_index")
+    if not text_index:
+        raise QueryValidationError(
+            f"Table '{table_name}' has no full-text index. Create one with create_text_index."
+        )
+
+    normalised_columns = normalise_columns(columns, table_name, table_columns)
+    normalised_columns = normalised_columns or tuple(table_columns)
+    filter_shape, params = normalise_filters(filters, table_name, table_columns)
+    normalised_order_by = normalise_order_by(order_by, table_name, table_columns)
+    params.append(match_expression(text))
+    sql = compile_search(
+        table_name,
+        text_index["name"],
+        text_index["rowid_column"],
+        normalised_columns,
+        filter_shape,
+        normalised_order_by,
+        bool(limit),
+    )
+    if limit:
+        params.append(limit)
+    fingerprint = hashlib.sha1(repr((sql, params)).encode()).hexdigest()[:16]
+    return SelectQuery(sql, params, 0, fingerprint, ())
@@ -0,0 +1,59 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import reprlib
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
+
+# Bounded repr: never walks more than a few items of a large result.
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlevel = 4
+_payload_repr.maxlist = 5
+_payload_repr.maxdict = 12
+_payload_repr.maxstring = 120
+_payload_repr.maxother = 120
+
+_payload_chars = 500
+
+
+def setup_logging(
+    log_path: str,
+    level: str = "INFO",
+    max_bytes: int = 5 * 1024 * 1024,
+    backup_count: int = 3,
+    payload_chars: int = 500,
+) -> logging.handlers.QueueListener:
+    """Routes all logging through a queue to a rotating log file.
+
+    Callers only enqueue records; a background listener thread does the file
+    I/O, so a slow disk never stalls the event loop.
+    """
+    global _payload_chars
+    _payload_chars = payload_chars
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener.start()
+    atexit.register(listener.stop)  # Flush queued records on exit
+    return listener
+
+
+def truncate_payload(value) -> str:
+    """Returns a short, bounded representation of a tool argument or result."""
+    text = _payload_repr.repr(value)
+    if len(text) > _payload_chars:
+        text = f"{text[:_payload_chars]}... [{len(text) - _payload_chars} more chars]"
+    return text
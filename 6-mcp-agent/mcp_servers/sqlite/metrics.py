@@ -0,0 +1,61 @@
+import threading
+from collections import defaultdict, deque
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LatencyRecorder:
+    """Keeps the most recent per-tool timings, split into phases.
+
+    Each tool call records how long it spent in each phase (for example
+    waiting in the executor queue, executing SQL and serialising the
+    response). Only the last `window` samples per tool and phase are kept,
+    so memory stays bounded on a long-running server.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: defaultdict(lambda: deque(maxlen=self.window)))
+        self._calls = defaultdict(int)
+        self._errors = defaultdict(int)
+
+    def record(self, tool_name: str, ok: bool = True, **phase_seconds: float):
+        with self._lock:
+            self._calls[tool_name] += 1
+            if not ok:
+                self._errors[tool_name] += 1
+            for phase, seconds in phase_seconds.items():
+                self._samples[tool_name][phase].append(seconds)
+
+    def summary(self) -> dict:
+        """Returns call/error counts and p50/p95/p99/max per phase, in milliseconds."""
+        with self._lock:
+            snapshot = {
+                tool_name: {phase: sorted(samples) for phase, samples in phases.items()}
+                for tool_name, phases in self._samples.items()
+            }
+            calls, errors = dict(self._calls), dict(self._errors)
+
+        summary = {}
+        for tool_name in sorted(calls):
+            phases = {}
+            for phase, samples in snapshot.get(tool_name, {}).items():
+                if samples:
+                    phases[phase] = {
+                        "samples": len(samples),
+                        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+                        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+                        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+                        "max_ms": round(samples[-1] * 1000, 3),
+                    }
+            summary[tool_name] = {
+                "calls": calls[tool_name],
+                "errors": errors.get(tool_name, 0),
+                "latency": phases,
+            }
+        return summary
@@ -0,0 +1,186 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Pragmas applied once to every pooled connection when it is opened.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",  # Readers don't block the writer (and vice versa)
+    "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync per commit
+    "temp_store": "MEMORY",
+    "cache_size": -8000,  # Negative value = size in KiB (~8 MB page cache)
+    "busy_timeout": 5000,  # Milliseconds to wait on a locked database
+}
+
+
+# Pragmas for read-only connections. The journal mode is a property of the
+# database file and is set by the read-write pool.
+READ_ONLY_PRAGMAS = {
+    "query_only": "ON",  # Refuse writes even if a statement slips through
+    "mmap_size": 256 * 1024 * 1024,  # Read pages straight from the OS page cache
+    "temp_store": "MEMORY",
+    "cache_size": -8000,
+    "busy_timeout": 5000,
+}
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """A small thread-safe pool of long-lived SQLite connections.
+
+    Connections are opened lazily (up to `size`), configured once with
+    `pragmas`, and handed out through the `connection()` context manager.
+    Keeping them open preserves SQLite's per-connection statement cache and
+    page cache across tool calls. With `read_only=True` connections are opened
+    with a `mode=ro` URI and use `READ_ONLY_PRAGMAS` unless `pragmas` is given.
+    """
+
+    def __init__(
+        self,
+        database_path: str,
+        size: int = 5,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        pragmas: dict | None = None,
+        cached_statements: int = 128,
+        read_only: bool = False,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.database_path = database_path
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.read_only = read_only
+        if pragmas is None:
+            pragmas = READ_ONLY_PRAGMAS if read_only else DEFAULT_PRAGMAS
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+
+        # LIFO so the most recently used (warmest) connection is reused first.
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        if self.read_only:
+            target = f"{Path(self.database_path).resolve().as_uri()}?mode=ro"
+        else:
+            target = self.database_path
+        conn = sqlite3.connect(
+            target,
+            check_same_thread=False,  # Connections move between worker threads
+            cached_statements=self.cached_statements,
+            uri=self.read_only,
+        )
+        conn.row_factory = sqlite3.Row  # To access columns by name
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value};")
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1;").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._opened < self.size
+                    if can_open:
+                        self._opened += 1
+                if can_open:
+                    try:
+                        return self._open()
+                    except Exception:
+                        with self._lock:
+                            self._opened -= 1
+                        raise
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection."
+                    )
+                try:
+                    conn, last_used = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            # Only ping connections that have been sitting idle for a while.
+            if time.monotonic() - last_used < self.health_check_interval:
+                return conn
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            # Never hand out a connection with a half-finished transaction.
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put_nowait((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block.
+
+        Uncommitted work is rolled back when the block exits, so callers must
+        commit explicitly, exactly as with a plain `sqlite3` connection.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the pool's current usage."""
+        with self._lock:
+            opened = self._opened
+        idle = self._idle.qsize()
+        return {
+            "size": self.size,
+            "read_only": self.read_only,
+            "opened": opened,
+            "idle": idle,
+            "in_use": opened - idle,
+        }
+
+    def close(self):
+        """Closes every idle connection and refuses further checkouts."""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
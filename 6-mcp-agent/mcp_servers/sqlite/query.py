@@ -0,0 +1,786 @@
+import base64
+import hashlib
+import json
+import sqlite3
+from functools import lru_cache
+from typing import NamedTuple
+
+# Operators accepted in structured filters, mapped to their SQL spelling.
+FILTER_OPERATORS = {
+    "=": "=",
+    "==": "=",
+    "!=": "!=",
+    "<>": "!=",
+    "<": "<",
+    "<=": "<=",
+    ">": ">",
+    ">=": ">=",
+    "like": "LIKE",
+    "not like": "NOT LIKE",
+    "in": "IN",
+    "not in": "NOT IN",
+    "is null": "IS NULL",
+    "is not null": "IS NOT NULL",
+}
+NULLARY_OPERATORS = {"IS NULL", "IS NOT NULL"}
+LIST_OPERATORS = {"IN", "NOT IN"}
+AGGREGATE_FUNCTIONS = {
+    "count": "COUNT",
+    "sum": "SUM",
+    "avg": "AVG",
+    "min": "MIN",
+    "max": "MAX",
+}
+JOIN_TYPES = {"inner": "JOIN", "left": "LEFT JOIN"}
+SCALAR_TYPES = (str, int, float, bool, type(None))
+PAGE_KEY_PREFIX = "__page_key_"  # Alias prefix for hidden keyset columns
+
+
+class QueryShape(NamedTuple):
+    """A query stripped of its parameter values; what the index advisor counts."""
+
+    table: str
+    columns: tuple  # Empty for all columns
+    filters: tuple  # (column, operator, arity) triples
+    order_by: tuple  # (column, direction) pairs
+
+
+class SelectQuery(NamedTuple):
+    """A compiled, paginated SELECT ready to execute."""
+
+    sql: str
+    params: list
+    key_count: int  # Trailing hidden columns holding the keyset values
+    fingerprint: str  # Ties page tokens to the query that produced them
+    shapes: tuple  # One QueryShape per table read, for the index advisor
+
+
+class QueryValidationError(ValueError):
+    """Raised when a structured query references unknown identifiers or is malformed."""
+
+
+def quote_identifier(name: str) -> str:
+    """Quotes an identifier that has already been checked against the schema."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_column_ref(ref: tuple) -> str:
+    """Quotes a (table, column) reference as "table"."column"."""
+    return f"{quote_identifier(ref[0])}.{quote_identifier(ref[1])}"
+
+
+def check_column(column, table_name: str, table_columns) -> str:
+    if not isinstance(column, str) or column not in table_columns:
+        raise QueryValidationError(
+            f"Unknown column '{column}' for table '{table_name}'. "
+            f"Valid columns: {', '.join(table_columns)}."
+        )
+    return column
+
+
+# --- Normalisation: turn tool arguments into hashable query shapes + parameters ---
+def check_limit(limit):
+    """Rejects a limit that is not a non-negative integer. None or 0 means no limit."""
+    if isinstance(limit, bool) or (limit and (not isinstance(limit, int) or limit < 0)):
+        raise QueryValidationError(f"limit must be a positive integer, got: {limit!r}")
+
+
+def check_list(value, name: str) -> list:
+    """Returns a list argument, or an empty list for None.
+
+    A string is rejected rather than iterated character by character.
+    """
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise QueryValidationError(f"{name} must be a list, got: {value!r}")
+    return value
+
+
+def normalise_columns(columns: str, table_name: str, table_columns) -> tuple:
+    """Parses a comma-separated column list. An empty tuple means all columns."""
+    if not columns or columns.strip() == "*":
+        return ()
+    return tuple(
+        check_column(column.strip(), table_name, table_columns)
+        for column in columns.split(",")
+        if column.strip()
+    )
+
+
+def normalise_filters(filters, table_name: str, table_columns) -> tuple[tuple, list]:
+    """Validates column/operator/value filters.
+
+    Returns the filter "shape" (used as part of the statement cache key) and the
+    list of values to bind, in placeholder order.
+    """
+    shape, params = [], []
+    for item in check_list(filters, "filters"):
+        if not isinstance(item, dict):
+            raise QueryValidationError(
+                f"Each filter must be an object with 'column', 'operator' and 'value', got: {item!r}"
+            )
+        column = check_column(item.get("column"), table_name, table_columns)
+        operator = FILTER_OPERATORS.get(str(item.get("operator", "=")).strip().lower())
+        if operator is None:
+            raise QueryValidationError(
+                f"Unsupported operator '{item.get('operator')}'. "
+                f"Supported operators: {', '.join(FILTER_OPERATORS)}."
+            )
+
+        value = item.get("value")
+        if operator in NULLARY_OPERATORS:
+            arity = 0
+        elif operator in LIST_OPERATORS:
+            if not isinstance(value, list) or not value:
+                raise QueryValidationError(
+                    f"Operator '{operator}' on column '{column}' needs a non-empty list value."
+                )
+            arity = len(value)
+            params.extend(value)
+        else:
+            arity = 1
+            params.append(value)
+        shape.append((column, operator, arity))
+
+    for value in params:
+        if not isinstance(value, SCALAR_TYPES):
+            raise QueryValidationError(
+                f"Filter values must be strings, numbers, booleans or null, got: {value!r}"
+            )
+    return tuple(shape), params
+
+
+def normalise_order_by(order_by, table_name: str, table_columns) -> tuple:
+    """Parses entries like "id" or "id desc" into (column, direction) pairs."""
+    normalised = []
+    for entry in check_list(order_by, "order_by"):
+        parts = str(entry).split()
+        direction = parts[1].upper() if len(parts) == 2 else "ASC"
+        if not parts or len(parts) > 2 or direction not in ("ASC", "DESC"):
+            raise QueryValidationError(
+                f"Invalid order_by entry '{entry}'. Use 'column' or 'column asc|desc'."
+            )
+        normalised.append((check_column(parts[0], table_name, table_columns), direction))
+    return tuple(normalised)
+
+
+def normalise_aggregates(aggregates, table_name: str, table_columns) -> tuple:
+    """Validates aggregate specs into (function, column, distinct, alias) tuples.
+
+    `column` is None for COUNT(*). The alias defaults to e.g. "count" or "sum_amount".
+    """
+    if not aggregates:
+        raise QueryValidationError("aggregates must list at least one aggregate.")
+    normalised, aliases = [], set()
+    for item in aggregates:
+        if not isinstance(item, dict):
+            raise QueryValidationError(
+                f"Each aggregate must be an object with 'function' and 'column', got: {item!r}"
+            )
+        function = str(item.get("function", "")).strip().lower()
+        if function not in AGGREGATE_FUNCTIONS:
+            raise QueryValidationError(
+                f"Unsupported aggregate function '{item.get('function')}'. "
+                f"Supported functions: {', '.join(AGGREGATE_FUNCTIONS)}."
+            )
+        column = item.get("column")
+        if column in (None, "*"):
+            if function != "count":
+                raise QueryValidationError(f"Aggregate '{function}' needs a column.")
+            column = None
+        else:
+            check_column(column, table_name, table_columns)
+        distinct = bool(item.get("distinct"))
+        if distinct and column is None:
+            raise QueryValidationError("distinct needs a column, e.g. count of distinct user_id.")
+
+        alias = item.get("alias") or (function if column is None else f"{function}_{column}")
+        if not isinstance(alias, str) or alias in aliases:
+            raise QueryValidationError(f"Aggregate alias {alias!r} must be a unique string.")
+        aliases.add(alias)
+        normalised.append((AGGREGATE_FUNCTIONS[function], column, distinct, alias))
+    return tuple(normalised)
+
+
+def _primary_key_column(table: dict) -> str | None:
+    """The column a foreign key without an explicit target column refers to."""
+    key = [column["name"] for column in table["columns"] if column["primary_key"]]
+    if len(key) == 1:
+        return key[0]
+    return "rowid" if not key and table["key_columns"] == ["rowid"] else None
+
+
+def _foreign_key_edges(tables: dict, joined_name: str, new_name: str) -> list[tuple]:
+    """Foreign keys between an already-joined table and a new one.
+
+    Returns ((joined_name, column), (new_name, column), new_is_parent) triples;
+    `new_is_parent` is True when the new table is the referenced one, so each
+    joined row matches at most one of its rows.
+    """
+    edges = []
+    for child, parent in ((joined_name, new_name), (new_name, joined_name)):
+        for fk in tables[child]["foreign_keys"]:
+            if fk["references_table"] != parent:
+                continue
+            target = fk["references_column"] or _primary_key_column(tables[parent])
+            if target is None:
+                continue
+            child_ref, parent_ref = (child, fk["column"]), (parent, target)
+            if child == joined_name:
+                edges.append((child_ref, parent_ref, True))
+            else:
+                edges.append((parent_ref, child_ref, False))
+    return edges
+
+
+def normalise_joins(tables: dict, table_name: str, joins) -> tuple:
+    """Resolves each requested join to the foreign key linking it to the tables before it.
+
+    Returns (table_name, join keyword, (joined_ref, new_ref), new_is_parent) tuples.
+    """
+    if not joins:
+        raise QueryValidationError("joins must list at least one table to join.")
+    joined, normalised = [table_name], []
+    for item in joins:
+        if not isinstance(item, dict) or not isinstance(item.get("table"), str):
+            raise QueryValidationError(
+                f"Each join must be an object with a 'table' name, got: {item!r}"
+            )
+        new_name = item["table"]
+        if tables.get(new_name, {}).get("type") != "table":
+            raise QueryValidationError(f"Table '{new_name}' not found.")
+        if new_name in joined:
+            raise QueryValidationError(f"Table '{new_name}' is already part of the join.")
+        keyword = JOIN_TYPES.get(str(item.get("type", "inner")).strip().lower())
+        if keyword is None:
+            raise QueryValidationError(
+                f"Unsupported join type '{item.get('type')}'. Use one of: {', '.join(JOIN_TYPES)}."
+            )
+
+        edges = [edge for name in joined for edge in _foreign_key_edges(tables, name, new_name)]
+        via = item.get("via")
+        if via:
+            edges = [edge for edge in edges if via in (".".join(edge[0]), ".".join(edge[1]))]
+        if not edges:
+            raise QueryValidationError(
+                f"No foreign key links '{new_name}' to {', '.join(repr(n) for n in joined)}"
+                + (f" via '{via}'." if via else ".")
+            )
+        if len(edges) > 1:
+            raise QueryValidationError(
+                f"Several foreign keys link '{new_name}' to the join. Pass 'via' as one of: "
+                + ", ".join(sorted({".".join(edge[0]) for edge in edges})) + "."
+            )
+        joined_ref, new_ref, new_is_parent = edges[0]
+        normalised.append((new_name, keyword, (joined_ref, new_ref), new_is_parent))
+        joined.append(new_name)
+    return tuple(normalised)
+
+
+def join_column_refs(tables: dict, table_names) -> dict:
+    """Maps the column names usable in a join to (table, column) references.
+
+    Every column can be written as "table.column"; a bare column name is
+    accepted too when exactly one of the joined tables has it.
+    """
+    refs, bare = {}, {}
+    for table_name in table_names:
+        for column in tables[table_name]["column_names"]:
+            refs[f"{table_name}.{column}"] = (table_name, column)
+            bare.setdefault(column, []).append((table_name, column))
+    refs.update({column: matches[0] for column, matches in bare.items() if len(matches) == 1})
+    return refs
+
+
+# --- Compilation: cached per query shape, so repeated shapes skip SQL building ---
+def _where_clause(filter_shape: tuple, condition: str, quote=quote_identifier) -> str:
+    predicates = []
+    for column, operator, arity in filter_shape:
+        if operator in NULLARY_OPERATORS:
+            predicates.append(f"{quote(column)} {operator}")
+        elif operator in LIST_OPERATORS:
+            placeholders = ", ".join("?" for _ in range(arity))
+            predicates.append(f"{quote(column)} {operator} ({placeholders})")
+        else:
+            predicates.append(f"{quote(column)} {operator} ?")
+    if condition:
+        predicates.append(f"({condition})")
+    return f" WHERE {' AND '.join(predicates)}" if predicates else ""
+
+
+def _cursor_clause(
+    sort_keys: tuple, cursor_nulls: tuple, quote=quote_identifier
+) -> tuple[str, tuple]:
+    """Builds a predicate selecting rows strictly after the cursor row.
+
+    SQLite sorts NULLs first in ascending order, so NULL cursor values need
+    their own comparisons. Returns the predicate and, for each placeholder,
+    the index of the cursor value to bind to it.
+    """
+    branches, slots = [], []
+    for i, ((column, direction), is_null) in enumerate(zip(sort_keys, cursor_nulls)):
+        equal = [f"{quote(c)} IS ?" for c, _ in sort_keys[:i]]
+        branch_slots = list(range(i))
+        expr = quote(column)
+        if direction == "ASC" and is_null:
+            after = f"{expr} IS NOT NULL"
+        elif direction == "ASC":
+            after = f"{expr} > ?"
+            branch_slots.append(i)
+        elif is_null:
+            continue  # Nothing sorts after NULL in descending order
+        else:
+            after = f"({expr} < ? OR {expr} IS NULL)"
+            branch_slots.append(i)
+        branches.append("(" + " AND ".join(equal + [after]) + ")")
+        slots.extend(branch_slots)
+    return "(" + (" OR ".join(branches) or "0") + ")", tuple(slots)
+
+
+@lru_cache(maxsize=256)
+def compile_select(
+    table_name: str,
+    columns: tuple,
+    filter_shape: tuple,
+    order_by: tuple,
+    has_limit: bool,
+    condition: str = "",
+    key_columns: tuple = (),
+    cursor_nulls: tuple | None = None,
+) -> tuple[str, tuple, int]:
+    """Compiles a SELECT, optionally keyset-paginated on `key_columns`.
+
+    Returns the SQL, the cursor-value slots to bind after the filter values and
+    the number of hidden key columns appended to the projection.
+    """
+    projection = ", ".join(quote_identifier(c) for c in columns) if columns else "*"
+    sort_keys, key_count = order_by, 0
+    if key_columns:
+        # The key makes the sort order total, so every row has a unique position.
+        sort_keys += tuple(
+            (column, "ASC") for column in key_columns if column not in dict(order_by)
+        )
+        key_count = len(sort_keys)
+        projection += "".join(
+            f", {quote_identifier(column)} AS {PAGE_KEY_PREFIX}{i}"
+            for i, (column, _) in enumerate(sort_keys)
+        )
+
+    sql = f"SELECT {projection} FROM {quote_identifier(table_name)}"
+    where = _where_clause(filter_shape, condition)
+    slots = ()
+    if cursor_nulls is not None:
+        cursor_predicate, slots = _cursor_clause(sort_keys, cursor_nulls)
+        where = f"{where} AND {cursor_predicate}" if where else f" WHERE {cursor_predicate}"
+    sql += where
+    if sort_keys:
+        sql += " ORDER BY " + ", ".join(
+            f"{quote_identifier(column)} {direction}" for column, direction in sort_keys
+        )
+    if has_limit:
+        sql += " LIMIT ?"
+    return sql + ";", slots, key_count
+
+
+@lru_cache(maxsize=256)
+def compile_join(
+    table_name: str,
+    joins: tuple,
+    columns: tuple,
+    filter_shape: tuple,
+    order_by: tuple,
+    has_limit: bool,
+    key_columns: tuple,
+    cursor_nulls: tuple | None = None,
+) -> tuple[str, tuple, int]:
+    """Compiles a keyset-paginated SELECT over joined tables.
+
+    Columns, filters and sort keys are (table, column) references. Returns the
+    same triple as `compile_select`.
+    """
+    sort_keys = order_by + tuple(
+        (column, "ASC") for column in key_columns if column not in dict(order_by)
+    )
+    projection = ", ".join(
+        f"{quote_column_ref(ref)} AS {quote_identifier('.'.join(ref))}" for ref in columns
+    ) + "".join(
+        f", {quote_column_ref(column)} AS {PAGE_KEY_PREFIX}{i}"
+        for i, (column, _) in enumerate(sort_keys)
+    )
+
+    sql = f"SELECT {projection} FROM {quote_identifier(table_name)}"
+    for new_name, keyword, (joined_ref, new_ref), _ in joins:
+        sql += (
+            f" {keyword} {quote_identifier(new_name)}"
+            f" ON {quote_column_ref(new_ref)} = {quote_column_ref(joined_ref)}"
+        )
+    where = _where_clause(filter_shape, "", quote_column_ref)
+    slots = ()
+    if cursor_nulls is not None:
+        cursor_predicate, slots = _cursor_clause(sort_keys, cursor_nulls, quote_column_ref)
+        where = f"{where} AND {cursor_predicate}" if where else f" WHERE {cursor_predicate}"
+    sql += where
+    sql += " ORDER BY " + ", ".join(
+        f"{quote_column_ref(column)} {direction}" for column, direction in sort_keys
+    )
+    if has_limit:
+        sql += " LIMIT ?"
+    return sql + ";", slots, len(sort_keys)
+
+
+@lru_cache(maxsize=256)
+def compile_aggregate(
+    table_name: str,
+    aggregates: tuple,
+    group_by: tuple,
+    filter_shape: tuple,
+    order_by: tuple,
+    has_limit: bool,
+) -> str:
+    """Compiles a grouped aggregate SELECT. `order_by` may name group columns or aliases."""
+    projection = [quote_identifier(column) for column in group_by] + [
+        f"{function}({'DISTINCT ' if distinct else ''}"
+        f"{quote_identifier(column) if column else '*'}) AS {quote_identifier(alias)}"
+        for function, column, distinct, alias in aggregates
+    ]
+    sql = f"SELECT {', '.join(projection)} FROM {quote_identifier(table_name)}"
+    sql += _where_clause(filter_shape, "")
+    if group_by:
+        sql += " GROUP BY " + ", ".join(quote_identifier(column) for column in group_by)
+    if order_by:
+        sql += " ORDER BY " + ", ".join(
+            f"{quote_identifier(column)} {direction}" for column, direction in order_by
+        )
+    if has_limit:
+        sql += " LIMIT ?"
+    return sql + ";"
+
+
+@lru_cache(maxsize=256)
+def compile_delete(table_name: str, filter_shape: tuple, condition: str = "") -> str:
+    return f"DELETE FROM {quote_identifier(table_name)}{_where_clause(filter_shape, condition)};"
+
+
+@lru_cache(maxsize=256)
+def compile_insert(table_name: str, columns: tuple) -> str:
+    placeholders = ", ".join("?" for _ in columns)
+    projection = ", ".join(quote_identifier(c) for c in columns)
+    return f"INSERT INTO {quote_identifier(table_name)} ({projection}) VALUES ({placeholders});"
+
+
+@lru_cache(maxsize=256)
+def compile_upsert(table_name: str, columns: tuple, conflict_columns: tuple) -> str:
+    update_columns = [c for c in columns if c not in conflict_columns]
+    if update_columns:
+        action = "DO UPDATE SET " + ", ".join(
+            f"{quote_identifier(c)} = excluded.{quote_identifier(c)}" for c in update_columns
+        )
+    else:
+        action = "DO NOTHING"
+    target = ", ".join(quote_identifier(c) for c in conflict_columns)
+    return f"{compile_insert(table_name, columns)[:-1]} ON CONFLICT ({target}) {action};"
+
+
+# --- Public builders used by the tools ---
+def encode_page_token(values: list, fingerprint: str) -> str:
+    payload = json.dumps({"q": fingerprint, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_page_token(token: str, fingerprint: str) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, token_fingerprint = payload["k"], payload["q"]
+    except (ValueError, TypeError, KeyError):
+        raise QueryValidationError("Invalid page_token.")
+    if token_fingerprint != fingerprint or not isinstance(values, list):
+        raise QueryValidationError(
+            "page_token does not belong to this query. Repeat the original "
+            "table, columns, filters and order_by when requesting the next page."
+        )
+    return values
+
+
+def build_select(
+    table: dict,
+    columns: str = "*",
+    filters: list | None = None,
+    order_by: list | None = None,
+    limit: int | None = None,
+    condition: str | None = None,
+    page_token: str | None = None,
+) -> SelectQuery:
+    """Validates a structured query against a catalog `table` entry and compiles it.
+
+    The query is keyset-paginated on the table's key columns: `limit` is the
+    page size, and `page_token` (from a previous page) resumes after the last
+    row returned.
+    """
+    check_limit(limit)
+
+    table_name, table_columns = table["name"], table["column_names"]
+    key_columns = tuple(table["key_columns"])
+    normalised_columns = normalise_columns(columns, table_name, table_columns)
+    filter_shape, params = normalise_filters(filters, table_name, table_columns)
+    normalised_order_by = normalise_order_by(order_by, table_name, table_columns)
+    condition = condition.strip() if condition else ""
+
+    fingerprint = hashlib.sha1(
+        repr(
+            (table_name, normalised_columns, filter_shape, params, normalised_order_by, condition)
+        ).encode()
+    ).hexdigest()[:16]
+
+    cursor_values, cursor_nulls = None, None
+    if page_token:
+        if not key_columns:
+            raise QueryValidationError(f"'{table_name}' has no key to paginate on.")
+        cursor_values = decode_page_token(page_token, fingerprint)
+        cursor_nulls = tuple(value is None for value in cursor_values)
+
+    sql, slots, key_count = compile_select(
+        table_name,
+        normalised_columns,
+        filter_shape,
+        normalised_order_by,
+        bool(limit),
+        condition,
+        key_columns,
+        cursor_nulls,
+    )
+    if cursor_values is not None:
+        try:
+            params.extend(cursor_values[slot] for slot in slots)
+        except IndexError:
+            raise QueryValidationError("Invalid page_token.")
+    if limit:
+        params.append(limit)
+
+    shape = QueryShape(table_name, normalised_columns, filter_shape, normalised_order_by)
+    return SelectQuery(sql, params, key_count, fingerprint, (shape,))
+
+
+def fetch_page(
+    cursor: sqlite3.Cursor, select: SelectQuery, page_size: int, batch_size: int = 100
+) -> dict:
+    """Executes `select` and reads at most `page_size` rows with `fetchmany`.
+
+    `select` must have been built with `limit=page_size + 1`; the extra row only
+    signals that another page exists. Returns the column names, the rows as
+    value lists in the same order (without the hidden key columns) and the
+    token for the next page, if any.
+    """
+    cursor.row_factory = None  # Plain tuples, no per-row dicts
+    cursor.execute(select.sql, select.params)
+    visible = len(cursor.description) - select.key_count
+    names = [description[0] for description in cursor.description[:visible]]
+
+    rows, last_row, has_more = [], None, False
+    while not has_more:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        for row in batch:
+            if len(rows) == page_size:
+                has_more = True
+                break
+            rows.append(list(row[:visible]))
+            last_row = row
+    cursor.close()
+
+    next_page_token = None
+    if has_more and select.key_count:
+        next_page_token = encode_page_token(list(last_row[visible:]), select.fingerprint)
+    return {
+        "columns": names,
+        "rows": rows,
+        "row_count": len(rows),
+        "has_more": has_more,
+        "next_page_token": next_page_token,
+    }
+
+
+def build_aggregate(
+    table: dict,
+    aggregates: list,
+    group_by: list | None = None,
+    filters: list | None = None,
+    order_by: list | None = None,
+    limit: int | None = None,
+) -> SelectQuery:
+    """Validates and compiles an aggregate query against a catalog `table` entry.
+
+    Groups are sorted by the group-by columns unless `order_by` says otherwise.
+    """
+    check_limit(limit)
+
+    table_name, table_columns = table["name"], table["column_names"]
+    normalised_aggregates = normalise_aggregates(aggregates, table_name, table_columns)
+    normalised_group_by = tuple(
+        dict.fromkeys(
+            check_column(column, table_name, table_columns)
+            for column in check_list(group_by, "group_by")
+        )
+    )
+    filter_shape, params = normalise_filters(filters, table_name, table_columns)
+    result_columns = normalised_group_by + tuple(alias for *_, alias in normalised_aggregates)
+    try:
+        normalised_order_by = normalise_order_by(order_by, table_name, result_columns)
+    except QueryValidationError:
+        raise QueryValidationError(
+            f"order_by entries must name a group-by column or aggregate alias "
+            f"({', '.join(result_columns)}), optionally followed by asc or desc."
+        )
+    normalised_order_by = normalised_order_by or tuple(
+        (column, "ASC") for column in normalised_group_by
+    )
+
+    sql = compile_aggregate(
+        table_name,
+        normalised_aggregates,
+        normalised_group_by,
+        filter_shape,
+        normalised_order_by,
+        bool(limit),
+    )
+    if limit:
+        params.append(limit)
+    fingerprint = hashlib.sha1(repr((sql, params)).encode()).hexdigest()[:16]
+    # For the index advisor: grouping benefits from an index the way sorting does.
+    shape = QueryShape(
+        table_name,
+        tuple(column for _, column, _, _ in normalised_aggregates if column),
+        filter_shape,
+        tuple((column, "ASC") for column in normalised_group_by),
+    )
+    return SelectQuery(sql, params, 0, fingerprint, (shape,))
+
+
+def build_join(
+    tables: dict,
+    table_name: str,
+    joins: list,
+    columns: list | None = None,
+    filters: list | None = None,
+    order_by: list | None = None,
+    limit: int | None = None,
+    page_token: str | None = None,
+) -> SelectQuery:
+    """Validates and compiles a query over `table_name` and the tables joined to it.
+
+    `tables` is the schema catalog. Joins follow foreign keys; columns are
+    named "table.column" (or bare, when unambiguous) and the result columns
+    are always qualified. Pages are keyed on the base table's key plus the
+    key of every table joined from the referenced side, since only those
+    joins can repeat a base row.
+    """
+    check_limit(limit)
+    if tables.get(table_name, {}).get("type") != "table":
+        raise QueryValidationError(f"Table '{table_name}' not found.")
+
+    normalised_joins = normalise_joins(tables, table_name, joins)
+    table_names = [table_name] + [join[0] for join in normalised_joins]
+    refs = join_column_refs(tables, table_names)
+    label = f"{table_name} joined with {', '.join(table_names[1:])}"
+
+    if columns:
+        normalised_columns = tuple(
+            dict.fromkeys(refs[check_column(column, label, refs)] for column in columns)
+        )
+    else:
+        normalised_columns = tuple(ref for ref in refs.values() if ref is refs[".".join(ref)])
+    filter_shape, params = normalise_filters(filters, label, refs)
+    filter_shape = tuple((refs[column], operator, arity) for column, operator, arity in filter_shape)
+    normalised_order_by = tuple(
+        (refs[column], direction) for column, direction in normalise_order_by(order_by, label, refs)
+    )
+    key_columns = tuple(
+        (name, column)
+        for name in [table_name] + [join[0] for join in normalised_joins if not join[3]]
+        for column in tables[name]["key_columns"]
+    )
+
+    fingerprint = hashlib.sha1(
+        repr((normalised_joins, normalised_columns, filter_shape, params, normalised_order_by)).encode()
+    ).hexdigest()[:16]
+    cursor_values, cursor_nulls = None, None
+    if page_token:
+        cursor_values = decode_page_token(page_token, fingerprint)
+        cursor_nulls = tuple(value is None for value in cursor_values)
+
+    sql, slots, key_count = compile_join(
+        table_name,
+        normalised_joins,
+        normalised_columns,
+        filter_shape,
+        normalised_order_by,
+        bool(limit),
+        key_columns,
+        cursor_nulls,
+    )
+    if cursor_values is not None:
+        try:
+            params.extend(cursor_values[slot] for slot in slots)
+        except IndexError:
+            raise QueryValidationError("Invalid page_token.")
+    if limit:
+        params.append(limit)
+
+    # For the index advisor: each table's own filters, plus the join column of
+    # every table that is looked up by it for each row of the tables before it.
+    shapes = []
+    for name in table_names:
+        own_filters = tuple(
+            (column, operator, arity) for (t, column), operator, arity in filter_shape if t == name
+        )
+        probes = tuple(
+            (new_ref[1], "=", 1) for new_name, _, (_, new_ref), _ in normalised_joins if new_name == name
+        )
+        order = ()
+        if name == table_name:
+            order = tuple((column, d) for (t, column), d in normalised_order_by if t == name)
+        shapes.append(QueryShape(name, (), probes + own_filters, order))
+    return SelectQuery(sql, params, key_count, fingerprint, tuple(shapes))
+
+
+def build_delete(
+    table: dict,
+    filters: list | None = None,
+    condition: str | None = None,
+) -> tuple[str, list]:
+    """Validates and compiles a DELETE statement. Returns the SQL and its parameters."""
+    table_name, table_columns = table["name"], table["column_names"]
+    filter_shape, params = normalise_filters(filters, table_name, table_columns)
+    sql = compile_delete(table_name, filter_shape, condition.strip() if condition else "")
+    return sql, params
+
+
+def build_insert(table: dict, columns) -> str:
+    """Validates the target columns and compiles an INSERT statement."""
+    table_name, table_columns = table["name"], table["column_names"]
+    return compile_insert(
+        table_name,
+        tuple(check_column(column, table_name, table_columns) for column in columns),
+    )
+
+
+def build_upsert(table: dict, columns, conflict_columns) -> str:
+    """Validates and compiles an INSERT ... ON CONFLICT DO UPDATE statement.
+
+    Columns not listed in `conflict_columns` are overwritten on conflict.
+    """
+    table_name, table_columns = table["name"], table["column_names"]
+    if not conflict_columns:
+        raise QueryValidationError("conflict_columns must name at least one column.")
+    columns = tuple(check_column(column, table_name, table_columns) for column in columns)
+    conflict_columns = tuple(
+        check_column(column, table_name, table_columns) for column in conflict_columns
+    )
+    missing = [c for c in conflict_columns if c not in columns]
+    if missing:
+        raise QueryValidationError(
+            f"Conflict columns {missing} must also be present in every row."
+        )
+    return compile_upsert(table_name, columns, conflict_columns)
@@ -0,0 +1,84 @@
+import inspect
+import types
+import typing
+from typing import NamedTuple
+
+# Python annotations mapped to their JSON schema type names.
+JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+}
+
+
+class ToolSpec(NamedTuple):
+    """A plain function exposed as an MCP tool, with its advertised schema."""
+
+    name: str
+    func: typing.Callable
+    description: str
+    input_schema: dict
+
+
+def annotation_schema(annotation, where: str) -> dict:
+    """Converts a parameter annotation into a JSON schema fragment.
+
+    Optional[X] is emitted as X with `"nullable": true`, the same shape the
+    ADK's FunctionTool declarations produce.
+
+    Raises:
+        TypeError: If the annotation has no JSON schema equivalent.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        members = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(members) != 1:
+            raise TypeError(f"{where}: only Optional[X] unions are supported, got {annotation}.")
+        schema = annotation_schema(members[0], where)
+        return {"type": schema.pop("type"), "nullable": True, **schema}
+
+    base = origin or annotation
+    if base not in JSON_TYPES:
+        raise TypeError(f"{where}: unsupported parameter type {annotation}.")
+    schema = {"type": JSON_TYPES[base]}
+    if base is list:
+        item_types = typing.get_args(annotation)
+        if item_types:
+            schema["items"] = annotation_schema(item_types[0], where)
+    return schema
+
+
+def function_input_schema(func) -> dict:
+    """Builds the MCP input schema for a function from its signature.
+
+    Every parameter that is not Optional is listed as required, whether or not
+    it has a default, matching the schemas the ADK generated for these tools.
+    """
+    properties = {}
+    required = []
+    hints = typing.get_type_hints(func)
+    for name in inspect.signature(func).parameters:
+        if name not in hints:
+            raise TypeError(f"{func.__name__}.{name}: a type annotation is required.")
+        properties[name] = annotation_schema(hints[name], f"{func.__name__}.{name}")
+        if not properties[name].get("nullable"):
+            required.append(name)
+
+    # The ADK lists "required" even when it is empty
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def build_tool_spec(func, name: str | None = None) -> ToolSpec:
+    """Describes a plain function as an MCP tool without importing the ADK.
+
+    The docstring becomes the description and the signature the input schema.
+    """
+    return ToolSpec(
+        name=name or func.__name__,
+        func=func,
+        description=inspect.cleandoc(func.__doc__ or ""),
+        input_schema=function_input_schema(func),
+    )
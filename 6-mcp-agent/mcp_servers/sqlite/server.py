@@ -1,45 +1,217 @@
 import asyncio
+import contextlib
+import contextvars
+import inspect
 import json
 import logging  # Added logging
 import os
 import sqlite3  # For database operations
+import time
+from typing import Optional
 
-import mcp.server.stdio  # For running as a stdio server
 from dotenv import load_dotenv
 
-# ADK Tool Imports
-from google.adk.tools.function_tool import FunctionTool
-from google.adk.tools.mcp_tool.conversion_utils import adk_to_mcp_tool_type
-
 # MCP Server Imports
 from mcp import types as mcp_types  # Use alias to avoid conflict
 from mcp.server.lowlevel import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 
 import db
+import fts
+import query
 import utils
+from advisor import IndexAdvisor, summarise_plan
+from budget import BudgetExceededError, QueryBudget, QueryBudgets
+from cache import ResultCache
+from catalog import SchemaCatalog
+from executor import READ, WRITE, ExecutorBusyError, ToolExecutor
+from logger import setup_logging, truncate_payload
+from metrics import LatencyRecorder
+from pool import READ_ONLY_PRAGMAS, ConnectionPool
+from schema import ToolSpec, build_tool_spec
 
 load_dotenv()
 
 # --- Logging Setup ---
+# Records are handed to a background thread through a queue, so file I/O
+# never runs on the event loop. Logged tool payloads are truncated.
 LOG_FILE_PATH = utils.get_log_path()
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH, mode="w"),
-    ],
+setup_logging(
+    LOG_FILE_PATH,
+    level=os.getenv("SQLITE_LOG_LEVEL", "INFO"),
+    max_bytes=int(os.getenv("SQLITE_LOG_MAX_BYTES", str(5 * 1024 * 1024))),
+    backup_count=int(os.getenv("SQLITE_LOG_BACKUP_COUNT", "3")),
+    payload_chars=int(os.getenv("SQLITE_LOG_PAYLOAD_CHARS", "500")),
 )
 # --- End Logging Setup ---
 
 DATABASE_PATH = utils.get_db_path()
 
+# --- Connection Pool Setup ---
+# Connections are opened once (WAL + tuned pragmas) and reused across tool calls.
+POOL = ConnectionPool(
+    DATABASE_PATH,
+    size=int(os.getenv("SQLITE_POOL_SIZE", "5")),
+    timeout=float(os.getenv("SQLITE_POOL_TIMEOUT", "5")),
+    health_check_interval=float(os.getenv("SQLITE_POOL_HEALTH_CHECK_INTERVAL", "30")),
+)
+# --- End Connection Pool Setup ---
+
+# --- Tool Executor Setup ---
+# Tools run on worker threads so slow SQL never blocks the asyncio event loop.
+# SQLite has a single writer, so writes get their own (small) limit; keep
+# SQLITE_POOL_SIZE >= reads + writes so every running call gets a connection.
+EXECUTOR = ToolExecutor(
+    max_reads=int(os.getenv("SQLITE_MAX_CONCURRENT_READS", "4")),
+    max_writes=int(os.getenv("SQLITE_MAX_CONCURRENT_WRITES", "1")),
+    max_queued=int(os.getenv("SQLITE_MAX_QUEUED_CALLS", "64")),
+)
+# --- End Tool Executor Setup ---
+
+# --- Read-Only Pool Setup ---
+# Tools that never write borrow mode=ro connections with query_only on and the
+# database memory-mapped. In WAL mode they read alongside the writer.
+READ_POOL = ConnectionPool(
+    DATABASE_PATH,
+    size=int(os.getenv("SQLITE_READ_POOL_SIZE", str(EXECUTOR.limits[READ]))),
+    timeout=float(os.getenv("SQLITE_POOL_TIMEOUT", "5")),
+    health_check_interval=float(os.getenv("SQLITE_POOL_HEALTH_CHECK_INTERVAL", "30")),
+    pragmas={
+        **READ_ONLY_PRAGMAS,
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(READ_ONLY_PRAGMAS["mmap_size"]))),
+    },
+    read_only=True,
+)
+# --- End Read-Only Pool Setup ---
+
+# Per-tool latency samples (queue wait, execution, serialisation) for server_stats.
+METRICS = LatencyRecorder(window=int(os.getenv("SQLITE_METRICS_WINDOW", "1024")))
+
+# Schema metadata is cached in-process and rebuilt only when PRAGMA schema_version changes.
+CATALOG = SchemaCatalog()
+
+# LRU cache of query_db_table pages, invalidated by this server's writes and
+# by external commits (PRAGMA data_version). A size of 0 disables it.
+RESULT_CACHE_SIZE = int(os.getenv("SQLITE_RESULT_CACHE_SIZE", "256"))
+RESULT_CACHE = ResultCache(DATABASE_PATH, max_entries=RESULT_CACHE_SIZE)
+
+# Counts the query shapes query_db_table executes, to suggest indexes for them.
+ADVISOR = IndexAdvisor(max_shapes=int(os.getenv("SQLITE_ADVISOR_MAX_SHAPES", "512")))
+
+# Free-text SQL conditions are injectable and defeat statement caching, so they
+# are only honoured when explicitly enabled. Structured `filters` are preferred.
+ALLOW_RAW_CONDITIONS = os.getenv("SQLITE_ALLOW_RAW_CONDITIONS", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Rows per executemany() call in the bulk tools; all chunks share one transaction.
+BULK_CHUNK_SIZE = int(os.getenv("SQLITE_BULK_CHUNK_SIZE", "500"))
+
+# How tool results are serialised: "compact" (columnar rows, no whitespace) or
+# "pretty" (one indented object per row). Clients can override it per call.
+RESPONSE_FORMATS = ("compact", "pretty")
+DEFAULT_RESPONSE_FORMAT = os.getenv("SQLITE_RESPONSE_FORMAT", "compact")
+
+# Hard cap on rows returned by a single query_db_table call; larger results are paged.
+MAX_PAGE_SIZE = int(os.getenv("SQLITE_MAX_PAGE_SIZE", "500"))
+FETCH_BATCH_SIZE = 100
+
+# Per-call limits on the SQL that query_db_table, join_tables, aggregate,
+# search_text and delete_data run, so a runaway query cannot hold a worker or the write lock.
+# Statements over budget are interrupted from SQLite's progress handler.
+# SQLITE_TOOL_BUDGETS overrides them per tool, e.g.
+# '{"delete_data": {"timeout": 2}, "query_db_table": {"max_steps": 50000000, "max_rows": 100}}'.
+BUDGETS = QueryBudgets.from_config(
+    QueryBudget(
+        timeout=float(os.getenv("SQLITE_QUERY_TIMEOUT", "5")),
+        max_steps=int(os.getenv("SQLITE_QUERY_MAX_STEPS", "0")),
+        max_rows=MAX_PAGE_SIZE,
+    ),
+    os.getenv("SQLITE_TOOL_BUDGETS", ""),
+)
+
 
 # --- Database Utility Functions ---
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # To access columns by name
-    return conn
+class _DeferredCommitConnection:
+    """A connection whose commit and rollback are left to an enclosing atomic batch."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+# Set while an atomic batch runs: every tool in it shares this connection and transaction.
+_batch_connection: contextvars.ContextVar = contextvars.ContextVar("batch_connection", default=None)
+
+
+def get_db_connection(read_only: bool = False):
+    """Borrows a pooled connection; use as `with get_db_connection() as conn:`.
+
+    Pass `read_only=True` from tools that never write, to use the read-only pool.
+    Inside an atomic batch, the batch's own connection is returned instead.
+    """
+    batch_conn = _batch_connection.get()
+    if batch_conn is not None:
+        return contextlib.nullcontext(batch_conn)
+    return (READ_POOL if read_only else POOL).connection()
+
+
+def use_result_cache(use_cache: Optional[bool]) -> bool:
+    """Whether a read tool may use the result cache for this call.
+
+    Reads inside an atomic batch can see the batch's uncommitted writes, so
+    their results are never cached.
+    """
+    return RESULT_CACHE_SIZE > 0 and use_cache is not False and _batch_connection.get() is None
+
+
+def get_table(conn: sqlite3.Connection, table_name: str) -> dict:
+    """Looks up a table (or view) in the schema catalog."""
+    try:
+        return CATALOG.table(conn, table_name)
+    except KeyError:
+        raise query.QueryValidationError(f"Table '{table_name}' not found.")
+
+
+def page_size_for(limit: Optional[int], max_rows: int) -> int:
+    """The number of rows a read tool returns: `limit`, capped at `max_rows`.
+
+    Raises:
+        query.QueryValidationError: If `limit` is not a non-negative integer.
+    """
+    query.check_limit(limit)
+    return min(limit or max_rows, max_rows)
+
+
+def invalidate_cached_results(conn: sqlite3.Connection, table_name: str, data_version: int):
+    """Drops cached query results that a committed write to `table_name` may have changed.
+
+    Tables with foreign keys into `table_name` are included, since cascading
+    actions can modify them too. Results read from views are always dropped,
+    since the tables a view reads are not tracked. If the written tables have
+    triggers (other than those syncing full-text indexes), every result is dropped.
+    `data_version` is what RESULT_CACHE.begin_write returned for `conn` before the write.
+    """
+    tables = CATALOG.refresh(conn)
+    written = {table_name} | {
+        table["name"]
+        for table in tables.values()
+        if any(fk["references_table"] == table_name for fk in table["foreign_keys"])
+    }
+    if any(tables[name]["triggers"] for name in written if name in tables):
+        written = set(tables)  # A trigger may have written any table
+    written |= {table["name"] for table in tables.values() if table["type"] == "view"}
+    RESULT_CACHE.record_write(written, conn, data_version)
 
 
 def list_db_tables(dummy_param: str) -> dict:
@@ -53,11 +225,12 @@ def list_db_tables(dummy_param: str) -> dict:
               and 'tables' (list[str]) containing the table names if successful.
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        with get_db_connection(read_only=True) as conn:
+            tables = [
+                table["name"]
+                for table in CATALOG.refresh(conn).values()
+                if table["type"] == "table"
+            ]
         return {
             "success": True,
             "message": "Tables listed successfully.",
@@ -75,43 +248,404 @@ def list_db_tables(dummy_param: str) -> dict:
 
 def get_table_schema(table_name: str) -> dict:
     """Gets the schema (column names and types) of a specific table."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"PRAGMA table_info('{table_name}');")  # Use PRAGMA for schema
-    schema_info = cursor.fetchall()
-    conn.close()
-    if not schema_info:
-        raise ValueError(f"Table '{table_name}' not found or no schema information.")
-
-    columns = [{"name": row["name"], "type": row["type"]} for row in schema_info]
+    with get_db_connection(read_only=True) as conn:
+        try:
+            table = CATALOG.table(conn, table_name)
+        except KeyError:
+            raise ValueError(f"Table '{table_name}' not found or no schema information.")
+
+    columns = [{"name": c["name"], "type": c["type"]} for c in table["columns"]]
     return {"table_name": table_name, "columns": columns}
 
 
-def query_db_table(table_name: str, columns: str, condition: str) -> list[dict]:
-    """Queries a table with an optional condition.
+def describe_database(dummy_param: str) -> dict:
+    """Describes the whole database in one call: every table and view with its
+    columns (name, type, not-null, default, primary-key position), indexes and
+    foreign keys.
+
+    Args:
+        dummy_param (str): This parameter is not used by the function
+                           but helps ensure schema generation. A non-empty string is expected.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'schema_version' (int)
+              and 'tables' (list[dict]) describing each table.
+    """
+    with get_db_connection(read_only=True) as conn:
+        return {"success": True, **CATALOG.describe(conn)}
+
+
+def server_stats(dummy_param: str) -> dict:
+    """Reports server health: per-tool call counts and p50/p95/p99 latencies
+    (queue wait, execution and serialisation), executor, connection pool and
+    result cache usage (hits, misses, invalidations), query budgets and how
+    often each was exceeded, and the number of query shapes seen by the
+    index advisor.
+
+    Args:
+        dummy_param (str): This parameter is not used by the function
+                           but helps ensure schema generation. A non-empty string is expected.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'tools', 'executor', 'pool',
+              'read_pool', 'result_cache', 'query_budgets', 'schema_catalog_rebuilds'
+              and 'advisor_shapes_seen'.
+    """
+    return {
+        "success": True,
+        "tools": METRICS.summary(),
+        "executor": EXECUTOR.stats(),
+        "pool": POOL.stats(),
+        "read_pool": READ_POOL.stats(),
+        "result_cache": RESULT_CACHE.stats(),
+        "query_budgets": BUDGETS.stats(),
+        "schema_catalog_rebuilds": CATALOG.rebuilds,
+        "advisor_shapes_seen": ADVISOR.shapes_seen(),
+    }
+
+
+def check_raw_condition(condition: str):
+    """Rejects a free-text condition unless raw conditions are enabled."""
+    if condition and condition.strip() and not ALLOW_RAW_CONDITIONS:
+        raise query.QueryValidationError(
+            "Raw SQL conditions are disabled on this server. "
+            "Use 'filters' (column/operator/value objects) instead."
+        )
+
+
+def query_db_table(
+    table_name: str,
+    columns: str = "*",
+    filters: Optional[list[dict]] = None,
+    order_by: Optional[list[str]] = None,
+    limit: Optional[int] = None,
+    page_token: Optional[str] = None,
+    condition: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+) -> dict:
+    """Queries a table one page at a time, optionally filtering and sorting the rows.
 
     Args:
         table_name: The name of the table to query.
         columns: Comma-separated list of columns to retrieve (e.g., "id, name"). Defaults to "*".
-        condition: Optional SQL WHERE clause condition (e.g., "id = 1" or "completed = 0").
+        filters: Optional list of filter objects, combined with AND. Each has a
+                 "column", an "operator" (=, !=, <, <=, >, >=, like, not like, in,
+                 not in, is null, is not null; defaults to =) and a "value"
+                 (a list for in / not in), e.g. [{"column": "completed", "operator": "=", "value": 0}].
+        order_by: Optional list of sort keys such as ["id"] or ["id desc"].
+        limit: Optional page size. Capped by the server's maximum page size.
+        page_token: The `next_page_token` of the previous page, to continue the
+                    same query. Omit it for the first page.
+        condition: Raw SQL WHERE clause condition. Only accepted when the server
+                   enables raw conditions; prefer `filters`.
+        use_cache: Set to false to bypass the server's result cache and read fresh data.
     Returns:
-        A list of dictionaries, where each dictionary represents a row.
+        dict: A dictionary with keys 'success' (bool), 'columns' (list[str]),
+              'rows' (list[list], each row's values in `columns` order),
+              'row_count' (int), 'has_more' (bool), 'next_page_token'
+              (str, or null on the last page) and 'cached' (bool).
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    query = f"SELECT {columns} FROM {table_name}"
-    if condition:
-        query += f" WHERE {condition}"
-    query += ";"
+    check_raw_condition(condition)
+    page_size = page_size_for(limit, BUDGETS.max_rows("query_db_table", MAX_PAGE_SIZE))
 
-    try:
-        cursor.execute(query)
-        results = [dict(row) for row in cursor.fetchall()]
-    except sqlite3.Error as e:
-        conn.close()
-        raise ValueError(f"Error querying table '{table_name}': {e}")
-    conn.close()
-    return results
+    with get_db_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        try:
+            select = query.build_select(
+                get_table(conn, table_name),
+                columns,
+                filters,
+                order_by,
+                page_size + 1,  # One extra row tells us whether another page exists
+                condition,
+                page_token,
+            )
+            # Raw conditions may read other tables, so their results are never cached.
+            cacheable = use_result_cache(use_cache) and not condition
+            if cacheable:
+                cache_key = (select.sql, tuple(select.params))
+                generation = RESULT_CACHE.check_external_writes()
+                page = RESULT_CACHE.get(cache_key)
+                if page is not None:
+                    return {"success": True, **page, "cached": True}
+
+            for shape in select.shapes:
+                ADVISOR.record(shape)
+            with BUDGETS.enforce(conn, "query_db_table"):
+                page = query.fetch_page(cursor, select, page_size, FETCH_BATCH_SIZE)
+            if cacheable:
+                RESULT_CACHE.put(cache_key, (table_name,), page, generation)
+        except sqlite3.Error as e:
+            raise ValueError(f"Error querying table '{table_name}': {e}")
+    return {"success": True, **page, "cached": False}
+
+
+def join_tables(
+    table_name: str,
+    joins: list[dict],
+    columns: Optional[list[str]] = None,
+    filters: Optional[list[dict]] = None,
+    order_by: Optional[list[str]] = None,
+    limit: Optional[int] = None,
+    page_token: Optional[str] = None,
+    use_cache: Optional[bool] = None,
+) -> dict:
+    """Queries a table together with related tables in one call, following foreign keys.
+
+    Use this instead of querying one table and then looking up related rows
+    in another (e.g. a user's todos by username).
+
+    Args:
+        table_name: The table to start from, e.g. "todos".
+        joins: List of join objects, each with the "table" to join (linked by a
+               foreign key to the start table or an earlier join), an optional
+               "type" ("inner", the default, or "left" to keep rows without a
+               match) and an optional "via" column such as "todos.user_id" when
+               several foreign keys link the tables, e.g. [{"table": "users"}].
+        columns: Optional list of columns as "table.column" (a bare column name
+                 works when only one joined table has it). Defaults to all columns.
+        filters: Optional list of filter objects, as for query_db_table, whose
+                 "column" may be "table.column", e.g.
+                 [{"column": "users.username", "value": "bob"}].
+        order_by: Optional list of sort keys such as ["todos.id desc"].
+        limit: Optional page size. Capped by the server's maximum page size.
+        page_token: The `next_page_token` of the previous page, to continue the
+                    same query. Omit it for the first page.
+        use_cache: Set to false to bypass the server's result cache and read fresh data.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'columns' (list[str], as
+              "table.column"), 'rows' (list[list]), 'row_count' (int),
+              'has_more' (bool), 'next_page_token' (str, or null on the last
+              page) and 'cached' (bool).
+    """
+    page_size = page_size_for(limit, BUDGETS.max_rows("join_tables", MAX_PAGE_SIZE))
+
+    with get_db_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        try:
+            select = query.build_join(
+                CATALOG.refresh(conn),
+                table_name,
+                joins,
+                columns,
+                filters,
+                order_by,
+                page_size + 1,  # One extra row tells us whether another page exists
+                page_token,
+            )
+            table_names = [shape.table for shape in select.shapes]
+            cacheable = use_result_cache(use_cache)
+            if cacheable:
+                cache_key = (select.sql, tuple(select.params))
+                generation = RESULT_CACHE.check_external_writes()
+                page = RESULT_CACHE.get(cache_key)
+                if page is not None:
+                    return {"success": True, **page, "cached": True}
+
+            for shape in select.shapes:
+                ADVISOR.record(shape)
+            with BUDGETS.enforce(conn, "join_tables"):
+                page = query.fetch_page(cursor, select, page_size, FETCH_BATCH_SIZE)
+            if cacheable:
+                RESULT_CACHE.put(cache_key, table_names, page, generation)
+        except sqlite3.Error as e:
+            raise ValueError(f"Error joining tables on '{table_name}': {e}")
+    return {"success": True, **page, "cached": False}
+
+
+def aggregate(
+    table_name: str,
+    aggregates: list[dict],
+    group_by: Optional[list[str]] = None,
+    filters: Optional[list[dict]] = None,
+    order_by: Optional[list[str]] = None,
+    limit: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+) -> dict:
+    """Computes counts, sums, averages, minimums or maximums in SQLite, optionally per group.
+
+    Use this instead of fetching rows to count or total them yourself.
+
+    Args:
+        table_name: The name of the table to summarise.
+        aggregates: List of aggregate objects, each with a "function" (count, sum,
+                    avg, min, max), a "column" (omit or "*" for count of rows),
+                    optionally "distinct": true and an "alias" for the result
+                    column, e.g. [{"function": "count"}, {"function": "avg", "column": "price"}].
+        group_by: Optional list of columns to group by, e.g. ["user_id"].
+        filters: Optional list of filter objects applied before grouping, as for query_db_table.
+        order_by: Optional list of group-by columns or aggregate aliases to sort
+                  by, e.g. ["count desc"]. Defaults to the group-by columns.
+        limit: Optional maximum number of groups. Capped by the server's maximum page size.
+        use_cache: Set to false to bypass the server's result cache and read fresh data.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'columns' (list[str], the
+              group-by columns then the aggregate aliases), 'rows' (list[list]),
+              'row_count' (int), 'has_more' (bool, true if groups were cut off
+              by the limit) and 'cached' (bool).
+    """
+    page_size = page_size_for(limit, BUDGETS.max_rows("aggregate", MAX_PAGE_SIZE))
+
+    with get_db_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        try:
+            select = query.build_aggregate(
+                get_table(conn, table_name),
+                aggregates,
+                group_by,
+                filters,
+                order_by,
+                page_size + 1,  # One extra row tells us whether groups were cut off
+            )
+            cacheable = use_result_cache(use_cache)
+            if cacheable:
+                cache_key = (select.sql, tuple(select.params))
+                generation = RESULT_CACHE.check_external_writes()
+                page = RESULT_CACHE.get(cache_key)
+                if page is not None:
+                    return {"success": True, **page, "cached": True}
+
+            for shape in select.shapes:
+                ADVISOR.record(shape)
+            with BUDGETS.enforce(conn, "aggregate"):
+                page = query.fetch_page(cursor, select, page_size, FETCH_BATCH_SIZE)
+            del page["next_page_token"]  # Groups are not paginated
+            if cacheable:
+                RESULT_CACHE.put(cache_key, (table_name,), page, generation)
+        except sqlite3.Error as e:
+            raise ValueError(f"Error aggregating table '{table_name}': {e}")
+    return {"success": True, **page, "cached": False}
+
+
+def search_text(
+    table_name: str,
+    text: str,
+    columns: str = "*",
+    filters: Optional[list[dict]] = None,
+    order_by: Optional[list[str]] = None,
+    limit: Optional[int] = None,
+    use_cache: Optional[bool] = None,
+) -> dict:
+    """Finds rows whose indexed text columns contain the given words, best matches first.
+
+    Use this instead of a "like" filter to search text (e.g. todos mentioning
+    "dentist"). Only tables with a full-text index can be searched; see
+    'text_index' in describe_database.
+
+    Args:
+        table_name: The name of the table to search, e.g. "todos".
+        text: The words to look for; rows must contain all of them, e.g.
+              "book flights". FTS5 query syntax also works: "exact phrase" in
+              double quotes, prefix*, OR, NOT and column: filters.
+        columns: Comma-separated list of columns to retrieve. Defaults to "*".
+        filters: Optional list of filter objects, as for query_db_table, e.g.
+                 [{"column": "completed", "value": 0}].
+        order_by: Optional list of sort keys such as ["id desc"]. Defaults to
+                  best match first. Sorting by "id" alone is much faster when
+                  many rows match.
+        limit: Optional maximum number of matches. Capped by the server's maximum page size.
+        use_cache: Set to false to bypass the server's result cache and read fresh data.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'columns' (list[str], the
+              requested columns then 'snippet' and 'rank'), 'rows' (list[list]),
+              'row_count' (int), 'has_more' (bool, true if matches were cut off
+              by the limit) and 'cached' (bool). 'snippet' shows the matching
+              text with matches in [brackets]; a lower 'rank' is a better match.
+    """
+    page_size = page_size_for(limit, BUDGETS.max_rows("search_text", MAX_PAGE_SIZE))
+
+    with get_db_connection(read_only=True) as conn:
+        cursor = conn.cursor()
+        try:
+            select = fts.build_search(
+                get_table(conn, table_name),
+                text,
+                columns,
+                filters,
+                order_by,
+                page_size + 1,  # One extra row tells us whether matches were cut off
+            )
+            cacheable = use_result_cache(use_cache)
+            if cacheable:
+                cache_key = (select.sql, tuple(select.params))
+                generation = RESULT_CACHE.check_external_writes()
+                page = RESULT_CACHE.get(cache_key)
+                if page is not None:
+                    return {"success": True, **page, "cached": True}
+
+            with BUDGETS.enforce(conn, "search_text"):
+                page = query.fetch_page(cursor, select, page_size, FETCH_BATCH_SIZE)
+            del page["next_page_token"]  # Matches are ranked, not paginated
+            if cacheable:
+                RESULT_CACHE.put(cache_key, (table_name,), page, generation)
+        except sqlite3.Error as e:
+            raise ValueError(f"Error searching table '{table_name}': {e}")
+    return {"success": True, **page, "cached": False}
+
+
+def explain_query(
+    table_name: str,
+    columns: str = "*",
+    filters: Optional[list[dict]] = None,
+    order_by: Optional[list[str]] = None,
+    limit: Optional[int] = None,
+    condition: Optional[str] = None,
+) -> dict:
+    """Shows how SQLite would execute a query_db_table call, without running it.
+
+    Args:
+        table_name: The name of the table to query.
+        columns: Comma-separated list of columns to retrieve. Defaults to "*".
+        filters: Optional list of filter objects, as for query_db_table.
+        order_by: Optional list of sort keys such as ["id"] or ["id desc"].
+        limit: Optional page size, as for query_db_table.
+        condition: Raw SQL WHERE clause condition, as for query_db_table.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'sql' (str), 'plan'
+              (list[str], one step per line), 'full_scans' (list[str], tables
+              read row by row), 'temp_sort' (bool, whether rows are sorted in a
+              temporary B-tree) and 'suggested_indexes' (list[dict]) that would
+              avoid the scan or sort.
+    """
+    check_raw_condition(condition)
+    page_size = page_size_for(limit, MAX_PAGE_SIZE)
+
+    with get_db_connection(read_only=True) as conn:
+        try:
+            select = query.build_select(
+                get_table(conn, table_name), columns, filters, order_by, page_size + 1, condition
+            )
+            plan_rows = conn.execute(f"EXPLAIN QUERY PLAN {select.sql}", select.params).fetchall()
+        except sqlite3.Error as e:
+            raise ValueError(f"Error explaining query on table '{table_name}': {e}")
+        tables = CATALOG.refresh(conn)
+
+    plan = summarise_plan(plan_rows)
+    suggestions = []
+    if plan["full_scans"] or plan["temp_sort"]:
+        suggestions = ADVISOR.suggest(tables, shapes=select.shapes)
+    return {"success": True, "sql": select.sql, **plan, "suggested_indexes": suggestions}
+
+
+def suggest_indexes(table_name: Optional[str] = None) -> dict:
+    """Suggests indexes for the queries this server has run, most-used first.
+
+    Only filters and sort orders seen in query_db_table calls are considered;
+    indexes that already exist are not suggested again.
+
+    Args:
+        table_name: Optional table to limit the suggestions to.
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'shapes_seen' (int) and
+              'suggestions' (list[dict]), each with 'table', 'columns',
+              'covering' (bool), 'queries' (the number of calls it would have
+              served) and the 'sql' that creates it.
+    """
+    with get_db_connection(read_only=True) as conn:
+        tables = CATALOG.refresh(conn)
+    return {
+        "success": True,
+        "shapes_seen": ADVISOR.shapes_seen(),
+        "suggestions": ADVISOR.suggest(tables, table_name),
+    }
 
 
 def insert_data(table_name: str, data: dict) -> dict:
@@ -129,74 +663,257 @@ def insert_data(table_name: str, data: dict) -> dict:
     if not data:
         return {"success": False, "message": "No data provided for insertion."}
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    columns = ", ".join(data.keys())
-    placeholders = ", ".join(["?" for _ in data])
     values = tuple(data.values())
 
-    query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            sql = query.build_insert(get_table(conn, table_name), data.keys())
+            data_version = RESULT_CACHE.begin_write(conn)
+            cursor.execute(sql, values)
+            conn.commit()
+            invalidate_cached_results(conn, table_name, data_version)
+            last_row_id = cursor.lastrowid
+            return {
+                "success": True,
+                "message": f"Data inserted successfully. Row ID: {last_row_id}",
+                "row_id": last_row_id,
+            }
+        except (sqlite3.Error, query.QueryValidationError) as e:
+            conn.rollback()  # Roll back changes on error
+            return {
+                "success": False,
+                "message": f"Error inserting data into table '{table_name}': {e}",
+            }
+
+
+def _write_many(
+    action: str,
+    table_name: str,
+    rows: list[dict],
+    conflict_columns: list[str] | None,
+    chunk_size: int | None,
+) -> dict:
+    """Shared implementation of insert_many and upsert_many."""
+    if not rows:
+        return {"success": False, "message": "No rows provided."}
+    if not all(isinstance(row, dict) for row in rows):
+        return {"success": False, "message": "Every row must be an object of column values."}
+    columns = tuple(rows[0].keys())
+    for index, row in enumerate(rows):
+        if set(row.keys()) != set(columns):
+            return {
+                "success": False,
+                "message": f"Row {index} has columns {sorted(row)}, expected {sorted(columns)}. All rows must have the same columns.",
+            }
+    chunk_size = max(1, min(chunk_size or BULK_CHUNK_SIZE, BULK_CHUNK_SIZE))
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        chunks = []
+        try:
+            table = get_table(conn, table_name)
+            if action == "insert":
+                sql = query.build_insert(table, columns)
+            else:
+                sql = query.build_upsert(table, columns, conflict_columns)
+            # Row IDs are only contiguous when SQLite assigns them itself.
+            tracks_row_ids = action == "insert" and table["key_columns"] == ["rowid"] and not any(
+                column["primary_key"] and column["name"] in columns for column in table["columns"]
+            )
+
+            data_version = RESULT_CACHE.begin_write(conn)
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start : start + chunk_size]
+                cursor.executemany(sql, (tuple(row[c] for c in columns) for row in chunk))
+                result = {
+                    "chunk": len(chunks),
+                    "rows": len(chunk),
+                    # Unlike conn.total_changes, rowcount leaves out rows written by triggers.
+                    "rows_written": cursor.rowcount,
+                }
+                if tracks_row_ids:
+                    last_row_id = conn.execute("SELECT last_insert_rowid();").fetchone()[0]
+                    result["first_row_id"] = last_row_id - len(chunk) + 1
+                    result["last_row_id"] = last_row_id
+                chunks.append(result)
+            conn.commit()
+            invalidate_cached_results(conn, table_name, data_version)
+        except (sqlite3.Error, query.QueryValidationError) as e:
+            conn.rollback()  # One transaction: nothing from earlier chunks is kept either
+            return {
+                "success": False,
+                "message": f"Error in {action}_many on table '{table_name}' (chunk {len(chunks)}), all changes rolled back: {e}",
+            }
+
+    return {
+        "success": True,
+        "message": f"{len(rows)} row(s) written to table '{table_name}' in {len(chunks)} chunk(s).",
+        "rows_written": sum(chunk["rows_written"] for chunk in chunks),
+        "chunks": chunks,
+    }
 
-    try:
-        cursor.execute(query, values)
-        conn.commit()
-        last_row_id = cursor.lastrowid
-        return {
-            "success": True,
-            "message": f"Data inserted successfully. Row ID: {last_row_id}",
-            "row_id": last_row_id,
-        }
-    except sqlite3.Error as e:
-        conn.rollback()  # Roll back changes on error
-        return {
-            "success": False,
-            "message": f"Error inserting data into table '{table_name}': {e}",
-        }
-    finally:
-        conn.close()
 
+def insert_many(table_name: str, rows: list[dict], chunk_size: Optional[int] = None) -> dict:
+    """Inserts many rows into a table in a single transaction.
 
-def delete_data(table_name: str, condition: str) -> dict:
-    """Deletes rows from a table based on a given SQL WHERE clause condition.
+    Args:
+        table_name (str): The name of the table to insert data into.
+        rows (list[dict]): The rows to insert. Every row must have the same column names as keys.
+        chunk_size (int): Optional number of rows per batch. Capped by the server's limit.
+
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'message' (str), 'rows_written' (int)
+              and 'chunks' (list[dict]) with per-chunk row counts and, when SQLite assigned
+              the row IDs, the 'first_row_id' and 'last_row_id' of each chunk.
+              If any chunk fails, no rows are inserted.
+    """
+    return _write_many("insert", table_name, rows, None, chunk_size)
+
+
+def upsert_many(
+    table_name: str,
+    rows: list[dict],
+    conflict_columns: list[str],
+    chunk_size: Optional[int] = None,
+) -> dict:
+    """Inserts many rows, updating existing rows that conflict, in a single transaction.
+
+    Args:
+        table_name (str): The name of the table to write to.
+        rows (list[dict]): The rows to write. Every row must have the same column names as keys.
+        conflict_columns (list[str]): Columns of a primary key or unique constraint that
+                                      identify an existing row (e.g. ["id"]). On conflict, the
+                                      other columns of the row are overwritten.
+        chunk_size (int): Optional number of rows per batch. Capped by the server's limit.
+
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'message' (str), 'rows_written' (int)
+              and 'chunks' (list[dict]) with per-chunk row counts.
+              If any chunk fails, no rows are written.
+    """
+    return _write_many("upsert", table_name, rows, conflict_columns, chunk_size)
+
+
+def delete_data(
+    table_name: str,
+    filters: Optional[list[dict]] = None,
+    condition: Optional[str] = None,
+) -> dict:
+    """Deletes rows from a table that match the given filters.
 
     Args:
         table_name (str): The name of the table to delete data from.
-        condition (str): The SQL WHERE clause condition to specify which rows to delete.
-                         This condition MUST NOT be empty to prevent accidental mass deletion.
+        filters (list[dict]): Filter objects selecting the rows to delete, in the same
+                              format as `query_db_table` (column/operator/value).
+                              At least one filter (or condition) MUST be given to
+                              prevent accidental mass deletion.
+        condition (str): Raw SQL WHERE clause condition. Only accepted when the server
+                         enables raw conditions; prefer `filters`.
 
     Returns:
         dict: A dictionary with keys 'success' (bool) and 'message' (str).
               If successful, 'message' includes the count of deleted rows.
     """
-    if not condition or not condition.strip():
+    if not filters and (not condition or not condition.strip()):
         return {
             "success": False,
-            "message": "Deletion condition cannot be empty. This is a safety measure to prevent accidental deletion of all rows.",
+            "message": "Deletion filters cannot be empty. This is a safety measure to prevent accidental deletion of all rows.",
         }
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            check_raw_condition(condition)
+            sql, params = query.build_delete(get_table(conn, table_name), filters, condition)
+            data_version = RESULT_CACHE.begin_write(conn)
+            with BUDGETS.enforce(conn, "delete_data"):
+                cursor.execute(sql, params)
+            rows_deleted = cursor.rowcount
+            conn.commit()
+            invalidate_cached_results(conn, table_name, data_version)
+            return {
+                "success": True,
+                "message": f"{rows_deleted} row(s) deleted successfully from table '{table_name}'.",
+                "rows_deleted": rows_deleted,
+            }
+        except BudgetExceededError:
+            conn.rollback()
+            raise
+        except (sqlite3.Error, query.QueryValidationError) as e:
+            conn.rollback()
+            return {
+                "success": False,
+                "message": f"Error deleting data from table '{table_name}': {e}",
+            }
+
 
-    query = f"DELETE FROM {table_name} WHERE {condition}"
+def create_suggested_indexes(
+    table_name: Optional[str] = None, max_indexes: Optional[int] = None
+) -> dict:
+    """Creates the indexes that suggest_indexes currently recommends.
 
-    try:
-        cursor.execute(query)
-        rows_deleted = cursor.rowcount
-        conn.commit()
-        return {
-            "success": True,
-            "message": f"{rows_deleted} row(s) deleted successfully from table '{table_name}'.",
-            "rows_deleted": rows_deleted,
-        }
-    except sqlite3.Error as e:
-        conn.rollback()
-        return {
-            "success": False,
-            "message": f"Error deleting data from table '{table_name}': {e}",
-        }
-    finally:
-        conn.close()
+    Args:
+        table_name: Optional table to limit the new indexes to.
+        max_indexes: Optional cap on how many indexes to create, most-used first.
+
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'message' (str) and
+              'created' (list[dict]) describing each new index.
+    """
+    with get_db_connection() as conn:
+        suggestions = ADVISOR.suggest(CATALOG.refresh(conn), table_name)
+        if max_indexes:
+            suggestions = suggestions[:max_indexes]
+        try:
+            for suggestion in suggestions:
+                conn.execute(suggestion["sql"])
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            return {"success": False, "message": f"Error creating indexes: {e}", "created": []}
+    return {
+        "success": True,
+        "message": f"{len(suggestions)} index(es) created.",
+        "created": suggestions,
+    }
+
+
+def create_text_index(table_name: str, columns: list[str]) -> dict:
+    """Creates (or replaces) the full-text index that search_text uses for a table.
+
+    Triggers keep the index up to date as rows are inserted, updated and deleted.
+
+    Args:
+        table_name: The table to index, e.g. "todos".
+        columns: The text columns to make searchable, e.g. ["task"].
+
+    Returns:
+        dict: A dictionary with keys 'success' (bool), 'message' (str) and
+              'columns' (list[str]) now indexed.
+    """
+    with get_db_connection() as conn:
+        try:
+            statements = fts.build_text_index(get_table(conn, table_name), columns)
+            data_version = RESULT_CACHE.begin_write(conn)
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE;")  # Never leave triggers without their index
+            for statement in statements:
+                conn.execute(statement)
+            conn.commit()
+            invalidate_cached_results(conn, table_name, data_version)
+            text_index = get_table(conn, table_name)["text_index"]
+        except (sqlite3.Error, query.QueryValidationError) as e:
+            conn.rollback()
+            return {
+                "success": False,
+                "message": f"Error creating text index on table '{table_name}': {e}",
+            }
+    return {
+        "success": True,
+        "message": f"Full-text index '{text_index['name']}' created on table '{table_name}'.",
+        "columns": text_index["columns"],
+    }
 
 
 # --- MCP Server Setup ---
@@ -205,58 +922,311 @@ logging.info(
 )  # Changed print to logging.info
 app = Server("sqlite-db-mcp-server")
 
-# Wrap database utility functions as ADK FunctionTools
-ADK_DB_TOOLS = {
-    "list_db_tables": FunctionTool(func=list_db_tables),
-    "get_table_schema": FunctionTool(func=get_table_schema),
-    "query_db_table": FunctionTool(func=query_db_table),
-    "insert_data": FunctionTool(func=insert_data),
-    "delete_data": FunctionTool(func=delete_data),
-}
+# Tools exposed over MCP, keyed by tool name. Use register_tool() to add one.
+# Schemas are built by schema.py rather than the ADK's FunctionTool, so the
+# server never imports google.adk (several seconds) before the handshake.
+DB_TOOLS: dict[str, ToolSpec] = {}
+# Names of tools that modify the database and so share the executor's write limit.
+WRITE_TOOLS: set[str] = set()
+
+# The advertised MCP tool list, built once on first use and reset on registration.
+_mcp_tool_manifest: list[mcp_types.Tool] | None = None
+
+
+def register_tool(func, name: str | None = None, writes: bool = False) -> ToolSpec:
+    """Exposes a plain function as an MCP tool.
+
+    The function's signature and docstring become the tool's input schema and
+    description. The cached tool manifest is rebuilt on the next list_tools request.
+    Pass `writes=True` for tools that modify the database.
+    """
+    global _mcp_tool_manifest
+    tool = build_tool_spec(func, name)
+    DB_TOOLS[tool.name] = tool
+    if writes:
+        WRITE_TOOLS.add(tool.name)
+    else:
+        WRITE_TOOLS.discard(tool.name)
+    _mcp_tool_manifest = None
+    return tool
+
+
+def with_response_format(mcp_tool: mcp_types.Tool) -> mcp_types.Tool:
+    """Advertises the optional `response_format` argument handled by call_mcp_tool."""
+    input_schema = dict(mcp_tool.inputSchema)
+    input_schema["properties"] = {
+        **input_schema.get("properties", {}),
+        "response_format": {
+            "type": "string",
+            "enum": list(RESPONSE_FORMATS),
+            "description": 'Optional. "compact" (default) returns rows as arrays under a '
+            'shared "columns" list; "pretty" returns indented objects per row.',
+        },
+    }
+    return mcp_tool.model_copy(update={"inputSchema": input_schema})
+
+
+def build_mcp_tool_manifest() -> list[mcp_types.Tool]:
+    """Converts every registered tool into its MCP tool schema."""
+    return [
+        with_response_format(
+            mcp_types.Tool(name=tool.name, description=tool.description, inputSchema=tool.input_schema)
+        )
+        for tool in DB_TOOLS.values()
+    ]
+
+
+def get_mcp_tool_manifest() -> list[mcp_types.Tool]:
+    """Returns the cached MCP tool manifest, building it on first use."""
+    global _mcp_tool_manifest
+    if _mcp_tool_manifest is None:
+        _mcp_tool_manifest = build_mcp_tool_manifest()
+        logging.info(
+            f"MCP Server: Built tool manifest: {[tool.name for tool in _mcp_tool_manifest]}"
+        )
+    return _mcp_tool_manifest
+
+
+# Expose the database utility functions as MCP tools
+for func in (
+    list_db_tables,
+    get_table_schema,
+    describe_database,
+    query_db_table,
+    join_tables,
+    aggregate,
+    server_stats,
+    explain_query,
+    suggest_indexes,
+    search_text,
+):
+    register_tool(func)
+for func in (
+    insert_data,
+    insert_many,
+    upsert_many,
+    delete_data,
+    create_suggested_indexes,
+    create_text_index,
+):
+    register_tool(func, writes=True)
 
 
 @app.list_tools()
 async def list_mcp_tools() -> list[mcp_types.Tool]:
     """MCP handler to list tools this server exposes."""
-    logging.info(
-        "MCP Server: Received list_tools request."
-    )  # Changed print to logging.info
-    mcp_tools_list = []
-    for tool_name, adk_tool_instance in ADK_DB_TOOLS.items():
-        if not adk_tool_instance.name:
-            adk_tool_instance.name = tool_name
-
-        mcp_tool_schema = adk_to_mcp_tool_type(adk_tool_instance)
-        logging.info(  # Changed print to logging.info
-            f"MCP Server: Advertising tool: {mcp_tool_schema.name}, InputSchema: {mcp_tool_schema.inputSchema}"
-        )
-        mcp_tools_list.append(mcp_tool_schema)
-    return mcp_tools_list
+    logging.debug("MCP Server: Received list_tools request.")
+    return list(get_mcp_tool_manifest())
+
+
+def encode_response(response, response_format: str = "compact") -> str:
+    """Serialises a tool result for the MCP client.
+
+    "compact" emits JSON without whitespace and keeps row results columnar, so
+    column names appear once instead of once per row. "pretty" expands rows
+    into one object per row and indents the output for human reading.
+    """
+    if response_format == "pretty":
+        if isinstance(response, dict) and "columns" in response and "rows" in response:
+            columns = response["columns"]
+            response = {
+                **{key: value for key, value in response.items() if key != "columns"},
+                "rows": [dict(zip(columns, row)) for row in response["rows"]],
+            }
+        return json.dumps(response, indent=2)
+    return json.dumps(response, separators=(",", ":"))
+
+
+def error_response(tool_name: str, error: Exception) -> dict:
+    """The structured response for a tool call that raised `error`."""
+    if isinstance(error, ExecutorBusyError):
+        return {"success": False, "busy": True, "message": str(error)}
+    if isinstance(error, BudgetExceededError):
+        return {"success": False, "message": str(error), **error.details()}
+    return {"success": False, "message": f"Failed to execute tool '{tool_name}': {error}"}
+
+
+# --- Batch Tool ---
+async def _run_sub_call(name: str, arguments: dict):
+    """Runs one tool of a non-atomic batch on the executor, capturing its errors."""
+    kind = WRITE if name in WRITE_TOOLS else READ
+    start = time.perf_counter()
+    queue_wait = 0.0
+    try:
+        response, queue_wait = await EXECUTOR.run(kind, DB_TOOLS[name].func, **arguments)
+    except Exception as e:
+        response = error_response(name, e)
+    ok = not (isinstance(response, dict) and response.get("success") is False)
+    METRICS.record(
+        name, ok, queue_wait=queue_wait, execute=time.perf_counter() - start - queue_wait
+    )
+    return response
+
+
+def _run_atomic_batch(calls: list[tuple]) -> tuple[list, bool]:
+    """Runs every call in order on one connection and one transaction.
+
+    Returns the responses and whether the transaction was committed. The
+    first failing call rolls everything back; the calls after it are skipped.
+    """
+    responses = []
+    with POOL.connection() as conn:
+        token = _batch_connection.set(_DeferredCommitConnection(conn))
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            for name, arguments in calls:
+                try:
+                    response = DB_TOOLS[name].func(**arguments)
+                except Exception as e:
+                    response = error_response(name, e)
+                responses.append(response)
+                if isinstance(response, dict) and response.get("success") is False:
+                    conn.rollback()
+                    break
+            else:
+                conn.commit()
+                return responses, True
+        finally:
+            _batch_connection.reset(token)
+
+    skipped = {
+        "success": False,
+        "skipped": True,
+        "message": "Not run: an earlier call in the atomic batch failed.",
+    }
+    return responses + [skipped] * (len(calls) - len(responses)), False
+
+
+async def batch(calls: list[dict], atomic: Optional[bool] = None) -> dict:
+    """Runs several tool calls in one request and returns all their results.
+
+    Calls run in order, except that consecutive read-only calls run in
+    parallel. By default each call succeeds or fails on its own.
+
+    Args:
+        calls: Ordered list of objects with the "tool" name and its "arguments",
+               e.g. [{"tool": "get_table_schema", "arguments": {"table_name": "users"}},
+               {"tool": "insert_data", "arguments": {"table_name": "users", "data": {...}}}].
+        atomic: Set to true to run every call in one transaction, one after
+                another: reads see the batch's earlier writes, and if any call
+                fails all writes are rolled back and the remaining calls are skipped.
+    Returns:
+        dict: A dictionary with keys 'success' (bool, true if every call
+              succeeded), 'atomic' (bool), 'committed' (bool, atomic batches
+              only) and 'results' (list[dict]) with each call's 'tool' and 'result'.
+    """
+    if not calls:
+        return {"success": False, "message": "calls must list at least one tool call."}
+    normalised = []
+    for index, call in enumerate(calls):
+        name = call.get("tool") if isinstance(call, dict) else None
+        arguments = call.get("arguments") or {} if isinstance(call, dict) else None
+        if name not in DB_TOOLS or inspect.iscoroutinefunction(DB_TOOLS[name].func):
+            return {"success": False, "message": f"Call {index}: unknown or unbatchable tool {name!r}."}
+        if not isinstance(arguments, dict):
+            return {"success": False, "message": f"Call {index}: 'arguments' must be an object."}
+        arguments = dict(arguments)
+        arguments.pop("response_format", None)  # Only the batch's own format applies
+        normalised.append((name, arguments))
+
+    if atomic:
+        (responses, committed), _ = await EXECUTOR.run(WRITE, _run_atomic_batch, calls=normalised)
+        extra = {"committed": committed}
+    else:
+        responses, extra = [], {}
+        index = 0
+        while index < len(normalised):
+            if normalised[index][0] in WRITE_TOOLS:
+                responses.append(await _run_sub_call(*normalised[index]))
+                index += 1
+                continue
+            end = index
+            while end < len(normalised) and normalised[end][0] not in WRITE_TOOLS:
+                end += 1
+            responses += await asyncio.gather(
+                *(_run_sub_call(name, arguments) for name, arguments in normalised[index:end])
+            )
+            index = end
+
+    return {
+        "success": all(
+            not (isinstance(response, dict) and response.get("success") is False)
+            for response in responses
+        ),
+        "atomic": bool(atomic),
+        **extra,
+        "results": [
+            {"tool": name, "result": response}
+            for (name, _), response in zip(normalised, responses)
+        ],
+    }
+
+
+register_tool(batch)
 
 
 @app.call_tool()
 async def call_mcp_tool(name: str, arguments: dict) -> list[mcp_types.TextContent]:
     """MCP handler to execute a tool call requested by an MCP client."""
     logging.info(
-        f"MCP Server: Received call_tool request for '{name}' with args: {arguments}"
-    )  # Changed print to logging.info
+        "MCP Server: Received call_tool request for '%s' with args: %s",
+        name,
+        truncate_payload(arguments),
+    )
 
-    if name in ADK_DB_TOOLS:
-        adk_tool_instance = ADK_DB_TOOLS[name]
+    if name in DB_TOOLS:
+        tool = DB_TOOLS[name]
+        kind = WRITE if name in WRITE_TOOLS else READ
+        arguments = dict(arguments or {})
+        response_format = arguments.pop("response_format", None) or DEFAULT_RESPONSE_FORMAT
+        queue_wait = execute = 0.0
         try:
-            adk_tool_response = await adk_tool_instance.run_async(
-                args=arguments,
-                tool_context=None,  # type: ignore
-            )
-            logging.info(  # Changed print to logging.info
-                f"MCP Server: ADK tool '{name}' executed. Response: {adk_tool_response}"
+            if response_format not in RESPONSE_FORMATS:
+                raise ValueError(
+                    f"Unknown response_format '{response_format}'. Use one of: {', '.join(RESPONSE_FORMATS)}."
+                )
+            start = time.perf_counter()
+            if inspect.iscoroutinefunction(tool.func):
+                # Async tools (batch) schedule their own calls on the executor.
+                tool_response = await tool.func(**arguments)
+            else:
+                # The tools are plain synchronous functions, run on a worker thread.
+                tool_response, queue_wait = await EXECUTOR.run(kind, tool.func, **arguments)
+            execute = time.perf_counter() - start - queue_wait
+
+            start = time.perf_counter()
+            response_text = encode_response(tool_response, response_format)
+            serialize = time.perf_counter() - start
+
+            ok = not (isinstance(tool_response, dict) and tool_response.get("success") is False)
+            METRICS.record(name, ok, queue_wait=queue_wait, execute=execute, serialize=serialize)
+            logging.info(
+                "MCP Server: Tool '%s' %s: queue_wait=%.1fms execute=%.1fms serialize=%.1fms bytes=%d",
+                name,
+                "succeeded" if ok else "failed",
+                queue_wait * 1000,
+                execute * 1000,
+                serialize * 1000,
+                len(response_text),
             )
-            response_text = json.dumps(adk_tool_response, indent=2)
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(
+                    "MCP Server: Tool '%s' response: %s", name, truncate_payload(tool_response)
+                )
             return [mcp_types.TextContent(type="text", text=response_text)]
 
+        except ExecutorBusyError as e:
+            METRICS.record(name, False)
+            logging.warning(f"MCP Server: Rejected '{name}': {e} Stats: {EXECUTOR.stats()}")
+            return [mcp_types.TextContent(type="text", text=json.dumps(error_response(name, e)))]
+        except BudgetExceededError as e:
+            METRICS.record(name, False, queue_wait=queue_wait, execute=execute)
+            logging.warning(f"MCP Server: Cancelled '{name}': {e} Details: {e.details()}")
+            return [mcp_types.TextContent(type="text", text=json.dumps(error_response(name, e)))]
         except Exception as e:
+            METRICS.record(name, False, queue_wait=queue_wait, execute=execute)
             logging.error(
-                f"MCP Server: Error executing ADK tool '{name}': {e}", exc_info=True
+                f"MCP Server: Error executing tool '{name}': {e}", exc_info=True
             )  # Changed print to logging.error, added exc_info
             error_payload = {
                 "success": False,
@@ -277,47 +1247,122 @@ async def call_mcp_tool(name: str, arguments: dict) -> list[mcp_types.TextConten
 
 
 # --- MCP Server Runner ---
+def get_initialization_options() -> InitializationOptions:
+    return InitializationOptions(
+        server_name=app.name,
+        server_version="0.1.0",
+        capabilities=app.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+
+
 async def run_mcp_stdio_server():
     """Runs the MCP server, listening for connections over standard input/output."""
+    import mcp.server.stdio
+
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         logging.info(
             "MCP Stdio Server: Starting handshake with client..."
         )  # Changed print to logging.info
-        await app.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name=app.name,
-                server_version="0.1.0",
-                capabilities=app.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+        await app.run(read_stream, write_stream, get_initialization_options())
         logging.info(
             "MCP Stdio Server: Run loop finished or client disconnected."
         )  # Changed print to logging.info
 
 
+def build_http_app():
+    """Builds an ASGI app serving many concurrent MCP clients from one process.
+
+    Endpoints:
+        /mcp        Streamable HTTP transport.
+        /sse        Legacy SSE transport (messages are POSTed to /messages/).
+    """
+    from mcp.server.sse import SseServerTransport
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+
+    session_manager = StreamableHTTPSessionManager(app=app)
+    sse_transport = SseServerTransport("/messages/")
+
+    async def handle_streamable_http(scope, receive, send):
+        await session_manager.handle_request(scope, receive, send)
+
+    async def handle_sse(request):
+        async with sse_transport.connect_sse(
+            request.scope, request.receive, request._send
+        ) as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, get_initialization_options())
+        return Response()
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with session_manager.run():
+            logging.info("MCP HTTP Server: Ready for streamable HTTP and SSE clients.")
+            yield
+
+    return Starlette(
+        routes=[
+            Mount("/mcp", app=handle_streamable_http),
+            Route("/sse", endpoint=handle_sse),
+            Mount("/messages/", app=sse_transport.handle_post_message),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def run_mcp_http_server(host: str, port: int):
+    """Runs one long-lived MCP server over HTTP, shared by every agent client."""
+    import uvicorn
+
+    logging.info(f"MCP HTTP Server: Listening on http://{host}:{port}/mcp")
+    uvicorn.run(build_http_app(), host=host, port=port, log_level="warning")
+
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SQLite DB MCP Server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "http"],
+        default=os.getenv("SQLITE_MCP_TRANSPORT", "stdio"),
+        help="stdio: one server per client process (default). "
+        "http: one shared server for many clients (streamable HTTP at /mcp, SSE at /sse).",
+    )
+    parser.add_argument("--host", default=os.getenv("SQLITE_MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SQLITE_MCP_PORT", "8765")))
+    args = parser.parse_args()
+
     logging.info(
-        "Launching SQLite DB MCP Server via stdio..."
+        f"Launching SQLite DB MCP Server via {args.transport}..."
     )  # Changed print to logging.info
     # Initialise db
     db.initialise()
+    # Open a writer first, so the database is in WAL mode before any reader connects.
+    with POOL.connection():
+        pass
     try:
-        asyncio.run(run_mcp_stdio_server())
+        if args.transport == "http":
+            run_mcp_http_server(args.host, args.port)
+        else:
+            asyncio.run(run_mcp_stdio_server())
     except KeyboardInterrupt:
         logging.info(
-            "\nMCP Server (stdio) stopped by user."
+            f"\nMCP Server ({args.transport}) stopped by user."
         )  # Changed print to logging.info
     except Exception as e:
         logging.critical(
-            f"MCP Server (stdio) encountered an unhandled error: {e}", exc_info=True
+            f"MCP Server ({args.transport}) encountered an unhandled error: {e}", exc_info=True
         )  # Changed print to logging.critical, added exc_info
     finally:
+        EXECUTOR.shutdown()
+        RESULT_CACHE.close()
+        READ_POOL.close()
+        POOL.close()
         logging.info(
-            "MCP Server (stdio) process exiting."
+            f"MCP Server ({args.transport}) process exiting."
         )  # Changed print to logging.info
-
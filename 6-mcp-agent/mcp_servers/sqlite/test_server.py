@@ -0,0 +1,212 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import query
+import server
+
+BAD_LIMITS = [-1, "3", 2.5, True]
+
+
+def add_todos(database_path: str, count: int):
+    """Adds `count` todos spread across the demo's three users, outside the server."""
+    conn = sqlite3.connect(database_path)
+    conn.executemany(
+        "INSERT INTO todos (user_id, task, completed) VALUES (?, ?, ?);",
+        ((i % 3 + 1, f"Synthetic task number {i}", i % 2) for i in range(count)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def max_rows(tool_name: str) -> int:
+    return server.BUDGETS.max_rows(tool_name, server.MAX_PAGE_SIZE)
+
+
+# --- Page sizes ---
+def test_query_page_size_is_capped(database):
+    add_todos(database, max_rows("query_db_table") + 10)
+    page = server.query_db_table("todos", limit=10**6)
+    assert page["row_count"] == max_rows("query_db_table")
+    assert page["has_more"]
+
+    page = server.query_db_table("todos", limit=3)
+    assert page["row_count"] == 3
+    assert page["has_more"]
+
+
+@pytest.mark.parametrize("limit", BAD_LIMITS)
+def test_query_rejects_bad_limits(database, limit):
+    add_todos(database, max_rows("query_db_table") + 10)
+    with pytest.raises(query.QueryValidationError, match="limit"):
+        server.query_db_table("todos", limit=limit)
+    with pytest.raises(query.QueryValidationError, match="limit"):
+        server.explain_query("todos", limit=limit)
+
+
+def test_aggregate_group_count_is_capped(database):
+    add_todos(database, max_rows("aggregate") + 10)
+    groups = server.aggregate("todos", [{"function": "count"}], group_by=["task"], limit=10**6)
+    assert groups["row_count"] == max_rows("aggregate")
+    assert groups["has_more"]
+
+
+@pytest.mark.parametrize("limit", BAD_LIMITS)
+def test_aggregate_rejects_bad_limits(database, limit):
+    add_todos(database, max_rows("aggregate") + 10)
+    with pytest.raises(query.QueryValidationError, match="limit"):
+        server.aggregate("todos", [{"function": "count"}], group_by=["task"], limit=limit)
+
+
+def test_join_page_size_is_capped(database):
+    add_todos(database, max_rows("join_tables") + 10)
+    page = server.join_tables("todos", [{"table": "users"}], limit=10**6)
+    assert page["row_count"] == max_rows("join_tables")
+    assert page["has_more"]
+
+
+@pytest.mark.parametrize("limit", BAD_LIMITS)
+def test_join_rejects_bad_limits(database, limit):
+    add_todos(database, max_rows("join_tables") + 10)
+    with pytest.raises(query.QueryValidationError, match="limit"):
+        server.join_tables("todos", [{"table": "users"}], limit=limit)
+
+
+def test_search_match_count_is_capped(database):
+    add_todos(database, max_rows("search_text") + 10)
+    matches = server.search_text("todos", "synthetic", limit=10**6)
+    assert matches["row_count"] == max_rows("search_text")
+    assert matches["has_more"]
+
+
+@pytest.mark.parametrize("limit", BAD_LIMITS)
+def test_search_rejects_bad_limits(database, limit):
+    add_todos(database, max_rows("search_text") + 10)
+    with pytest.raises(query.QueryValidationError, match="limit"):
+        server.search_text("todos", "synthetic", limit=limit)
+
+
+@pytest.mark.parametrize("text", ["", "  ", "!?"])
+def test_search_errors_name_the_text_argument(database, text):
+    with pytest.raises(query.QueryValidationError, match="^text "):
+        server.search_text("todos", text)
+
+
+# --- Result cache ---
+def run_sql(database_path: str, sql: str):
+    """Runs a statement on a connection of its own, as another process would."""
+    conn = sqlite3.connect(database_path)
+    conn.executescript(sql)
+    conn.close()
+
+
+def test_view_results_are_invalidated_by_writes_to_its_table(database):
+    run_sql(database, "CREATE VIEW open_todos AS SELECT * FROM todos WHERE completed = 0;")
+    first = server.query_db_table("open_todos")
+    assert server.query_db_table("open_todos")["cached"]
+
+    assert server.insert_data("todos", {"user_id": 1, "task": "Water plants"})["success"]
+    page = server.query_db_table("open_todos")
+    assert not page["cached"]
+    assert page["row_count"] == first["row_count"] + 1
+
+
+def test_trigger_written_tables_are_invalidated(database):
+    run_sql(
+        database,
+        "CREATE TABLE todo_log (todo_id INTEGER, task TEXT);"
+        "CREATE TRIGGER todos_log AFTER INSERT ON todos "
+        "BEGIN INSERT INTO todo_log VALUES (new.id, new.task); END;",
+    )
+    assert server.query_db_table("todo_log")["row_count"] == 0
+    assert server.query_db_table("todo_log")["cached"]
+
+    assert server.insert_data("todos", {"user_id": 1, "task": "Water plants"})["success"]
+    page = server.query_db_table("todo_log")
+    assert not page["cached"]
+    assert page["rows"] == [[6, "Water plants"]]
+
+
+def test_results_are_cached_until_the_table_is_written(database):
+    first = server.query_db_table("todos")
+    assert not first["cached"]
+    assert server.query_db_table("todos") == {**first, "cached": True}
+    assert not server.query_db_table("todos", use_cache=False)["cached"]
+
+    assert server.insert_data("todos", {"user_id": 1, "task": "Water plants"})["success"]
+    page = server.query_db_table("todos")
+    assert not page["cached"]
+    assert page["row_count"] == first["row_count"] + 1
+
+    assert server.delete_data("todos", [{"column": "task", "value": "Water plants"}])["success"]
+    page = server.query_db_table("todos")
+    assert not page["cached"]
+    assert page["row_count"] == first["row_count"]
+
+
+def test_writes_keep_other_tables_cached(database):
+    server.query_db_table("users")
+    assert server.insert_data("todos", {"user_id": 1, "task": "Water plants"})["success"]
+    assert server.query_db_table("users")["cached"]
+
+
+def test_external_writes_invalidate_every_result(database):
+    users = server.query_db_table("users")
+    server.query_db_table("todos")
+    add_todos(database, 1)
+    assert server.query_db_table("users") == {**users, "cached": False}
+    assert server.query_db_table("todos")["row_count"] == 6
+
+
+def test_atomic_batch_rolls_back_and_skips_the_cache(database):
+    todo = {"user_id": 1, "task": "Water plants"}
+    calls = [
+        {"tool": "insert_data", "arguments": {"table_name": "todos", "data": todo}},
+        {"tool": "query_db_table", "arguments": {"table_name": "todos"}},
+        {"tool": "insert_data", "arguments": {"table_name": "missing", "data": {"id": 1}}},
+    ]
+    result = asyncio.run(server.batch(calls, atomic=True))
+    assert not result["committed"]
+    inside = result["results"][1]["result"]
+    assert inside["row_count"] == 6 and not inside["cached"]
+    page = server.query_db_table("todos")
+    assert page["row_count"] == 5 and not page["cached"]
+
+
+# --- Keyset pagination ---
+def read_all_pages(table_name: str, **arguments) -> list[list]:
+    rows, token = [], None
+    while True:
+        page = server.query_db_table(table_name, page_token=token, **arguments)
+        rows += page["rows"]
+        token = page["next_page_token"]
+        assert page["has_more"] == (token is not None)
+        if token is None:
+            return rows
+
+
+@pytest.mark.parametrize("order_by", [None, ["id desc"], ["completed", "task desc"]])
+def test_page_tokens_cover_every_row_once(database, order_by):
+    add_todos(database, 23)
+    everything = server.query_db_table("todos", order_by=order_by, limit=100)["rows"]
+    assert len(everything) == 28
+    assert read_all_pages("todos", order_by=order_by, limit=4) == everything
+
+
+def test_page_tokens_see_rows_added_between_pages(database):
+    page = server.query_db_table("todos", limit=3)
+    rows = page["rows"]
+    add_todos(database, 2)
+    while page["next_page_token"]:
+        page = server.query_db_table("todos", limit=3, page_token=page["next_page_token"])
+        rows += page["rows"]
+    assert [row[0] for row in rows] == list(range(1, 8))
+
+
+def test_page_token_belongs_to_its_query(database):
+    token = server.query_db_table("todos", limit=2)["next_page_token"]
+    with pytest.raises(query.QueryValidationError, match="page_token"):
+        server.query_db_table("todos", order_by=["id desc"], limit=2, page_token=token)
+    with pytest.raises(query.QueryValidationError, match="page_token"):
+        server.query_db_table("todos", limit=2, page_token="not a token")
@@ -1,12 +1,32 @@
+import os
 from pathlib import Path
 
 from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, StdioServerParameters
+from google.adk.tools.mcp_tool.mcp_toolset import (
+    MCPToolset,
+    StdioServerParameters,
+    StreamableHTTPServerParams,
+)
 
 from mcp_servers.sqlite import get_script_path
 
 SCRIPT_PATH = get_script_path()
 
+# Set SQLITE_MCP_URL (e.g. http://127.0.0.1:8765/mcp) to share one long-running
+# server started with `python server.py --transport http`. Otherwise every agent
+# process spawns its own server over stdio.
+SQLITE_MCP_URL = os.getenv("SQLITE_MCP_URL")
+
+
+def get_connection_params():
+    if SQLITE_MCP_URL:
+        return StreamableHTTPServerParams(url=SQLITE_MCP_URL)
+    return StdioServerParameters(
+        command="python3",
+        args=[SCRIPT_PATH],
+    )
+
+
 # Read the prompt from prompt.md
 def get_system_prompt():
     prompt_path = Path(__file__).parent / "prompt.md"
@@ -21,10 +41,7 @@ root_agent = LlmAgent(
     instruction=SYSTEM_PROMPT,
     tools=[
         MCPToolset(
-            connection_params=StdioServerParameters(
-                command="python3",
-                args=[SCRIPT_PATH],
-            )
+            connection_params=get_connection_params(),
             # tool_filter=['list_tables'] # Optional: ensure only specific tools are loaded
         )
     ],